@@ -5,9 +5,296 @@ This module handles all HTTP communication with the Django backend.
 It sends CSV files to the backend and receives JSON responses.
 
 The backend must be running at http://localhost:8000
+
+requests takes a noticeable part of the desktop app's startup time to
+import, so it is imported when the first request is sent (or earlier by
+preload()), not when this module is imported.
 """
 
-import requests
+import json
+import os
+import secrets
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import ExitStack
+
+
+# gzip level for uploads: fast enough to keep up with the network, and
+# CSV exports still shrink about tenfold
+UPLOAD_GZIP_LEVEL = 5
+
+# First bytes of gzip, zstd and zip files, and of Parquet and Arrow IPC
+# files (compressed or binary already, so they are sent as they are)
+COMPRESSED_MAGIC = (b'\x1f\x8b', b'\x28\xb5\x2f\xfd', b'PK\x03\x04',
+                    b'PAR1', b'ARROW1', b'\xff\xff\xff\xff')
+
+# Bytes read from disk and sent per chunk of a streaming upload
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Compressed sizes remembered for files that are sent again unchanged
+GZIP_LENGTH_CACHE_SIZE = 256
+
+# Seconds to wait for the TCP connection to the backend
+CONNECT_TIMEOUT = 5
+
+# Seconds to wait for the response once the request is sent, plus extra
+# seconds per MB of upload (the backend answers after parsing the file)
+READ_TIMEOUT = 10
+READ_TIMEOUT_PER_MB = 0.5
+
+# Retries for failed connections and 503 (server busy) responses, with
+# exponential backoff: 0.5s, 1s, 2s... A 503 Retry-After header is honoured
+RETRIES = 3
+RETRY_BACKOFF = 0.5
+
+# Keep-alive connections kept open to the backend
+POOL_SIZE = 4
+
+# Seconds a backend health check result is reused
+HEALTH_CHECK_TTL = 30
+
+# Seconds without any data after which a live dataset stream counts as
+# lost (the backend sends a keepalive every second or so when idle)
+STREAM_READ_TIMEOUT = 15
+
+# Equipment types the backend sends per summary (the rest are summed up
+# in equipment_by_type_other), as many as charts.MAX_BARS plots
+TOP_TYPES = 40
+
+
+def merge_delta(summary, delta):
+    """
+    Merge a live "delta" event into the previous statistics.
+    
+    Dictionary values (equipment_by_type, distributions, ...) are merged
+    one level down, and their None entries removed, the way the backend
+    diffs them (analyzer/live.py). Returns new dictionaries, so summaries
+    that were already handed out do not change.
+    """
+    merged = dict(summary)
+    for key, value in delta.items():
+        previous = summary.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            entries = {**previous, **value}
+            for name, item in value.items():
+                if item is None:
+                    del entries[name]
+            merged[key] = entries
+        else:
+            merged[key] = value
+    return merged
+
+
+class UploadCancelled(Exception):
+    """
+    Raised when an upload is cancelled through its cancel event.
+    """
+
+
+class FileSlice:
+    """
+    Read-only view of the bytes [start, end) of a binary file.
+    
+    Used to send only the complete rows of a file that is still being
+    written; MultipartUpload sends it like a file that ends at end.
+    """
+    
+    def __init__(self, fileobj, start, end):
+        self.fileobj = fileobj
+        self.start = start
+        self.end = end
+        fileobj.seek(start)
+    
+    def tell(self):
+        return self.fileobj.tell() - self.start
+    
+    def seek(self, offset, whence=os.SEEK_SET):
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self.tell(), os.SEEK_END: self.end - self.start}[whence]
+        self.fileobj.seek(self.start + base + offset)
+        return self.tell()
+    
+    def read(self, size=-1):
+        remaining = max(0, self.end - self.fileobj.tell())
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        return self.fileobj.read(size)
+
+
+# (device, inode, size, mtime_ns, start, level) -> compressed length
+_gzip_lengths = OrderedDict()
+_gzip_lengths_lock = threading.Lock()
+
+
+class GzipStream:
+    """
+    gzip-compressed view of a binary file, compressed while it is sent.
+    
+    The backend needs the Content-Length of an upload before its body
+    (Django does not read chunked request bodies), so len() compresses
+    the file once and only counts the output. chunks() then compresses it
+    again block by block while MultipartUpload sends it. The output of
+    both passes is identical (no timestamp or file name in the header),
+    and neither keeps more than one block in memory or writes to disk.
+    
+    The compressed length is remembered per file (identified by device,
+    inode, size and modification time), so sending an unchanged file
+    again (a retry, the upload queue, another analysis of the same
+    file) skips the counting pass.
+    """
+    
+    def __init__(self, fileobj, level=UPLOAD_GZIP_LEVEL, cancel_event=None):
+        self.fileobj = fileobj
+        self.level = level
+        self.cancel_event = cancel_event
+        self.start = fileobj.tell()
+        self._length = None
+    
+    def _cache_key(self):
+        try:
+            stat = os.fstat(self.fileobj.fileno())
+        except (AttributeError, OSError, ValueError):
+            # Not a real file (e.g. BytesIO): nothing to identify it by
+            return None
+        return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, self.start, self.level)
+    
+    def __len__(self):
+        if self._length is not None:
+            return self._length
+        
+        key = self._cache_key()
+        if key is not None:
+            with _gzip_lengths_lock:
+                if key in _gzip_lengths:
+                    _gzip_lengths.move_to_end(key)
+                    self._length = _gzip_lengths[key]
+                    return self._length
+        
+        self._length = sum(len(chunk) for chunk in self.chunks())
+        if key is not None:
+            with _gzip_lengths_lock:
+                _gzip_lengths[key] = self._length
+                while len(_gzip_lengths) > GZIP_LENGTH_CACHE_SIZE:
+                    _gzip_lengths.popitem(last=False)
+        return self._length
+    
+    def chunks(self):
+        """
+        Yield the compressed file in blocks of about UPLOAD_CHUNK_SIZE
+        input bytes (fewer bytes out, usually).
+        
+        Raises:
+            UploadCancelled: If the cancel event is set meanwhile
+        """
+        # wbits 31: gzip container; zlib writes a zero timestamp and no name
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        self.fileobj.seek(self.start)
+        for block in iter(lambda: self.fileobj.read(UPLOAD_CHUNK_SIZE), b''):
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                raise UploadCancelled("Upload cancelled")
+            chunk = compressor.compress(block)
+            if chunk:
+                yield chunk
+        yield compressor.flush()
+
+
+class MultipartUpload:
+    """
+    multipart/form-data request body that is read from disk while it is sent.
+    
+    requests builds multipart bodies in memory; this body is an iterable
+    of chunks with a known length instead, so files of any size are sent
+    with constant memory and a Content-Length header. Iterating again
+    starts over, which lets retries re-send the body.
+    """
+    
+    def __init__(self, files, fields=None, progress_callback=None, cancel_event=None):
+        """
+        Args:
+            files (list): (field name, (file name, binary file[, content
+                type])) pairs, like the files argument of requests. Each
+                file is sent from its current position to its end; a
+                GzipStream is sent as it is compressed.
+            fields (dict): Plain form fields
+            progress_callback (callable): Optional; called with the bytes
+                sent so far and the total size after every chunk
+            cancel_event (threading.Event): Optional; sending stops with
+                UploadCancelled once it is set
+        """
+        self.boundary = secrets.token_hex(16)
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
+        
+        # Body parts: bytes, or (file, start position, size)
+        self._parts = []
+        for name, value in (fields or {}).items():
+            self._parts.append(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f'{value}\r\n'.encode()
+            )
+        for name, (file_name, fileobj, *content_type) in files:
+            content_type = content_type[0] if content_type else 'application/octet-stream'
+            self._parts.append(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"; filename="{file_name}"\r\n'
+                f'Content-Type: {content_type}\r\n\r\n'.encode()
+            )
+            if isinstance(fileobj, GzipStream):
+                self._parts.append((fileobj, None, len(fileobj)))
+            else:
+                start = fileobj.tell()
+                size = fileobj.seek(0, os.SEEK_END) - start
+                self._parts.append((fileobj, start, size))
+            self._parts.append(b'\r\n')
+        self._parts.append(f'--{self.boundary}--\r\n'.encode())
+        
+        self._length = sum(
+            len(part) if isinstance(part, bytes) else part[2] for part in self._parts
+        )
+    
+    def __len__(self):
+        return self._length
+    
+    def __iter__(self):
+        sent = 0
+        for part in self._parts:
+            if isinstance(part, bytes):
+                chunks = [part]
+            elif isinstance(part[0], GzipStream):
+                chunks = self._read_stream(*part)
+            else:
+                chunks = self._read_file(*part)
+            for chunk in chunks:
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    raise UploadCancelled("Upload cancelled")
+                yield chunk
+                sent += len(chunk)
+                if self.progress_callback:
+                    self.progress_callback(sent, self._length)
+    
+    @staticmethod
+    def _read_file(fileobj, start, size):
+        fileobj.seek(start)
+        while size > 0:
+            chunk = fileobj.read(min(UPLOAD_CHUNK_SIZE, size))
+            if not chunk:
+                raise IOError("File was truncated during the upload")
+            size -= len(chunk)
+            yield chunk
+    
+    @staticmethod
+    def _read_stream(stream, start, size):
+        for chunk in stream.chunks():
+            size -= len(chunk)
+            if size < 0:
+                break
+            yield chunk
+        if size != 0:
+            # The length was already sent, so the body must match it
+            raise IOError("File changed during the upload")
 
 
 class EquipmentAnalyzerAPI:
@@ -15,22 +302,209 @@ class EquipmentAnalyzerAPI:
     Client for communicating with the Equipment Analyzer backend API.
     """
     
-    def __init__(self, base_url="http://localhost:8000"):
+    def __init__(self, base_url="http://localhost:8000", retries=RETRIES,
+                 backoff_factor=RETRY_BACKOFF, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, health_check_ttl=HEALTH_CHECK_TTL,
+                 pool_size=POOL_SIZE, top_n=TOP_TYPES):
         """
         Initialize API client with backend URL.
         
+        All requests share one Session, so connections to the backend are
+        kept alive and reused instead of opened for every call.
+        
         Args:
             base_url (str): Base URL of Django backend
+            retries (int): Retries for failed connections and 503 responses
+            backoff_factor (float): Base delay of the exponential backoff
+                between retries, in seconds
+            connect_timeout (float): Seconds to wait for a connection
+            read_timeout (float): Seconds to wait for a response; uploads
+                get READ_TIMEOUT_PER_MB more per MB of file
+            health_check_ttl (float): Seconds check_backend_status()
+                reuses its last result
+            pool_size (int): Keep-alive connections kept open; at least
+                the number of requests sent at the same time
+            top_n (int): Equipment types per summary, or None for all
         """
         self.base_url = base_url
         self.analyze_endpoint = f"{base_url}/api/analyze/"
+        self.jobs_endpoint = f"{base_url}/api/jobs/"
+        self.batch_endpoint = f"{base_url}/api/analyze/batch/"
+        self.datasets_endpoint = f"{base_url}/api/datasets/"
+        self.merge_endpoint = f"{base_url}/api/partials/merge/"
+        
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.health_check_ttl = health_check_ttl
+        
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_size = pool_size
+        self.top_n = top_n
+        
+        # Last health check: (time.monotonic() of the check, result)
+        self._backend_status = None
+        self._status_lock = threading.Lock()
+        
+        # Sessions are created on first use (see _sessions)
+        self._session = None
+        self._probe_session = None
+        self._session_lock = threading.Lock()
+    
+    def _sessions(self):
+        """
+        Return the (pooled, probe) sessions, creating them on first use.
+        """
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                
+                # Only connection errors and 503 are retried: the request
+                # did not reach the backend, or the backend rejected it
+                # before doing any work. Read timeouts are not retried,
+                # since the upload was sent and the analysis may still be
+                # running.
+                retry = Retry(
+                    total=self.retries,
+                    connect=self.retries,
+                    read=0,
+                    status=self.retries,
+                    status_forcelist=(503,),
+                    allowed_methods=None,  # 503 is safe to retry for every method
+                    backoff_factor=self.backoff_factor,
+                    respect_retry_after_header=True,
+                    raise_on_status=False
+                )
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                
+                # Health checks use their own keep-alive connection without
+                # retries, so a stopped backend is reported right away
+                self._probe_session = requests.Session()
+                self._session = session
+            return self._session, self._probe_session
+    
+    @property
+    def session(self):
+        """
+        The pooled keep-alive requests.Session for all API calls.
+        """
+        return self._sessions()[0]
+    
+    def preload(self):
+        """
+        Import requests and create the sessions ahead of the first call.
+        
+        Safe to call from a background thread.
+        """
+        self._sessions()
+    
+    def close(self):
+        """
+        Close the pooled connections to the backend.
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._probe_session.close()
+    
+    def _summary_params(self, params=None):
+        """
+        Query parameters for a request that returns summaries.
+        """
+        params = dict(params or {})
+        if self.top_n is not None:
+            params['top_n'] = str(self.top_n)
+        return params
+    
+    def _timeout(self, upload_bytes=0):
+        """
+        Return the (connect, read) timeout for a request.
+        
+        The backend answers an upload only after parsing it, so the read
+        timeout grows with the size of the upload.
+        """
+        read_timeout = self.read_timeout + READ_TIMEOUT_PER_MB * upload_bytes / (1024 * 1024)
+        return (self.connect_timeout, read_timeout)
+    
+    def _request(self, method, url, upload_bytes=0, **kwargs):
+        """
+        Send a request through the pooled session.
+        
+        Successful requests and connection errors also update the cached
+        backend status, so check_backend_status() rarely needs a request
+        of its own.
+        
+        Raises:
+            ConnectionError: If the backend is not reachable or does not
+                answer in time
+        """
+        session = self.session
+        import requests
+        
+        try:
+            kwargs.setdefault('timeout', self._timeout(upload_bytes))
+            response = session.request(method, url, **kwargs)
+        except requests.exceptions.ConnectionError:
+            self._set_backend_status(False)
+            raise ConnectionError(
+                "Cannot connect to backend server. "
+                "Make sure Django is running on http://localhost:8000"
+            )
+        except requests.exceptions.Timeout:
+            raise ConnectionError("Request timed out. Backend server is not responding.")
+        self._set_backend_status(True)
+        return response
+    
+    def _upload(self, method, url, files, fields=None, params=None,
+                progress_callback=None, cancel_event=None):
+        """
+        Send files as a streaming multipart request (see MultipartUpload).
+        """
+        body = MultipartUpload(files, fields, progress_callback, cancel_event)
+        return self._request(
+            method,
+            url,
+            upload_bytes=len(body),
+            params=params,
+            data=body,
+            headers={'Content-Type': body.content_type}
+        )
+    
+    def _set_backend_status(self, running):
+        with self._status_lock:
+            self._backend_status = (time.monotonic(), running)
+    
+    def _compressed_upload(self, file_path, stack, cancel_event=None):
+        """
+        Return a requests file tuple with the gzip-compressed CSV.
+        
+        The file is compressed while it is sent (see GzipStream), so it
+        is never held in memory or copied to disk. Files that are
+        already compressed are sent as they are.
+        """
+        csv_file = stack.enter_context(open(file_path, 'rb'))
+        file_name = os.path.basename(file_path)
+        if csv_file.peek(6)[:6].startswith(COMPRESSED_MAGIC):
+            return (file_name, csv_file)
+        return (f"{file_name}.gz", GzipStream(csv_file, cancel_event=cancel_event), 'application/gzip')
     
-    def upload_and_analyze_csv(self, file_path):
+    def upload_and_analyze_csv(self, file_path, compress=True,
+                               upload_callback=None, cancel_event=None):
         """
         Upload CSV file to backend and get analysis results.
         
         Args:
             file_path (str): Full path to CSV file
+            compress (bool): gzip the file on the fly before sending it
+                (the backend detects and decompresses it)
+            upload_callback (callable): Optional; called with the bytes
+                sent so far and the total upload size
+            cancel_event (threading.Event): Optional; set it to cancel
             
         Returns:
             dict: JSON response from backend with statistics
@@ -39,26 +513,37 @@ class EquipmentAnalyzerAPI:
                     'average_flowrate': float,
                     'average_pressure': float,
                     'average_temperature': float,
-                    'equipment_by_type': dict
+                    'equipment_by_type': dict,
+                    'equipment_by_type_other': {'types': int, 'count': int}
+                        (when top_n is set)
                 }
                 
         Raises:
             ConnectionError: If backend is not reachable
             requests.exceptions.RequestException: For other HTTP errors
             ValueError: If backend returns an error response
+            UploadCancelled: If cancel_event was set
         """
         try:
-            # Open the CSV file in binary mode
-            with open(file_path, 'rb') as csv_file:
+            # Open the CSV file in binary mode (compressed if requested)
+            with ExitStack() as stack:
+                if compress:
+                    upload = self._compressed_upload(file_path, stack, cancel_event)
+                else:
+                    upload = (os.path.basename(file_path), stack.enter_context(open(file_path, 'rb')))
+                
                 # Prepare the multipart form data
                 # Key must be 'file' to match backend expectation
-                files = {'file': csv_file}
+                files = [('file', upload)]
                 
-                # Send POST request to Django backend
-                response = requests.post(
+                # Send POST request to Django backend, streaming the file
+                response = self._upload(
+                    'POST',
                     self.analyze_endpoint,
-                    files=files,
-                    timeout=10  # 10 second timeout
+                    files,
+                    params=self._summary_params(),
+                    progress_callback=upload_callback,
+                    cancel_event=cancel_event
                 )
                 
                 # Check if request was successful
@@ -71,30 +556,418 @@ class EquipmentAnalyzerAPI:
                     error_message = error_data.get('error', 'Unknown error occurred')
                     raise ValueError(f"Backend error: {error_message}")
                     
-        except requests.exceptions.ConnectionError:
-            raise ConnectionError(
-                "Cannot connect to backend server. "
-                "Make sure Django is running on http://localhost:8000"
-            )
-        except requests.exceptions.Timeout:
-            raise ConnectionError("Request timed out. Backend server is not responding.")
         except FileNotFoundError:
             raise FileNotFoundError(f"CSV file not found: {file_path}")
+        except (UploadCancelled, ValueError, ConnectionError):
+            raise
         except Exception as e:
             raise Exception(f"Error uploading file: {str(e)}")
     
-    def check_backend_status(self):
+    def upload_and_analyze_many(self, file_paths, upload_callback=None, cancel_event=None):
+        """
+        Upload several CSV files in one request and get their statistics.
+        
+        The backend parses the files in parallel and merges them.
+        
+        Args:
+            file_paths (list): Full paths to CSV (or zip) files
+            upload_callback (callable): Optional; called with the bytes
+                sent so far and the total upload size
+            cancel_event (threading.Event): Optional; set it to cancel
+            
+        Returns:
+            dict: Results from backend
+                {
+                    'files': [per-file statistics, or {'file_name', 'error'}],
+                    'combined': dict with the same keys as
+                                upload_and_analyze_csv() returns
+                }
+        """
+        # Keep every file open until the request has been sent
+        with ExitStack() as stack:
+            files = [
+                ('files', (os.path.basename(path), stack.enter_context(open(path, 'rb'))))
+                for path in file_paths
+            ]
+            response = self._upload(
+                'POST',
+                self.batch_endpoint,
+                files,
+                params=self._summary_params(),
+                progress_callback=upload_callback,
+                cancel_event=cancel_event
+            )
+        
+        if response.status_code == 200:
+            return response.json()
+        else:
+            error_data = response.json()
+            error_message = error_data.get('error', 'Unknown error occurred')
+            raise ValueError(f"Backend error: {error_message}")
+    
+    def analyze_partial(self, file_path, compress=True, upload_callback=None, cancel_event=None):
+        """
+        Upload a CSV file and get its mergeable partial aggregate.
+        
+        Partials of several files can be combined with merge_partials()
+        into the same statistics one upload of all rows would give.
+        
+        Args:
+            file_path (str): Full path to CSV file
+            compress (bool): gzip the file on the fly before sending it
+            upload_callback (callable): Optional; called with the bytes
+                sent so far and the total upload size
+            cancel_event (threading.Event): Optional; set it to cancel
+            
+        Returns:
+            dict: Partial aggregate from backend; 'total_rows' is the
+                number of rows in the file
+                
+        Raises:
+            UploadCancelled: If cancel_event was set
+        """
+        try:
+            with ExitStack() as stack:
+                if compress:
+                    upload = self._compressed_upload(file_path, stack, cancel_event)
+                else:
+                    upload = (os.path.basename(file_path), stack.enter_context(open(file_path, 'rb')))
+                response = self._upload(
+                    'POST',
+                    self.analyze_endpoint,
+                    [('file', upload)],
+                    params={'partial': '1'},
+                    progress_callback=upload_callback,
+                    cancel_event=cancel_event
+                )
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                error_data = response.json()
+                error_message = error_data.get('error', 'Unknown error occurred')
+                raise ValueError(f"Backend error: {error_message}")
+                
+        except FileNotFoundError:
+            raise FileNotFoundError(f"CSV file not found: {file_path}")
+    
+    def merge_partials(self, partials):
+        """
+        Merge partial aggregates into one summary.
+        
+        Args:
+            partials (list): Outputs of analyze_partial(), or 'partial'
+                values of earlier merge_partials() results
+            
+        Returns:
+            dict: Results from backend
+                {
+                    'summary': dict with the same keys as
+                               upload_and_analyze_csv() returns,
+                    'columns': per-column count/mean/std/min/max,
+                    'partial': the merged partial, to merge further
+                }
+        """
+        response = self._request(
+            'POST',
+            self.merge_endpoint,
+            upload_bytes=0,
+            params=self._summary_params(),
+            json={'partials': partials}
+        )
+        
+        if response.status_code == 200:
+            return response.json()
+        else:
+            error_data = response.json()
+            error_message = error_data.get('error', 'Unknown error occurred')
+            raise ValueError(f"Backend error: {error_message}")
+    
+    def start_async_analysis(self, file_path, compress=True,
+                             upload_callback=None, cancel_event=None):
+        """
+        Upload CSV file and start a background analysis on the backend.
+        
+        The backend answers right away with a job; use get_job() or
+        analyze_csv_async() to follow it.
+        
+        Args:
+            file_path (str): Full path to CSV file
+            compress (bool): gzip the file on the fly before sending it
+            upload_callback (callable): Optional; called with the bytes
+                sent so far and the total upload size
+            cancel_event (threading.Event): Optional; set it to cancel
+            
+        Returns:
+            dict: Job data from backend
+                {
+                    'id': str,
+                    'status': 'queued' | 'running' | 'done' | 'failed',
+                    'rows_processed': int,
+                    'result': dict or None,
+                    'error': str
+                }
+        """
+        try:
+            with ExitStack() as stack:
+                if compress:
+                    upload = self._compressed_upload(file_path, stack, cancel_event)
+                else:
+                    upload = (os.path.basename(file_path), stack.enter_context(open(file_path, 'rb')))
+                response = self._upload(
+                    'POST',
+                    self.analyze_endpoint,
+                    [('file', upload)],
+                    params=self._summary_params({'async': '1'}),
+                    progress_callback=upload_callback,
+                    cancel_event=cancel_event
+                )
+            
+            if response.status_code == 202:
+                return response.json()
+            else:
+                error_data = response.json()
+                error_message = error_data.get('error', 'Unknown error occurred')
+                raise ValueError(f"Backend error: {error_message}")
+                
+        except FileNotFoundError:
+            raise FileNotFoundError(f"CSV file not found: {file_path}")
+    
+    def get_job(self, job_id):
+        """
+        Get the current status of a background analysis.
+        
+        Args:
+            job_id (str): ID returned by start_async_analysis()
+            
+        Returns:
+            dict: Job data from backend (see start_async_analysis)
+        """
+        response = self._request('GET', f"{self.jobs_endpoint}{job_id}/")
+        
+        if response.status_code != 200:
+            raise ValueError(f"Backend error: job {job_id} not found")
+        return response.json()
+    
+    def analyze_csv_async(self, file_path, progress_callback=None, poll_interval=0.5,
+                          upload_callback=None, cancel_event=None):
+        """
+        Analyze a CSV file as a background job and wait for the result.
+        
+        Unlike upload_and_analyze_csv(), the HTTP request returns as soon
+        as the upload is done, so large files do not hit the timeout.
+        
+        Args:
+            file_path (str): Full path to CSV file
+            progress_callback (callable): Optional; called with the number
+                of rows the backend has processed so far
+            poll_interval (float): Seconds between status checks
+            upload_callback (callable): Optional; called with the bytes
+                sent so far and the total upload size
+            cancel_event (threading.Event): Optional; set it to stop
+                uploading or waiting (the backend finishes the job)
+            
+        Returns:
+            dict: Same statistics as upload_and_analyze_csv()
+            
+        Raises:
+            UploadCancelled: If cancel_event was set
+        """
+        job = self.start_async_analysis(
+            file_path, upload_callback=upload_callback, cancel_event=cancel_event
+        )
+        
+        while job['status'] not in ('done', 'failed'):
+            if progress_callback:
+                progress_callback(job['rows_processed'])
+            if cancel_event is not None:
+                if cancel_event.wait(poll_interval):
+                    raise UploadCancelled("Upload cancelled")
+            else:
+                time.sleep(poll_interval)
+            job = self.get_job(job['id'])
+        
+        if job['status'] == 'failed':
+            raise ValueError(f"Backend error: {job['error']}")
+        
+        if progress_callback:
+            progress_callback(job['rows_processed'])
+        return job['result']
+    
+    def create_dataset(self, file_path, end=None, cancel_event=None):
+        """
+        Upload a CSV file once and store it on the backend as a dataset.
+        
+        Args:
+            file_path (str): Full path to CSV file
+            end (int): Optional; send only the bytes before this offset
+                (the complete rows of a file that is still being written)
+            cancel_event (threading.Event): Optional; set it to cancel
+            
+        Returns:
+            dict: Dataset data from backend; 'size_bytes' is the byte
+                offset to continue from with append_to_dataset(), and
+                'summary' has the same keys as upload_and_analyze_csv()
+        """
+        try:
+            with open(file_path, 'rb') as csv_file:
+                upload = csv_file if end is None else FileSlice(csv_file, 0, end)
+                response = self._upload(
+                    'POST',
+                    self.datasets_endpoint,
+                    [('file', (os.path.basename(file_path), upload))],
+                    params=self._summary_params(),
+                    cancel_event=cancel_event
+                )
+            
+            if response.status_code == 201:
+                return response.json()
+            else:
+                error_data = response.json()
+                error_message = error_data.get('error', 'Unknown error occurred')
+                raise ValueError(f"Backend error: {error_message}")
+                
+        except FileNotFoundError:
+            raise FileNotFoundError(f"CSV file not found: {file_path}")
+    
+    def append_to_dataset(self, dataset_id, file_path, offset, end=None, cancel_event=None):
+        """
+        Send only the rows appended to a growing CSV since the last upload.
+        
+        Args:
+            dataset_id (str): ID returned by create_dataset()
+            file_path (str): Full path to the (grown) CSV file
+            offset (int): 'size_bytes' of the dataset from the previous
+                create_dataset() or append_to_dataset() call
+            end (int): Optional; send only the bytes before this offset
+            cancel_event (threading.Event): Optional; set it to cancel
+            
+        Returns:
+            dict: Updated dataset data, with the summary of the whole file
+        """
+        try:
+            with open(file_path, 'rb') as csv_file:
+                # Upload starts at the offset: only the new bytes are sent
+                csv_file.seek(offset)
+                upload = csv_file if end is None else FileSlice(csv_file, offset, end)
+                response = self._upload(
+                    'PATCH',
+                    f"{self.datasets_endpoint}{dataset_id}/append/",
+                    [('file', (os.path.basename(file_path), upload))],
+                    fields={'offset': str(offset)},
+                    params=self._summary_params(),
+                    cancel_event=cancel_event
+                )
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                error_data = response.json()
+                error_message = error_data.get('error', 'Unknown error occurred')
+                raise ValueError(f"Backend error: {error_message}")
+                
+        except FileNotFoundError:
+            raise FileNotFoundError(f"CSV file not found: {file_path}")
+    
+    def stream_dataset(self, dataset_id, cancel_event=None):
+        """
+        Follow the statistics of a dataset while rows are added to it.
+        
+        Reads the backend's Server-Sent Events stream
+        (/api/datasets/<id>/stream/): the current statistics first, then
+        changes at most about once a second, merged into the previous
+        statistics here (see merge_delta). Ends when the cancel event is set or the dataset
+        is deleted.
+        
+        Args:
+            dataset_id (str): ID returned by create_dataset()
+            cancel_event (threading.Event): Optional; set it to stop (checked
+                whenever data or a keepalive arrives)
+            
+        Yields:
+            dict: Full statistics, with the same keys as
+                upload_and_analyze_csv() returns
+                
+        Raises:
+            ConnectionError: If the stream cannot be opened or is lost
+            ValueError: If the backend rejects the request
+        """
+        response = self._request(
+            'GET',
+            f"{self.datasets_endpoint}{dataset_id}/stream/",
+            params=self._summary_params(),
+            stream=True,
+            timeout=(self.connect_timeout, STREAM_READ_TIMEOUT)
+        )
+        with response:
+            if response.status_code != 200:
+                error_data = response.json()
+                error_message = error_data.get('error', 'Unknown error occurred')
+                raise ValueError(f"Backend error: {error_message}")
+            
+            summary = None
+            buffer = b''
+            while cancel_event is None or not cancel_event.is_set():
+                try:
+                    # Whatever has arrived, without waiting for more
+                    data = response.raw.read1(UPLOAD_CHUNK_SIZE)
+                except Exception as e:
+                    raise ConnectionError(f"Live stream lost: {e}")
+                if not data:
+                    raise ConnectionError("Live stream closed by the backend")
+                
+                buffer += data
+                *messages, buffer = buffer.split(b'\n\n')
+                for message in messages:
+                    event, payload = None, None
+                    for line in message.decode('utf-8').splitlines():
+                        if line.startswith('event:'):
+                            event = line[len('event:'):].strip()
+                        elif line.startswith('data:'):
+                            payload = json.loads(line[len('data:'):])
+                    
+                    if event == 'summary':
+                        summary = payload
+                    elif event == 'delta' and summary is not None:
+                        summary = merge_delta(summary, payload)
+                    elif event == 'deleted':
+                        return
+                    else:
+                        # Keepalive comment
+                        continue
+                    yield summary
+    
+    def check_backend_status(self, max_age=None):
         """
         Check if backend server is running.
         
+        The result is reused for health_check_ttl seconds, and every other
+        API call refreshes it, so this rarely sends a request.
+        
+        Args:
+            max_age (float): Oldest cached result to accept, in seconds;
+                defaults to health_check_ttl (0 always checks)
+        
         Returns:
             bool: True if backend is reachable, False otherwise
         """
+        if max_age is None:
+            max_age = self.health_check_ttl
+        with self._status_lock:
+            status = self._backend_status
+        if status is not None and time.monotonic() - status[0] < max_age:
+            return status[1]
+        
+        _, probe_session = self._sessions()
+        import requests
+        
         try:
-            response = requests.get(self.base_url, timeout=2)
-            return True
-        except:
-            return False
+            probe_session.head(self.base_url, timeout=(2, 2), allow_redirects=False)
+            running = True
+        except requests.exceptions.RequestException:
+            running = False
+        self._set_backend_status(running)
+        return running
 
 
 # Example usage (for testing)
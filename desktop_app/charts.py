@@ -5,6 +5,8 @@ This module creates Matplotlib charts for displaying equipment data.
 Charts are embedded directly into PyQt5 windows.
 """
 
+import heapq
+
 import matplotlib
 matplotlib.use('Qt5Agg')  # Use Qt5 backend for PyQt5 integration
 
@@ -12,14 +14,84 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
 
+# Most bars in the equipment chart; the remaining types are summed up in
+# one "Other" bar, so files with thousands of types still plot quickly
+MAX_BARS = 40
+
+# Least width of one bar in pixels: with many bars the chart grows wider
+# than the window and scrolls sideways
+BAR_PIXELS = 28
+
+# Bar colors, repeated when there are more types than colors
+BAR_COLORS = [
+    '#3498db',  # Blue
+    '#2ecc71',  # Green
+    '#9b59b6',  # Purple
+    '#f39c12',  # Orange
+    '#e74c3c',  # Red
+    '#1abc9c',  # Turquoise
+    '#34495e',  # Dark gray
+]
+OTHER_COLOR = '#bdc3c7'  # Light gray
+
+
+def top_types(equipment_by_type, other=None, max_bars=MAX_BARS):
+    """
+    Pick the bars to plot: the most common types, highest count first,
+    and one "Other" bar for everything else.
+    
+    Args:
+        equipment_by_type (dict): Dictionary mapping equipment type to count
+        other (dict): equipment_by_type_other from the backend ('types'
+            and 'count' of the types it left out), or None
+        max_bars (int): Most types to plot, not counting "Other"
+    
+    Returns:
+        tuple: (labels, counts, has_other); the "Other (k types)" bar,
+        if any, is last
+    """
+    shown = heapq.nlargest(max_bars, equipment_by_type.items(), key=lambda item: item[1])
+    labels = [equipment_type for equipment_type, _ in shown]
+    counts = [count for _, count in shown]
+    
+    other_types = len(equipment_by_type) - len(shown)
+    other_count = sum(equipment_by_type.values()) - sum(counts)
+    if other:
+        other_types += other['types']
+        other_count += other['count']
+    if other_types:
+        labels.append(f"Other ({other_types} type{'' if other_types == 1 else 's'})")
+        counts.append(other_count)
+    return labels, counts, bool(other_types)
+
+
 class EquipmentDistributionChart(FigureCanvas):
     """
     A bar chart showing equipment distribution by type.
     
+    Bars are sorted by count when the chart is built. At most MAX_BARS
+    types are plotted, the rest are summed up in an "Other" bar; the chart's minimum width grows with
+    the number of bars, so inside a QScrollArea it scrolls sideways
+    instead of squeezing the labels together.
+    
     This class inherits from FigureCanvas, making it a PyQt5 widget
     that can be embedded directly in the application window.
+    
+    Results that refresh often (live or batch results) usually keep the
+    same types and only change the counts. Then the bars keep their order
+    (even if the types swap ranks), and the existing bars and labels are
+    updated and blitted onto a cached background of the axes,
+    instead of rebuilding and relaying out the whole figure. The bars and
+    labels are "animated" artists for that reason: a full draw renders
+    everything else, and they are drawn on top afterwards (_on_draw).
     """
     
+    # Y axis top as a multiple of the tallest bar after a rescale, and the
+    # least room that must stay above it for the value labels (blitting
+    # only redraws the axes area, so labels must not stick out of it)
+    HEADROOM = 1.3
+    LABEL_ROOM = 1.1
+    
     def __init__(self, parent=None, width=8, height=5, dpi=100):
         """
         Initialize the chart canvas.
@@ -41,17 +113,115 @@ class EquipmentDistributionChart(FigureCanvas):
         
         # Create the subplot (axis)
         self.axes = self.figure.add_subplot(111)
+        
+        # Plotted types (without "Other"), x tick labels, bars and value labels
+        self.types = None
+        self.has_other = False
+        self.tick_labels = []
+        self.bars = []
+        self.value_labels = []
+        
+        # Axes area without the bars, captured after every full draw
+        self.background = None
+        self.mpl_connect('draw_event', self._on_draw)
     
-    def plot_equipment_distribution(self, equipment_by_type):
+    def plot_equipment_distribution(self, equipment_by_type, other=None):
         """
         Plot equipment distribution as a bar chart.
         
+        If the same types are plotted as in the last plot, only the changed
+        bars are updated (see update_counts), in the order they were
+        plotted in, and the "Other" label gets its new type count;
+        otherwise the chart is rebuilt.
+        
         Args:
             equipment_by_type (dict): Dictionary mapping equipment type to count
                 Example: {'Pump': 10, 'Reactor': 9, 'Heater': 6}
+            other (dict): equipment_by_type_other from the backend, if it
+                sent only the top types
+        """
+        types, counts, has_other = top_types(equipment_by_type, other)
+        shown = types[:-1] if has_other else types
+        if not shown or has_other != self.has_other or set(shown) != set(self.types or ()):
+            self.rebuild(dict(zip(types, counts)), has_other)
+            return
+        
+        by_type = dict(zip(shown, counts))
+        ordered = [by_type[equipment_type] for equipment_type in self.types]
+        other_label = None
+        if has_other:
+            ordered.append(counts[-1])
+            other_label = types[-1]
+        self.update_counts(ordered, other_label)
+    
+    def update_counts(self, counts, other_label=None):
+        """
+        Change the bar heights without rebuilding the chart.
+        
+        Args:
+            counts (list): New counts, in the order of the plotted bars
+            other_label (str): New text of the "Other" bar's tick label
+        """
+        relabeled = other_label is not None and other_label != self.tick_labels[-1]
+        if relabeled:
+            self.tick_labels[-1] = other_label
+            self.axes.set_xticks(range(len(self.tick_labels)), self.tick_labels)
+        
+        changed = False
+        for bar, label, count in zip(self.bars, self.value_labels, counts):
+            if bar.get_height() != count:
+                bar.set_height(count)
+                label.set_y(count)
+                label.set_text(f'{int(count)}')
+                changed = True
+        if not changed and not relabeled:
+            return
+        
+        # A new y range changes the tick labels: full draw, but no relayout
+        top = self.axes.get_ylim()[1]
+        tallest = max(counts)
+        if tallest * self.LABEL_ROOM > top or tallest * self.HEADROOM < top / 2:
+            self.axes.set_ylim(0, max(tallest * self.HEADROOM, 1))
+            self.draw_idle()
+            return
+        
+        if relabeled or self.background is None:
+            # Tick labels are outside the blitted axes area, or a full
+            # draw is pending anyway; it will show the new heights
+            self.draw_idle()
+            return
+        
+        self.restore_region(self.background)
+        self._draw_bars()
+        self.blit(self.axes.bbox)
+    
+    def _draw_bars(self):
+        for artist in self.bars + self.value_labels:
+            self.axes.draw_artist(artist)
+    
+    def _on_draw(self, event):
+        # Cache the axes without the bars, then draw them on top
+        self.background = self.copy_from_bbox(self.axes.bbox)
+        self._draw_bars()
+    
+    def rebuild(self, equipment_by_type, has_other=False):
+        """
+        Plot the chart from scratch.
+        
+        Args:
+            equipment_by_type (dict): Dictionary mapping bar label to
+                count, in plot order (see top_types)
+            has_other (bool): The last bar is the "Other" bar
         """
         # Clear previous plot
         self.axes.clear()
+        self.types = None
+        self.has_other = False
+        self.tick_labels = []
+        self.bars = []
+        self.value_labels = []
+        self.background = None
+        self.setMinimumWidth(0)
         
         if not equipment_by_type:
             # No data to plot
@@ -63,33 +233,36 @@ class EquipmentDistributionChart(FigureCanvas):
                 fontsize=14,
                 color='gray'
             )
-            self.draw()
+            self.draw_idle()
             return
         
         # Extract equipment types and counts
         types = list(equipment_by_type.keys())
         counts = list(equipment_by_type.values())
         
-        # Define colors for bars
-        colors = [
-            '#3498db',  # Blue
-            '#2ecc71',  # Green
-            '#9b59b6',  # Purple
-            '#f39c12',  # Orange
-            '#e74c3c',  # Red
-            '#1abc9c',  # Turquoise
-            '#34495e',  # Dark gray
-        ]
-        
-        # Create bar chart
+        # Colors for bars ("Other" is always gray)
+        colors = [BAR_COLORS[index % len(BAR_COLORS)] for index in range(len(types))]
+        if has_other:
+            colors[-1] = OTHER_COLOR
+        
+        # Create bar chart (at numbered positions, so that the "Other"
+        # tick label can be changed later)
+        positions = range(len(types))
         bars = self.axes.bar(
-            types,
+            positions,
             counts,
-            color=colors[:len(types)],
+            color=colors,
             edgecolor='black',
             linewidth=1.2,
             alpha=0.8
         )
+        self.axes.set_xticks(positions, types)
+        self.types = types[:-1] if has_other else types
+        self.has_other = has_other
+        self.tick_labels = types
+        self.bars = list(bars)
+        for bar in self.bars:
+            bar.set_animated(True)
         
         # Customize the chart
         self.axes.set_xlabel('Equipment Type', fontsize=12, fontweight='bold')
@@ -101,28 +274,35 @@ class EquipmentDistributionChart(FigureCanvas):
             pad=20
         )
         
-        # Add value labels on top of bars
-        for bar in bars:
+        # Add value labels on top of bars (upright when bars are narrow)
+        crowded = len(types) > 12
+        for bar in self.bars:
             height = bar.get_height()
-            self.axes.text(
+            label = self.axes.text(
                 bar.get_x() + bar.get_width() / 2.0,
                 height,
                 f'{int(height)}',
                 ha='center',
                 va='bottom',
-                fontsize=10,
-                fontweight='bold'
+                fontsize=8 if crowded else 10,
+                fontweight='bold',
+                rotation=90 if crowded else 0,
+                animated=True
             )
+            self.value_labels.append(label)
         
-        # Set y-axis to start at 0 and use integer ticks
-        self.axes.set_ylim(bottom=0)
+        # Set y-axis to start at 0, with room for the value labels, and
+        # use integer ticks
+        self.axes.set_ylim(0, max(max(counts) * self.HEADROOM, 1))
         
         # Make y-axis show only integers
         import matplotlib.ticker as ticker
         self.axes.yaxis.set_major_locator(ticker.MaxNLocator(integer=True))
         
         # Rotate x-axis labels if there are many types
-        if len(types) > 4:
+        if crowded:
+            self.axes.tick_params(axis='x', rotation=90)
+        elif len(types) > 4:
             self.axes.tick_params(axis='x', rotation=45)
         
         # Add grid for better readability
@@ -131,12 +311,118 @@ class EquipmentDistributionChart(FigureCanvas):
         # Tight layout to prevent label cutoff
         self.figure.tight_layout()
         
-        # Redraw the canvas
-        self.draw()
+        # Keep bars readable: grow wider (and scroll) rather than squeeze
+        self.setMinimumWidth(len(types) * BAR_PIXELS)
+        
+        # Redraw the canvas (once control returns to the event loop)
+        self.draw_idle()
+    
+    def resizeEvent(self, event):
+        """
+        Fit the layout to the new size (the chart grows with its bars).
+        """
+        super().resizeEvent(event)
+        if self.tick_labels:
+            self.figure.tight_layout()
     
     def clear_chart(self):
         """Clear the chart."""
         self.axes.clear()
+        self.types = None
+        self.has_other = False
+        self.tick_labels = []
+        self.bars = []
+        self.value_labels = []
+        self.setMinimumWidth(0)
+        self.draw_idle()
+
+
+class SensorDistributionChart(FigureCanvas):
+    """
+    Histograms of flowrate, pressure and temperature, side by side.
+    
+    The backend sends binned counts and percentiles (the "distributions"
+    part of the analysis results), so no raw rows are needed here.
+    """
+    
+    # Column name -> (axis label, bar color)
+    COLUMNS = {
+        'flowrate': ('Flowrate', '#3498db'),
+        'pressure': ('Pressure', '#2ecc71'),
+        'temperature': ('Temperature', '#e74c3c'),
+    }
+    
+    def __init__(self, parent=None, width=8, height=3, dpi=100):
+        """
+        Initialize the chart canvas with one subplot per column.
+        
+        Args:
+            parent: Parent Qt widget
+            width (int): Figure width in inches
+            height (int): Figure height in inches
+            dpi (int): Dots per inch (resolution)
+        """
+        self.figure = Figure(figsize=(width, height), dpi=dpi)
+        super().__init__(self.figure)
+        self.setParent(parent)
+        
+        self.axes = {
+            column: self.figure.add_subplot(1, len(self.COLUMNS), index + 1)
+            for index, column in enumerate(self.COLUMNS)
+        }
+    
+    def plot_distributions(self, distributions):
+        """
+        Plot one histogram per column with p50/p95/p99 markers.
+        
+        Args:
+            distributions (dict): Column name -> {'p50', 'p95', 'p99',
+                'histogram': {'edges': [...], 'counts': [...]}}
+        """
+        for column, (label, color) in self.COLUMNS.items():
+            axes = self.axes[column]
+            axes.clear()
+            
+            distribution = distributions.get(column) or {}
+            histogram = distribution.get('histogram') or {}
+            edges = histogram.get('edges') or []
+            counts = histogram.get('counts') or []
+            
+            if not counts:
+                axes.text(
+                    0.5, 0.5, 'No data',
+                    horizontalalignment='center',
+                    verticalalignment='center',
+                    transform=axes.transAxes,
+                    color='gray'
+                )
+                axes.set_title(label, fontsize=11, fontweight='bold')
+                continue
+            
+            # Bars start at the left bin edge and span the bin width
+            widths = [right - left for left, right in zip(edges[:-1], edges[1:])]
+            axes.bar(edges[:-1], counts, width=widths, align='edge',
+                     color=color, edgecolor='black', linewidth=0.5, alpha=0.8)
+            
+            # Percentile markers
+            for key, style in (('p50', '-'), ('p95', '--'), ('p99', ':')):
+                if distribution.get(key) is not None:
+                    axes.axvline(distribution[key], color='#2c3e50', linestyle=style,
+                                 linewidth=1.2, label=f'{key} = {distribution[key]}')
+            
+            axes.set_title(label, fontsize=11, fontweight='bold')
+            axes.set_ylabel('Rows', fontsize=9)
+            axes.tick_params(labelsize=8)
+            axes.legend(fontsize=7)
+            axes.grid(axis='y', alpha=0.3, linestyle='--')
+        
+        self.figure.tight_layout()
+        self.draw_idle()
+    
+    def clear_chart(self):
+        """Clear all histograms."""
+        for axes in self.axes.values():
+            axes.clear()
         self.draw()
 
 
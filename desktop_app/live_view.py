@@ -0,0 +1,181 @@
+"""
+Live View of a Growing CSV File
+
+LiveFileWatcher uploads a sensor log once as a backend dataset, then
+checks the file every second and sends only the complete rows appended
+since (PATCH /api/datasets/<id>/append/ with the byte offset, so no row
+is sent twice or skipped).
+
+LiveStreamWorker subscribes to the dataset's statistics stream
+(/api/datasets/<id>/stream/) and emits every update. The backend sends
+at most about one update per second, however fast rows arrive, and
+other clients (the web app) can follow the same dataset.
+"""
+
+import os
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from api_client import UploadCancelled
+
+
+# Seconds between checks of the watched file for new rows
+WATCH_INTERVAL = 1.0
+
+# Seconds to wait before reopening a lost stream
+RECONNECT_DELAY = 2.0
+
+# Bytes read at a time when looking for the end of the last complete row
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def complete_rows_end(file_path, offset):
+    """
+    Find the end of the last complete row after an offset.
+
+    A logger may be in the middle of writing a row; that row is sent the
+    next time, once its line break is there.
+
+    Args:
+        file_path (str): Full path to the CSV file
+        offset (int): Byte offset up to which rows were already sent
+
+    Returns:
+        int or None: Byte offset just after the last line break, or None
+        if there is no complete new row
+    """
+    with open(file_path, 'rb') as csv_file:
+        position = csv_file.seek(0, os.SEEK_END)
+        while position > offset:
+            start = max(offset, position - TAIL_BLOCK_SIZE)
+            csv_file.seek(start)
+            block = csv_file.read(position - start)
+            line_break = block.rfind(b'\n')
+            if line_break != -1:
+                return start + line_break + 1
+            position = start
+    return None
+
+
+def data_rows_end(file_path):
+    """
+    Find the end of the last complete data row of a file.
+    
+    The header line alone is not enough: a dataset needs at least one
+    row, or its statistics are empty.
+    
+    Args:
+        file_path (str): Full path to the CSV file
+        
+    Returns:
+        int or None: Byte offset just after the last line break, or None
+        if there is no complete header line followed by a complete row
+    """
+    with open(file_path, 'rb') as csv_file:
+        header = csv_file.readline(TAIL_BLOCK_SIZE)
+    if not header.endswith(b'\n'):
+        return None
+    return complete_rows_end(file_path, len(header))
+
+
+class LiveFileWatcher(QThread):
+    """
+    Background thread that keeps a dataset in step with a growing file.
+    """
+
+    waiting_for_rows = pyqtSignal()   # Emits once if the file has no data rows yet
+    dataset_ready = pyqtSignal(str)   # Emits dataset ID once the file is uploaded
+    rows_sent = pyqtSignal(int)       # Emits rows in the dataset after an append
+    watch_error = pyqtSignal(str)     # Emits error message; watching stops
+
+    def __init__(self, api_client, file_path, interval=WATCH_INTERVAL):
+        super().__init__()
+        self.api_client = api_client
+        self.file_path = file_path
+        self.interval = interval
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        """
+        Stop watching (safe from any thread).
+        """
+        self.stop_event.set()
+
+    def run(self):
+        """
+        This method runs in background thread.
+        """
+        try:
+            end = data_rows_end(self.file_path)
+            if end is None:
+                self.waiting_for_rows.emit()
+            while end is None:
+                if self.stop_event.wait(self.interval):
+                    return
+                end = data_rows_end(self.file_path)
+            dataset = self.api_client.create_dataset(self.file_path, end=end, cancel_event=self.stop_event)
+            dataset_id = dataset['id']
+            offset = end
+            self.dataset_ready.emit(dataset_id)
+
+            while not self.stop_event.wait(self.interval):
+                if os.path.getsize(self.file_path) < offset:
+                    raise ValueError("The file got shorter; was it replaced?")
+                end = complete_rows_end(self.file_path, offset)
+                if end is None:
+                    continue
+                dataset = self.api_client.append_to_dataset(
+                    dataset_id, self.file_path, offset, end=end, cancel_event=self.stop_event
+                )
+                offset = end
+                self.rows_sent.emit(dataset['row_count'])
+        except UploadCancelled:
+            pass
+        except Exception as e:
+            self.watch_error.emit(str(e))
+
+
+class LiveStreamWorker(QThread):
+    """
+    Background thread that follows a dataset's statistics stream.
+
+    The backend sends changes only; stream_dataset() merges them (nested
+    dictionaries included), so every summary_updated signal carries the
+    full statistics. A lost connection is reopened after RECONNECT_DELAY;
+    the backend then sends the full statistics again.
+    """
+
+    summary_updated = pyqtSignal(dict)  # Emits the latest full statistics
+    stream_lost = pyqtSignal(str)       # Emits error message; reconnecting
+    stream_ended = pyqtSignal(str)      # Emits why the stream stopped for good
+
+    def __init__(self, api_client, dataset_id):
+        super().__init__()
+        self.api_client = api_client
+        self.dataset_id = dataset_id
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        """
+        Stop following the stream (safe from any thread).
+        """
+        self.stop_event.set()
+
+    def run(self):
+        """
+        This method runs in background thread.
+        """
+        while not self.stop_event.is_set():
+            try:
+                for summary in self.api_client.stream_dataset(self.dataset_id, cancel_event=self.stop_event):
+                    self.summary_updated.emit(summary)
+                if not self.stop_event.is_set():
+                    self.stream_ended.emit("The dataset was deleted")
+                return
+            except ConnectionError as e:
+                self.stream_lost.emit(str(e))
+                self.stop_event.wait(RECONNECT_DELAY)
+            except Exception as e:
+                self.stream_ended.emit(str(e))
+                return
@@ -0,0 +1,172 @@
+"""
+Local Analysis Without the Backend
+
+This module analyzes files on this computer with the backend's own
+analysis engine (analyzer.engine in equipment-visualizer/backend), so no
+running backend, multipart upload or JSON round trip is needed. The
+result is the same dictionary /api/analyze/ returns.
+
+The analysis runs in a separate process: parsing a large file does not
+slow down the UI, and cancelling simply stops the process. The engine
+needs pandas and numpy (and pyarrow for its fast path) in the desktop
+environment, but not Django.
+"""
+
+import importlib
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+# Backend source tree with the analyzer package; override with the
+# EQUIPMENT_BACKEND_DIR environment variable
+BACKEND_DIR = os.environ.get(
+    'EQUIPMENT_BACKEND_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'equipment-visualizer', 'backend')
+)
+
+# Seconds between checks for results and cancellation
+POLL_INTERVAL = 0.1
+
+
+def is_available():
+    """
+    Check if the analysis engine can be found.
+
+    Returns:
+        bool: True if the backend source tree is there
+    """
+    return os.path.isfile(os.path.join(BACKEND_DIR, 'analyzer', 'engine.py'))
+
+
+def import_engine(backend_dir=BACKEND_DIR):
+    """
+    Import the backend's analysis engine into this process.
+
+    Merging partial aggregates is cheap, so unlike analyze_files() it
+    does not need a process of its own.
+
+    Returns:
+        module: analyzer.engine, or None if it cannot be imported (no
+        backend source tree, or pandas/numpy missing)
+    """
+    if not os.path.isfile(os.path.join(backend_dir, 'analyzer', 'engine.py')):
+        return None
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+    try:
+        return importlib.import_module('analyzer.engine')
+    except ImportError:
+        return None
+
+
+def analyze_files(file_paths, messages, backend_dir=BACKEND_DIR, top_n=None):
+    """
+    Analyze files and put the combined statistics on a queue.
+
+    Runs in the analysis process. Puts ('progress', rows) after every
+    chunk, then ('result', dict) or ('error', message).
+
+    Args:
+        file_paths (list): Full paths to CSV (or compressed, Parquet or
+            Arrow) files
+        messages (multiprocessing.Queue): Where to put the messages
+        backend_dir (str): Backend source tree with the analyzer package
+        top_n (int): Equipment types in the result, or None for all
+    """
+    file_path = None
+    try:
+        sys.path.insert(0, backend_dir)
+        from analyzer.engine import SummaryAggregator, analyze_path
+
+        combined = SummaryAggregator()
+        for file_path in file_paths:
+            rows_before = combined.total_rows
+            summary = analyze_path(
+                file_path,
+                progress=lambda rows: messages.put(('progress', rows_before + rows))
+            )
+            combined.merge(summary)
+        messages.put(('result', combined.to_response(top_n)))
+    except Exception as e:
+        name = os.path.basename(file_path) if file_path else "Local analysis"
+        messages.put(('error', f"{name}: {e}"))
+
+
+class LocalAnalysisWorker(QThread):
+    """
+    Background thread that runs and watches the analysis process.
+
+    Emits the same signals as ui_main.UploadWorker, so the main window
+    handles both the same way.
+    """
+
+    upload_complete = pyqtSignal(dict)  # Emits results when successful
+    upload_error = pyqtSignal(str)      # Emits error message on failure
+    upload_progress = pyqtSignal(int)   # Emits rows processed so far
+    upload_cancelled = pyqtSignal()     # Emitted when cancel() stopped the analysis
+
+    def __init__(self, file_paths, top_n=None):
+        super().__init__()
+        self.file_paths = file_paths
+        self.top_n = top_n
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """
+        Stop the analysis (safe from any thread).
+        """
+        self.cancel_event.set()
+
+    def run(self):
+        """
+        This method runs in background thread.
+        """
+        # A fresh interpreter: forking a process that runs Qt is unsafe
+        context = multiprocessing.get_context('spawn')
+        messages = context.Queue()
+        process = context.Process(
+            target=analyze_files,
+            args=(self.file_paths, messages, BACKEND_DIR, self.top_n),
+            daemon=True
+        )
+        try:
+            process.start()
+        except Exception as e:
+            self.upload_error.emit(f"Cannot start local analysis: {e}")
+            return
+
+        try:
+            while True:
+                if self.cancel_event.is_set():
+                    process.terminate()
+                    self.upload_cancelled.emit()
+                    return
+
+                try:
+                    kind, value = messages.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    if process.is_alive():
+                        continue
+                    # The process has ended: its last message (if any)
+                    # is already in the queue
+                    try:
+                        kind, value = messages.get(timeout=POLL_INTERVAL)
+                    except queue.Empty:
+                        self.upload_error.emit("Local analysis process stopped unexpectedly")
+                        return
+
+                if kind == 'progress':
+                    self.upload_progress.emit(value)
+                elif kind == 'result':
+                    self.upload_complete.emit(value)
+                    return
+                else:
+                    self.upload_error.emit(value)
+                    return
+        finally:
+            process.join(timeout=5)
@@ -5,29 +5,105 @@ Main Entry Point
 This is the entry point for the PyQt5 desktop application.
 It initializes the Qt application and displays the main window.
 
+Run with --profile-startup to print how long the imports took and when
+the window was first painted, then exit; add --startup-budget MS to exit
+with an error when the first paint took longer.
+
 Author: Desktop Application Team
 Version: 1.0.0
 """
 
+import argparse
 import sys
+import time
+
+# Taken before the Qt and application imports, for --profile-startup
+START_TIME = time.perf_counter()
+STARTUP_MARKS = []
+
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QObject, QEvent, QTimer
+STARTUP_MARKS.append(("import PyQt5", time.perf_counter()))
 
 from ui_main import MainWindow
+STARTUP_MARKS.append(("import ui_main", time.perf_counter()))
+
+
+# Modules startup leaves out; --profile-startup reports if they were
+# loaded before the first paint anyway
+LAZY_MODULES = ('matplotlib', 'requests')
+
+
+class StartupProfiler(QObject):
+    """
+    Reports startup times once the main window is first painted.
+    """
+    
+    def __init__(self, app, window, marks, budget_ms=None):
+        super().__init__()
+        self.app = app
+        self.window = window
+        self.marks = marks
+        self.budget_ms = budget_ms
+        self.painted = False
+        window.installEventFilter(self)
+    
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QEvent.Paint and not self.painted:
+            self.painted = True
+            # Report after this paint has finished
+            QTimer.singleShot(0, self.report)
+        return False
+    
+    def report(self):
+        """
+        Print the startup times and quit the application.
+        """
+        first_paint = time.perf_counter()
+        previous = START_TIME
+        print("Startup profile (ms since start / ms for this step):")
+        for label, moment in self.marks + [("first paint", first_paint)]:
+            print(f"  {label:<20} {(moment - START_TIME) * 1000:8.1f} {(moment - previous) * 1000:8.1f}")
+            previous = moment
+        
+        loaded = [name for name in LAZY_MODULES if name in sys.modules]
+        print(f"  loaded before first paint: {', '.join(loaded) if loaded else 'none of ' + ', '.join(LAZY_MODULES)}")
+        
+        total_ms = (first_paint - START_TIME) * 1000
+        if self.budget_ms is not None and total_ms > self.budget_ms:
+            print(f"✗ First paint after {total_ms:.0f} ms, over the budget of {self.budget_ms:.0f} ms")
+            self.app.exit(1)
+        else:
+            self.app.exit(0)
+
+
+def parse_arguments():
+    """
+    Parse the application's own options; the rest is passed to Qt.
+    """
+    parser = argparse.ArgumentParser(description="Chemical Equipment Parameter Visualizer")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print import and first-paint times, then exit")
+    parser.add_argument('--startup-budget', type=float, metavar='MS',
+                        help="with --profile-startup: exit with an error if the "
+                             "first paint takes longer than MS milliseconds")
+    return parser.parse_known_args()
 
 
 def main():
     """
     Main function to launch the desktop application.
     """
+    options, qt_arguments = parse_arguments()
+    
     # Enable high DPI scaling for better display on high-resolution screens
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
     
     # Create Qt application instance
     # sys.argv allows passing command-line arguments to the app
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_arguments)
     
     # Set application metadata
     app.setApplicationName("Chemical Equipment Parameter Visualizer")
@@ -36,7 +112,13 @@ def main():
     
     # Create and show main window
     window = MainWindow()
+    STARTUP_MARKS.append(("create window", time.perf_counter()))
     window.show()
+    STARTUP_MARKS.append(("show window", time.perf_counter()))
+    
+    if options.profile_startup or options.startup_budget is not None:
+        app.startup_profiler = StartupProfiler(app, window, STARTUP_MARKS, options.startup_budget)
+        sys.exit(app.exec_())
     
     # Print startup message to console
     print("=" * 60)
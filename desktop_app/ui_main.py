@@ -5,16 +5,39 @@ This module contains the main window and all UI components.
 It handles user interactions and displays results from the backend.
 """
 
+import importlib
+import os
+import threading
+
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFileDialog, QGroupBox,
-    QGridLayout, QMessageBox, QFrame
+    QGridLayout, QMessageBox, QFrame, QProgressBar,
+    QTableWidget, QTableWidgetItem, QSpinBox, QHeaderView, QAbstractItemView,
+    QCheckBox, QScrollArea
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import QObject, QRunnable, Qt, QThread, QThreadPool, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont
 
-from api_client import EquipmentAnalyzerAPI
-from charts import EquipmentDistributionChart
+from api_client import EquipmentAnalyzerAPI, UploadCancelled
+import local_analysis
+from live_view import LiveFileWatcher, LiveStreamWorker
+from upload_queue import (
+    UploadQueue, DEFAULT_CONCURRENCY, MAX_CONCURRENCY,
+    QUEUED, UPLOADING, DONE, FAILED, CANCELLED
+)
+
+
+# Modules imported by the preload thread; none of them may import Qt
+# (matplotlib's Qt backend is loaded in the main thread afterwards)
+PRELOAD_MODULES = ['numpy', 'matplotlib', 'matplotlib.figure']
+
+
+def format_average(value):
+    """
+    Format an average for display; files without rows have none.
+    """
+    return "—" if value is None else f"{value:.2f}"
 
 
 class UploadWorker(QThread):
@@ -27,36 +50,107 @@ class UploadWorker(QThread):
     # Signals to communicate with main thread
     upload_complete = pyqtSignal(dict)  # Emits results when successful
     upload_error = pyqtSignal(str)      # Emits error message on failure
+    upload_progress = pyqtSignal(int)   # Emits rows processed by the backend
+    bytes_sent = pyqtSignal(object, object)  # Emits bytes sent, total bytes (may exceed 2 GB)
+    upload_cancelled = pyqtSignal()     # Emitted when cancel() stopped the upload
     
-    def __init__(self, api_client, file_path):
+    def __init__(self, api_client, file_paths):
         super().__init__()
         self.api_client = api_client
-        self.file_path = file_path
+        self.file_paths = file_paths
+        self.cancel_event = threading.Event()
+    
+    def cancel(self):
+        """
+        Stop uploading or waiting for the backend (safe from any thread).
+        """
+        self.cancel_event.set()
     
     def run(self):
         """
         This method runs in background thread.
         """
         try:
-            # Upload CSV and get results
-            results = self.api_client.upload_and_analyze_csv(self.file_path)
+            if len(self.file_paths) > 1:
+                # Several files: one batch request, show the combined summary
+                batch = self.api_client.upload_and_analyze_many(
+                    self.file_paths,
+                    upload_callback=self.bytes_sent.emit,
+                    cancel_event=self.cancel_event
+                )
+                errors = [f"{f['file_name']}: {f['error']}" for f in batch['files'] if 'error' in f]
+                if len(errors) == len(batch['files']):
+                    raise ValueError("\n".join(errors))
+                results = batch['combined']
+            else:
+                # Upload CSV as a background job and wait for the results,
+                # reporting how many rows the backend has processed
+                results = self.api_client.analyze_csv_async(
+                    self.file_paths[0],
+                    progress_callback=self.upload_progress.emit,
+                    upload_callback=self.bytes_sent.emit,
+                    cancel_event=self.cancel_event
+                )
             # Emit success signal with results
             self.upload_complete.emit(results)
+        except UploadCancelled:
+            self.upload_cancelled.emit()
         except Exception as e:
             # Emit error signal with error message
             self.upload_error.emit(str(e))
 
 
+class BackendCheckSignals(QObject):
+    """
+    Signals of a BackendCheckTask (a QRunnable cannot have signals).
+    """
+    
+    checked = pyqtSignal(bool)  # Emits True if the backend is reachable
+
+
+class BackendCheckTask(QRunnable):
+    """
+    Checks whether the backend is running, in a QThreadPool thread.
+    
+    check_backend_status() may wait for a connection timeout, which
+    would freeze the window if it ran in the main thread.
+    """
+    
+    def __init__(self, api_client):
+        super().__init__()
+        # The window keeps the task until its signal has been handled
+        self.setAutoDelete(False)
+        self.api_client = api_client
+        self.signals = BackendCheckSignals()
+    
+    def run(self):
+        """
+        This method runs in a thread of the pool.
+        """
+        self.signals.checked.emit(self.api_client.check_backend_status())
+
+
 class MainWindow(QMainWindow):
     """
     Main application window for Chemical Equipment Parameter Visualizer.
     """
     
+    # Emitted by the preload thread when the non-Qt modules are imported
+    modules_loaded = pyqtSignal()
+    
     def __init__(self):
         super().__init__()
         
-        # Initialize API client
-        self.api_client = EquipmentAnalyzerAPI()
+        # Initialize API client (one connection per parallel upload, plus
+        # one for merges and single uploads)
+        self.api_client = EquipmentAnalyzerAPI(pool_size=MAX_CONCURRENCY + 1)
+        
+        # Queue for several files uploaded at the same time
+        self.upload_queue = UploadQueue(self.api_client)
+        self.upload_queue.file_changed.connect(self.on_queue_file_changed)
+        self.upload_queue.combined_updated.connect(self.on_combined_updated)
+        self.upload_queue.merge_failed.connect(lambda message: self.show_queue_status())
+        self.upload_queue.queue_finished.connect(self.on_queue_finished)
         
         # Initialize UI
         self.init_ui()
@@ -66,6 +160,19 @@ class MainWindow(QMainWindow):
         
         # Background worker thread
         self.upload_worker = None
+        
+        # Live mode: watcher of the growing file and its statistics stream
+        self.live_watcher = None
+        self.live_stream = None
+        self.live_dataset_id = None
+        
+        # matplotlib and requests are loaded after the first paint
+        self.modules_preloaded = False
+        self.modules_loaded.connect(self.load_chart_backend)
+        
+        # Backend check running before the file dialog opens
+        self.backend_check = None
+        self.status_before_check = ("", "")
     
     def init_ui(self):
         """
@@ -87,6 +194,7 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.create_header())
         main_layout.addWidget(self.create_upload_section())
         main_layout.addWidget(self.create_status_section())
+        main_layout.addWidget(self.create_queue_section())
         main_layout.addWidget(self.create_results_section())
         main_layout.addWidget(self.create_chart_section())
         
@@ -173,12 +281,68 @@ class MainWindow(QMainWindow):
         """)
         self.select_file_btn.clicked.connect(self.select_csv_file)
         
+        # Analyze on this computer instead of uploading to the backend
+        self.local_mode_checkbox = QCheckBox("Analyze locally (no backend needed)")
+        self.local_mode_checkbox.setEnabled(local_analysis.is_available())
+        if not local_analysis.is_available():
+            self.local_mode_checkbox.setToolTip(
+                f"Analysis engine not found in {local_analysis.BACKEND_DIR}"
+            )
+        
+        # Keep watching the file and update as rows are added to it
+        self.live_mode_checkbox = QCheckBox("Watch live (send new rows as the file grows)")
+        self.live_mode_checkbox.toggled.connect(self.on_live_mode_toggled)
+        
+        self.stop_live_btn = QPushButton("Stop Watching")
+        self.stop_live_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #e74c3c;
+                color: white;
+                font-weight: bold;
+                border-radius: 5px;
+                padding: 5px 15px;
+            }
+        """)
+        self.stop_live_btn.clicked.connect(self.stop_live)
+        self.stop_live_btn.setVisible(False)
+        
         # Selected file label
         self.selected_file_label = QLabel("No file selected")
         self.selected_file_label.setStyleSheet("color: #7f8c8d; font-style: italic;")
         
+        # Upload progress and cancel button, shown while uploading
+        self.upload_progress_bar = QProgressBar()
+        self.upload_progress_bar.setRange(0, 1000)
+        self.upload_progress_bar.setTextVisible(True)
+        
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #e74c3c;
+                color: white;
+                font-weight: bold;
+                border-radius: 5px;
+                padding: 5px 15px;
+            }
+            QPushButton:disabled {
+                background-color: #95a5a6;
+            }
+        """)
+        self.cancel_btn.clicked.connect(self.cancel_upload)
+        
+        progress_layout = QHBoxLayout()
+        progress_layout.addWidget(self.upload_progress_bar)
+        progress_layout.addWidget(self.cancel_btn)
+        self.progress_row = QWidget()
+        self.progress_row.setLayout(progress_layout)
+        self.progress_row.setVisible(False)
+        
         layout.addWidget(self.select_file_btn)
+        layout.addWidget(self.local_mode_checkbox)
+        layout.addWidget(self.live_mode_checkbox)
         layout.addWidget(self.selected_file_label)
+        layout.addWidget(self.stop_live_btn)
+        layout.addWidget(self.progress_row)
         
         return group_box
     
@@ -199,6 +363,67 @@ class MainWindow(QMainWindow):
         
         return self.status_label
     
+    def create_queue_section(self):
+        """
+        Create upload queue section with per-file status.
+        """
+        group_box = QGroupBox("Upload Queue")
+        group_box.setStyleSheet("""
+            QGroupBox {
+                font-weight: bold;
+                font-size: 14px;
+                border: 2px solid #f39c12;
+                border-radius: 5px;
+                margin-top: 10px;
+                padding-top: 10px;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                left: 10px;
+                padding: 0 5px;
+            }
+        """)
+        
+        layout = QVBoxLayout()
+        group_box.setLayout(layout)
+        
+        # Concurrency and cancel controls
+        controls_layout = QHBoxLayout()
+        controls_layout.addWidget(QLabel("Parallel uploads:"))
+        
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, MAX_CONCURRENCY)
+        self.concurrency_spin.setValue(DEFAULT_CONCURRENCY)
+        self.concurrency_spin.valueChanged.connect(self.upload_queue.set_concurrency)
+        controls_layout.addWidget(self.concurrency_spin)
+        controls_layout.addStretch()
+        
+        self.cancel_selected_btn = QPushButton("Cancel Selected")
+        self.cancel_selected_btn.clicked.connect(self.cancel_selected_files)
+        controls_layout.addWidget(self.cancel_selected_btn)
+        
+        self.cancel_all_btn = QPushButton("Cancel All")
+        self.cancel_all_btn.clicked.connect(self.upload_queue.cancel_all)
+        controls_layout.addWidget(self.cancel_all_btn)
+        
+        layout.addLayout(controls_layout)
+        
+        # One row per file: name, status, upload progress
+        self.queue_table = QTableWidget(0, 3)
+        self.queue_table.setHorizontalHeaderLabels(["File", "Status", "Progress"])
+        self.queue_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.queue_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.queue_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.queue_table.verticalHeader().setVisible(False)
+        self.queue_table.setMinimumHeight(150)
+        layout.addWidget(self.queue_table)
+        
+        # Initially hide queue section
+        group_box.setVisible(False)
+        self.queue_group = group_box
+        
+        return group_box
+    
     def create_results_section(self):
         """
         Create results display section with statistics.
@@ -316,10 +541,12 @@ class MainWindow(QMainWindow):
         
         layout = QVBoxLayout()
         group_box.setLayout(layout)
+        self.chart_layout = layout
         
-        # Create chart widget
-        self.chart = EquipmentDistributionChart(group_box, width=8, height=4)
-        layout.addWidget(self.chart)
+        # The chart widgets need matplotlib, which is slow to import; they
+        # are created with the first results (see create_charts)
+        self.chart = None
+        self.distribution_chart = None
         
         # Initially hide chart section
         group_box.setVisible(False)
@@ -327,12 +554,90 @@ class MainWindow(QMainWindow):
         
         return group_box
     
+    def create_charts(self):
+        """
+        Create the chart widgets, importing matplotlib on first use.
+        """
+        if self.chart is not None:
+            return
+        
+        from charts import EquipmentDistributionChart, SensorDistributionChart
+        
+        # Create chart widget, in a scroll area: with many equipment types
+        # the chart is wider than the window and scrolls sideways
+        self.chart = EquipmentDistributionChart(self.chart_group, width=8, height=4)
+        chart_scroll = QScrollArea(self.chart_group)
+        chart_scroll.setWidgetResizable(True)
+        chart_scroll.setFrameShape(QFrame.NoFrame)
+        chart_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        chart_scroll.setWidget(self.chart)
+        chart_scroll.setMinimumHeight(
+            self.chart.sizeHint().height() + chart_scroll.horizontalScrollBar().sizeHint().height()
+        )
+        self.chart_layout.addWidget(chart_scroll)
+        
+        # Histograms of the sensor columns, below the type chart
+        self.distribution_chart = SensorDistributionChart(self.chart_group, width=8, height=3)
+        self.chart_layout.addWidget(self.distribution_chart)
+    
+    def preload_modules(self):
+        """
+        Import the modules left out of startup in a background thread.
+        
+        Call this once the window is shown, so matplotlib and requests
+        are usually loaded before the user picks a file. Only modules
+        that do not touch Qt are imported in the thread; matplotlib's Qt
+        backend is imported afterwards in the main thread (see
+        load_chart_backend()). Widgets are created in the main thread by
+        create_charts().
+        """
+        def preload():
+            # numpy and the non-Qt parts of matplotlib take most of the time
+            for module in PRELOAD_MODULES:
+                importlib.import_module(module)
+            self.api_client.preload()
+            self.modules_loaded.emit()
+        
+        threading.Thread(target=preload, name='preload-modules', daemon=True).start()
+    
+    def load_chart_backend(self):
+        """
+        Import the chart module and matplotlib's Qt backend (main thread only).
+        """
+        importlib.import_module('charts')
+    
     def select_csv_file(self):
         """
-        Open file dialog to select CSV file and upload it.
+        Open file dialog to select CSV files and upload them.
+        
+        Unless the files are analyzed locally, the backend is checked
+        first, in the shared thread pool; the dialog opens when the
+        answer arrives (see on_backend_checked()).
         """
-        # Check if backend is running first
-        if not self.api_client.check_backend_status():
+        if self.local_mode_checkbox.isChecked():
+            self.open_file_dialog()
+            return
+        
+        self.select_file_btn.setEnabled(False)
+        self.status_before_check = (self.status_label.text(), self.status_label.styleSheet())
+        self.show_status("Checking backend connection...", "info")
+        
+        self.backend_check = BackendCheckTask(self.api_client)
+        self.backend_check.signals.checked.connect(self.on_backend_checked)
+        QThreadPool.globalInstance().start(self.backend_check)
+    
+    def on_backend_checked(self, running):
+        """
+        Handle the result of the backend check started by select_csv_file().
+        """
+        self.backend_check = None
+        self.select_file_btn.setEnabled(True)
+        text, style = self.status_before_check
+        self.status_label.setText(text)
+        self.status_label.setStyleSheet(style)
+        
+        if not running:
+            self.show_status("Backend not running", "error")
             QMessageBox.critical(
                 self,
                 "Backend Not Running",
@@ -343,51 +648,318 @@ class MainWindow(QMainWindow):
             )
             return
         
-        # Open file dialog
-        file_path, _ = QFileDialog.getOpenFileName(
+        self.open_file_dialog()
+    
+    def open_file_dialog(self):
+        """
+        Let the user pick files and start analyzing them.
+        """
+        local = self.local_mode_checkbox.isChecked()
+        
+        # Open file dialog (several files can be selected)
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
-            "Select CSV File",
+            "Select CSV Files",
             "",
-            "CSV Files (*.csv);;All Files (*)"
+            "CSV Files (*.csv);;Zip Archives (*.zip);;Parquet / Arrow Files (*.parquet *.arrow *.feather);;All Files (*)"
         )
         
-        if file_path:
+        if file_paths:
             # Store file path
-            self.current_file_path = file_path
+            self.current_file_path = file_paths[0]
             
             # Update UI
-            self.selected_file_label.setText(f"Selected: {file_path}")
+            if len(file_paths) == 1:
+                self.selected_file_label.setText(f"Selected: {file_paths[0]}")
+            else:
+                self.selected_file_label.setText(f"Selected: {len(file_paths)} files")
             self.selected_file_label.setStyleSheet("color: #27ae60; font-weight: bold;")
             
-            # Start upload
-            self.upload_csv_file(file_path)
+            # Start upload: several files (or more while the queue is
+            # busy) go through the queue, a single file gets the detailed
+            # progress of a background job. Local mode analyzes all
+            # selected files together in one process. Live mode watches
+            # the first file.
+            if self.live_mode_checkbox.isChecked():
+                self.start_live(file_paths[0])
+            elif not local and (len(file_paths) > 1 or self.upload_queue.is_active()):
+                self.enqueue_files(file_paths)
+            else:
+                self.upload_csv_files(file_paths)
     
-    def upload_csv_file(self, file_path):
+    def on_live_mode_toggled(self, checked):
+        """
+        Live mode needs the backend, so it excludes local analysis.
+        """
+        self.local_mode_checkbox.setEnabled(not checked and local_analysis.is_available())
+        if checked:
+            self.local_mode_checkbox.setChecked(False)
+    
+    def start_live(self, file_path):
+        """
+        Upload a file as a dataset, send its new rows as it grows, and
+        show the statistics pushed by the backend.
+        """
+        self.select_file_btn.setEnabled(False)
+        self.live_mode_checkbox.setEnabled(False)
+        self.stop_live_btn.setVisible(True)
+        self.results_group.setVisible(False)
+        self.chart_group.setVisible(False)
+        self.show_status("Uploading file for live view...", "info")
+        
+        self.live_watcher = LiveFileWatcher(self.api_client, file_path)
+        self.live_watcher.waiting_for_rows.connect(
+            lambda: self.show_status("Live view: waiting for the first row in the file...", "info")
+        )
+        self.live_watcher.dataset_ready.connect(self.on_live_dataset_ready)
+        self.live_watcher.rows_sent.connect(self.on_live_rows_sent)
+        self.live_watcher.watch_error.connect(self.on_live_error)
+        self.live_watcher.start()
+    
+    def on_live_dataset_ready(self, dataset_id):
+        """
+        Subscribe to the statistics of the new dataset.
+        """
+        self.live_dataset_id = dataset_id
+        self.live_stream = LiveStreamWorker(self.api_client, dataset_id)
+        self.live_stream.summary_updated.connect(self.on_live_summary)
+        self.live_stream.stream_lost.connect(
+            lambda message: self.show_status(f"Live view reconnecting: {message}", "error")
+        )
+        self.live_stream.stream_ended.connect(self.on_live_error)
+        self.live_stream.start()
+    
+    def on_live_rows_sent(self, row_count):
+        # The pushed statistics follow within about a second
+        self.show_status(f"● Live: {row_count:,} rows sent (dataset {self.live_dataset_id})", "success")
+    
+    def on_live_summary(self, summary):
         """
-        Upload CSV file to backend in background thread.
+        Show statistics pushed by the backend (no re-upload).
+        """
+        self.show_status(
+            f"● Live: {summary['total_equipment']:,} rows (dataset {self.live_dataset_id})", "success"
+        )
+        self.display_results(summary)
+    
+    def on_live_error(self, error_message):
+        """
+        Stop live mode after an error that does not go away by itself.
+        """
+        self.stop_live()
+        self.show_status(f"✗ Live view stopped: {error_message}", "error")
+    
+    def stop_live(self):
         """
+        Stop watching the file and following the stream.
+        
+        The dataset stays on the backend, with the rows sent so far.
+        """
+        for worker in (self.live_watcher, self.live_stream):
+            if worker is not None:
+                worker.stop()
+                worker.wait()
+        self.live_watcher = None
+        self.live_stream = None
+        
+        self.select_file_btn.setEnabled(True)
+        self.live_mode_checkbox.setEnabled(True)
+        self.stop_live_btn.setVisible(False)
+        self.show_status("Live view stopped", "info")
+    
+    def upload_csv_files(self, file_paths):
+        """
+        Upload CSV files to backend in background thread.
+        
+        In local mode the files are analyzed on this computer instead
+        (see local_analysis.py); the results are the same.
+        """
+        local = self.local_mode_checkbox.isChecked()
+        
         # Disable upload button
         self.select_file_btn.setEnabled(False)
         
         # Show processing status
-        self.show_status("Processing CSV file...", "info")
+        if local:
+            self.show_status("Analyzing CSV file locally...", "info")
+        else:
+            self.show_status("Uploading CSV file...", "info")
+        
+        # Show an empty progress bar (a busy indicator in local mode,
+        # which has no upload to measure)
+        self.upload_progress_bar.setRange(0, 0 if local else 1000)
+        self.upload_progress_bar.setValue(0)
+        self.upload_progress_bar.setFormat("%p%")
+        self.cancel_btn.setEnabled(True)
+        self.progress_row.setVisible(True)
         
         # Hide previous results
         self.results_group.setVisible(False)
         self.chart_group.setVisible(False)
         
         # Create and start worker thread
-        self.upload_worker = UploadWorker(self.api_client, file_path)
+        if local:
+            self.upload_worker = local_analysis.LocalAnalysisWorker(file_paths, self.api_client.top_n)
+        else:
+            self.upload_worker = UploadWorker(self.api_client, file_paths)
+            self.upload_worker.bytes_sent.connect(self.on_bytes_sent)
         self.upload_worker.upload_complete.connect(self.on_upload_success)
         self.upload_worker.upload_error.connect(self.on_upload_error)
+        self.upload_worker.upload_progress.connect(self.on_upload_progress)
+        self.upload_worker.upload_cancelled.connect(self.on_upload_cancelled)
         self.upload_worker.start()
     
+    def upload_csv_file(self, file_path):
+        """
+        Upload a single CSV file to backend in background thread.
+        """
+        self.upload_csv_files([file_path])
+    
+    def enqueue_files(self, file_paths):
+        """
+        Add files to the upload queue and show their rows.
+        """
+        # A new batch starts a new combined result
+        if not self.upload_queue.is_active():
+            self.upload_queue.clear()
+            self.queue_table.setRowCount(0)
+            self.results_group.setVisible(False)
+            self.chart_group.setVisible(False)
+        
+        for index in self.upload_queue.add_files(file_paths):
+            self.queue_table.insertRow(index)
+            self.queue_table.setItem(index, 0, QTableWidgetItem(os.path.basename(self.upload_queue.files[index]['path'])))
+            progress_bar = QProgressBar()
+            progress_bar.setRange(0, 1000)
+            self.queue_table.setCellWidget(index, 2, progress_bar)
+            self.on_queue_file_changed(index)
+        
+        self.queue_group.setVisible(True)
+        self.show_queue_status()
+    
+    def on_queue_file_changed(self, index):
+        """
+        Update the row of a file in the queue table.
+        """
+        entry = self.upload_queue.files[index]
+        progress_bar = self.queue_table.cellWidget(index, 2)
+        
+        if entry['state'] == QUEUED:
+            status_text = "Queued"
+        elif entry['state'] == UPLOADING:
+            if entry['total_bytes'] and entry['bytes_sent'] >= entry['total_bytes']:
+                status_text = "Analyzing..."
+            else:
+                status_text = "Uploading..."
+            if entry['total_bytes']:
+                progress_bar.setValue(int(1000 * entry['bytes_sent'] / entry['total_bytes']))
+        elif entry['state'] == DONE:
+            status_text = f"✓ Done ({entry['rows']:,} rows)"
+            progress_bar.setValue(1000)
+        elif entry['state'] == FAILED:
+            status_text = f"✗ {entry['error']}"
+        else:
+            status_text = "Cancelled"
+        
+        item = QTableWidgetItem(status_text)
+        item.setToolTip(status_text)
+        self.queue_table.setItem(index, 1, item)
+        
+        if entry['state'] != UPLOADING:
+            self.show_queue_status()
+    
+    def on_combined_updated(self, summary):
+        """
+        Show the combined statistics of the files finished so far.
+        """
+        self.display_results(summary)
+    
+    def on_queue_finished(self):
+        """
+        Report the outcome once no file is queued or uploading.
+        """
+        self.show_queue_status()
+    
+    def show_queue_status(self):
+        """
+        Show how many files of the queue are finished.
+        """
+        queue = self.upload_queue
+        total = len(queue.files)
+        done = queue.count(DONE)
+        failed = queue.count(FAILED)
+        cancelled = queue.count(CANCELLED)
+        
+        message = f"{done} of {total} files analyzed"
+        if failed:
+            message += f", {failed} failed"
+        if cancelled:
+            message += f", {cancelled} cancelled"
+        
+        if queue.merge_error:
+            message += f" (combined result incomplete: {queue.merge_error})"
+        
+        if queue.is_active():
+            self.show_status(f"Uploading... {message}", "info")
+        elif failed or queue.merge_error:
+            self.show_status(f"✗ {message}", "error")
+        else:
+            self.show_status(f"✓ {message}", "success")
+    
+    def cancel_selected_files(self):
+        """
+        Cancel the files selected in the queue table.
+        """
+        for index in sorted({item.row() for item in self.queue_table.selectedIndexes()}):
+            self.upload_queue.cancel(index)
+    
+    def on_bytes_sent(self, bytes_sent, total_bytes):
+        """
+        Show how much of the upload has been sent.
+        """
+        if bytes_sent < total_bytes:
+            # Per mille, so multi-GB totals fit the progress bar's int range
+            self.upload_progress_bar.setValue(int(1000 * bytes_sent / total_bytes))
+            self.show_status(
+                f"Uploading CSV file... {bytes_sent / 1e6:,.1f} of {total_bytes / 1e6:,.1f} MB",
+                "info"
+            )
+        else:
+            # Upload done: busy indicator until the backend answers
+            self.upload_progress_bar.setRange(0, 0)
+            self.show_status("Processing CSV file...", "info")
+    
+    def on_upload_progress(self, rows_processed):
+        """
+        Show how many rows the backend has processed so far.
+        """
+        if rows_processed:
+            self.show_status(f"Processing CSV file... {rows_processed:,} rows", "info")
+    
+    def cancel_upload(self):
+        """
+        Ask the worker to stop; it reports back with upload_cancelled.
+        """
+        if self.upload_worker is not None:
+            self.upload_worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.show_status("Cancelling...", "info")
+    
+    def on_upload_cancelled(self):
+        """
+        Handle a cancelled upload.
+        """
+        self.select_file_btn.setEnabled(True)
+        self.progress_row.setVisible(False)
+        self.show_status("Upload cancelled", "info")
+    
     def on_upload_success(self, results):
         """
         Handle successful upload and display results.
         """
         # Re-enable upload button
         self.select_file_btn.setEnabled(True)
+        self.progress_row.setVisible(False)
         
         # Show success status
         self.show_status("✓ Analysis complete!", "success")
@@ -401,6 +973,7 @@ class MainWindow(QMainWindow):
         """
         # Re-enable upload button
         self.select_file_btn.setEnabled(True)
+        self.progress_row.setVisible(False)
         
         # Show error status
         self.show_status(f"✗ Error: {error_message}", "error")
@@ -408,6 +981,30 @@ class MainWindow(QMainWindow):
         # Show error dialog
         QMessageBox.critical(self, "Upload Error", error_message)
     
+    def paintEvent(self, event):
+        """
+        Start loading the remaining modules once the window has appeared.
+        """
+        super().paintEvent(event)
+        if not self.modules_preloaded:
+            self.modules_preloaded = True
+            QTimer.singleShot(0, self.preload_modules)
+    
+    def closeEvent(self, event):
+        """
+        Close the pooled backend connections when the window closes.
+        """
+        if self.upload_worker is not None and self.upload_worker.isRunning():
+            self.upload_worker.cancel()
+            self.upload_worker.wait()
+        self.stop_live()
+        self.upload_queue.cancel_all()
+        self.upload_queue.pool.waitForDone()
+        # A backend check may still be using the connections
+        QThreadPool.globalInstance().waitForDone()
+        self.api_client.close()
+        super().closeEvent(event)
+    
     def show_status(self, message, status_type):
         """
         Display status message with appropriate styling.
@@ -439,15 +1036,24 @@ class MainWindow(QMainWindow):
         """
         # Update statistics
         self.total_equipment_label.value_label.setText(str(results['total_equipment']))
-        self.avg_flowrate_label.value_label.setText(f"{results['average_flowrate']:.2f}")
-        self.avg_pressure_label.value_label.setText(f"{results['average_pressure']:.2f}")
-        self.avg_temperature_label.value_label.setText(f"{results['average_temperature']:.2f}")
+        self.avg_flowrate_label.value_label.setText(format_average(results['average_flowrate']))
+        self.avg_pressure_label.value_label.setText(format_average(results['average_pressure']))
+        self.avg_temperature_label.value_label.setText(format_average(results['average_temperature']))
         
         # Show results section
         self.results_group.setVisible(True)
         
         # Plot chart
-        self.chart.plot_equipment_distribution(results['equipment_by_type'])
+        self.create_charts()
+        self.chart.plot_equipment_distribution(
+            results['equipment_by_type'],
+            results.get('equipment_by_type_other')
+        )
+        
+        # Plot sensor histograms (older backends do not send them)
+        self.distribution_chart.setVisible('distributions' in results)
+        if 'distributions' in results:
+            self.distribution_chart.plot_distributions(results['distributions'])
         
         # Show chart section
         self.chart_group.setVisible(True)
\ No newline at end of file
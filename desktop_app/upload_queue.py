@@ -0,0 +1,337 @@
+"""
+Upload Queue for Many Files
+
+This module uploads many CSV files a few at a time on a QThreadPool.
+
+Every file is analyzed as a mergeable partial aggregate
+(/api/analyze/?partial=1). Each finished partial is merged into the
+combined result right away, on this computer, with the backend's own
+SummaryAggregator (see local_analysis.import_engine()), so the combined
+view grows as files finish and matches one upload of all rows. Merging
+locally sends nothing over the network.
+
+Without the backend engine (no backend source tree, or no pandas), the
+partials are collected instead and merged by one /api/partials/merge/
+request when the last file is finished.
+
+A failed merge does not change the state of the files: their uploads
+succeeded. It is reported on its own (merge_failed, merge_error).
+"""
+
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+import local_analysis
+from api_client import UploadCancelled
+
+
+# Files uploaded at the same time by default, and at most
+DEFAULT_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+
+# States of a file in the queue
+QUEUED = 'queued'
+UPLOADING = 'uploading'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class FileUploadSignals(QObject):
+    """
+    Signals of a FileUploadTask (a QRunnable cannot have signals).
+    """
+
+    started = pyqtSignal(int)                 # Emits file index
+    bytes_sent = pyqtSignal(int, object, object)  # Emits index, bytes sent, total bytes
+    finished = pyqtSignal(int, dict)          # Emits index, partial aggregate
+    failed = pyqtSignal(int, str)             # Emits index, error message
+    cancelled = pyqtSignal(int)               # Emits index
+    merge_failed = pyqtSignal(str)            # Emits error message of the merge
+
+
+class FileUploadTask(QRunnable):
+    """
+    Uploads one file of the queue in a QThreadPool thread.
+    """
+
+    def __init__(self, upload_queue, index, file_path):
+        super().__init__()
+        # The queue keeps the task, so it can still be taken off the pool
+        self.setAutoDelete(False)
+        self.upload_queue = upload_queue
+        self.index = index
+        self.file_path = file_path
+        self.cancel_event = threading.Event()
+        self.signals = FileUploadSignals()
+
+    def run(self):
+        """
+        This method runs in a thread of the pool.
+        """
+        if self.cancel_event.is_set():
+            self.signals.cancelled.emit(self.index)
+            return
+
+        self.signals.started.emit(self.index)
+        try:
+            partial = self.upload_queue.api_client.analyze_partial(
+                self.file_path,
+                upload_callback=lambda sent, total: self.signals.bytes_sent.emit(self.index, sent, total),
+                cancel_event=self.cancel_event
+            )
+        except UploadCancelled:
+            self.signals.cancelled.emit(self.index)
+            return
+        except Exception as e:
+            self.signals.failed.emit(self.index, str(e))
+            return
+
+        # The file itself is done even if merging it fails
+        try:
+            self.upload_queue.merge(partial)
+        except Exception as e:
+            self.signals.merge_failed.emit(str(e))
+        self.signals.finished.emit(self.index, partial)
+
+
+class MergeSignals(QObject):
+    """
+    Signals of a MergeTask.
+    """
+
+    merged = pyqtSignal(dict)   # Emits the /api/partials/merge/ response
+    failed = pyqtSignal(str)    # Emits error message
+
+
+class MergeTask(QRunnable):
+    """
+    Merges all partials with one /api/partials/merge/ request.
+    """
+
+    def __init__(self, api_client, partials):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.api_client = api_client
+        self.partials = partials
+        self.signals = MergeSignals()
+
+    def run(self):
+        """
+        This method runs in a thread of the pool.
+        """
+        try:
+            self.signals.merged.emit(self.api_client.merge_partials(self.partials))
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class UploadQueue(QObject):
+    """
+    Queue of files uploaded concurrently, with a combined result.
+
+    The file list and its states are only changed in the main thread
+    (task signals are delivered there), so the UI can read them directly.
+    """
+
+    file_changed = pyqtSignal(int)        # Emits index of a file whose state or progress changed
+    combined_updated = pyqtSignal(dict)   # Emits combined statistics of the finished files
+    merge_failed = pyqtSignal(str)        # Emits error message when the combined result is incomplete
+    queue_finished = pyqtSignal()         # Emitted when no file is queued or uploading
+
+    def __init__(self, api_client, concurrency=DEFAULT_CONCURRENCY):
+        super().__init__()
+        self.api_client = api_client
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(concurrency)
+
+        # One dict per file: path, state, bytes_sent, total_bytes, rows, error
+        self.files = []
+        self._tasks = []
+
+        # Combined aggregate and summary of the finished files; merges run
+        # in pool threads one at a time
+        self._merge_lock = threading.Lock()
+        self._engine = None
+        self._combined = None
+        self._combined_summary = None
+        # Without the local engine: partials waiting for the merge request,
+        # and the merged partial of earlier requests
+        self._pending_partials = []
+        self._merged_partial = None
+        self._merge_task = None
+        self.merge_error = ''
+
+    def set_concurrency(self, concurrency):
+        """
+        Change how many files are uploaded at the same time.
+        """
+        self.pool.setMaxThreadCount(concurrency)
+
+    def is_active(self):
+        """
+        True while a file is queued or uploading, or the merge request runs.
+        """
+        if self._merge_task is not None:
+            return True
+        return any(entry['state'] in (QUEUED, UPLOADING) for entry in self.files)
+
+    def count(self, state):
+        """
+        Number of files in the given state.
+        """
+        return sum(1 for entry in self.files if entry['state'] == state)
+
+    def clear(self):
+        """
+        Forget all files and the combined result (only when not active).
+        """
+        if self.is_active():
+            raise RuntimeError("Cannot clear the upload queue while files are uploading")
+        self.files = []
+        self._tasks = []
+        self._combined = None
+        self._combined_summary = None
+        self._pending_partials = []
+        self._merged_partial = None
+        self.merge_error = ''
+
+    def add_files(self, file_paths):
+        """
+        Queue files for upload.
+
+        Returns:
+            list: Indexes of the new files in self.files
+        """
+        indexes = []
+        for file_path in file_paths:
+            index = len(self.files)
+            self.files.append({
+                'path': file_path,
+                'state': QUEUED,
+                'bytes_sent': 0,
+                'total_bytes': 0,
+                'rows': None,
+                'error': ''
+            })
+
+            task = FileUploadTask(self, index, file_path)
+            task.signals.started.connect(self._on_started)
+            task.signals.bytes_sent.connect(self._on_bytes_sent)
+            task.signals.finished.connect(self._on_finished)
+            task.signals.failed.connect(self._on_failed)
+            task.signals.cancelled.connect(self._on_cancelled)
+            task.signals.merge_failed.connect(self._on_merge_failed)
+            self._tasks.append(task)
+
+            self.pool.start(task)
+            indexes.append(index)
+        return indexes
+
+    def cancel(self, index):
+        """
+        Cancel a queued or uploading file.
+
+        Queued files are taken off the pool right away; uploads that
+        already started stop at their next chunk.
+        """
+        if self.files[index]['state'] not in (QUEUED, UPLOADING):
+            return
+        task = self._tasks[index]
+        task.cancel_event.set()
+        if self.pool.tryTake(task):
+            # The task will never run, so it cannot report back itself
+            self._on_cancelled(index)
+
+    def cancel_all(self):
+        """
+        Cancel every queued or uploading file.
+        """
+        for index in range(len(self.files)):
+            self.cancel(index)
+
+    def merge(self, partial):
+        """
+        Merge a file's partial aggregate into the combined result.
+
+        Called from pool threads. Without the local engine the partial
+        is kept for the merge request at the end.
+        """
+        with self._merge_lock:
+            if self._engine is None:
+                self._engine = local_analysis.import_engine() or False
+            if not self._engine:
+                self._pending_partials.append(partial)
+                return
+
+            summary = self._engine.SummaryAggregator.from_partial(partial)
+            if self._combined is None:
+                self._combined = summary
+            else:
+                self._combined.merge(summary)
+            self._combined_summary = self._combined.to_response(self.api_client.top_n)
+
+    def _on_started(self, index):
+        if self.files[index]['state'] == QUEUED:
+            self.files[index]['state'] = UPLOADING
+            self.file_changed.emit(index)
+
+    def _on_bytes_sent(self, index, bytes_sent, total_bytes):
+        self.files[index]['bytes_sent'] = bytes_sent
+        self.files[index]['total_bytes'] = total_bytes
+        self.file_changed.emit(index)
+
+    def _on_finished(self, index, partial):
+        self.files[index]['state'] = DONE
+        self.files[index]['rows'] = partial['total_rows']
+        self.file_changed.emit(index)
+        # Always the latest merge, even if signals arrive out of order
+        if self._combined_summary is not None:
+            self.combined_updated.emit(self._combined_summary)
+        self._check_finished()
+
+    def _on_failed(self, index, error_message):
+        self.files[index]['state'] = FAILED
+        self.files[index]['error'] = error_message
+        self.file_changed.emit(index)
+        self._check_finished()
+
+    def _on_cancelled(self, index):
+        if self.files[index]['state'] == CANCELLED:
+            return
+        self.files[index]['state'] = CANCELLED
+        self.file_changed.emit(index)
+        self._check_finished()
+
+    def _on_merge_failed(self, error_message):
+        self.merge_error = error_message
+        self.merge_failed.emit(error_message)
+
+    def _on_merged(self, merged):
+        self._merge_task = None
+        self._merged_partial = merged['partial']
+        self._combined_summary = merged['summary']
+        self.combined_updated.emit(self._combined_summary)
+        self._check_finished()
+
+    def _on_merge_request_failed(self, error_message):
+        self._merge_task = None
+        self._on_merge_failed(error_message)
+        self._check_finished()
+
+    def _check_finished(self):
+        if self.is_active():
+            return
+        if self._pending_partials:
+            # One merge request for the files finished since the last one
+            partials = self._pending_partials
+            if self._merged_partial is not None:
+                partials = [self._merged_partial] + partials
+            self._merge_task = MergeTask(self.api_client, partials)
+            self._pending_partials = []
+            self._merge_task.signals.merged.connect(self._on_merged)
+            self._merge_task.signals.failed.connect(self._on_merge_request_failed)
+            self.pool.start(self._merge_task)
+            return
+        self.queue_finished.emit()
@@ -1,3 +1,15 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import AnalysisJob, Dataset
+
+
+@admin.register(Dataset)
+class DatasetAdmin(admin.ModelAdmin):
+    list_display = ('name', 'row_count', 'size_bytes', 'created_at')
+    readonly_fields = ('id', 'row_count', 'size_bytes', 'header', 'summary', 'created_at', 'updated_at')
+
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ('file_name', 'status', 'rows_processed', 'created_at', 'finished_at')
+    list_filter = ('status',)
@@ -0,0 +1,213 @@
+"""
+Batch Analysis
+
+/api/analyze/batch/ accepts many CSV files in one request (or a zip of
+CSV files). Every file is spooled to disk and analyzed in a separate
+process, so a batch uses all CPU cores. The per-file SummaryAggregators
+are then merged into one combined summary: sums, counts and type tallies
+are added, which gives correctly weighted means. Single files may also
+be gzip- or zstd-compressed (see compression.py).
+
+Zip archives are checked before anything is extracted: the declared
+sizes of their CSV members must fit in ANALYZER_MAX_UPLOAD_SIZE (summed
+over the whole batch) and an archive may have at most
+ANALYZER_MAX_ZIP_MEMBERS entries. zipfile never returns more bytes than
+a member declares, so a member cannot extract to more than its
+declared size.
+
+Worker processes are started with "spawn", so they do not inherit the
+server's threads, locks or database connections. If a worker dies (for
+example, killed for using too much memory), the pool is broken for good;
+it is then replaced by a new one.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from django.conf import settings
+
+from .compression import ZIP_MAGIC
+from .engine import SummaryAggregator, analyze_path
+from .parsing import UploadFormatError
+from .uploads import max_upload_size
+
+
+DEFAULT_MAX_ZIP_MEMBERS = 1000
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class ArchiveLimitError(ValueError):
+    """
+    Raised when a zip upload would extract to too much data or too many files.
+    """
+
+
+def get_executor():
+    """
+    Return the process pool used for batch parsing, creating it on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'ANALYZER_BATCH_WORKERS', None) or os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def discard_executor(executor):
+    """
+    Drop a broken pool, so the next get_executor() call creates a new one.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit_all(entries, parse_options):
+    """
+    Queue every file on the pool, replacing the pool once if it is broken.
+    """
+    executor = get_executor()
+    try:
+        return executor, [executor.submit(analyze_path, path, **parse_options) for _, path in entries]
+    except BrokenProcessPool:
+        discard_executor(executor)
+        executor = get_executor()
+        return executor, [executor.submit(analyze_path, path, **parse_options) for _, path in entries]
+
+
+def _is_zip(uploaded_file):
+    if uploaded_file.name and uploaded_file.name.lower().endswith('.zip'):
+        return True
+    first_chunk = next(uploaded_file.chunks(), b'')
+    return first_chunk.startswith(ZIP_MAGIC)
+
+
+def _spool(uploaded_file, directory, index):
+    """
+    Return a path to the upload on disk, copying it only if needed.
+    """
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        # Large uploads are already on disk
+        return uploaded_file.temporary_file_path()
+
+    path = Path(directory) / f'{index:05d}.csv'
+    with open(path, 'wb') as spool_file:
+        for chunk in uploaded_file.chunks():
+            spool_file.write(chunk)
+    return str(path)
+
+
+def _extract_zip(uploaded_file, directory, first_index, size_budget=None):
+    """
+    Extract the CSV members of a zip upload to disk.
+
+    Args:
+        size_budget (int): Bytes the members may extract to, or None for no limit
+
+    Returns:
+        list: (file_name, path) for every CSV member
+
+    Raises:
+        UploadFormatError: If the upload is not a readable zip archive
+        ArchiveLimitError: If the archive has too many entries or its
+            CSV members are larger than size_budget
+    """
+    entries = []
+    max_members = getattr(settings, 'ANALYZER_MAX_ZIP_MEMBERS', DEFAULT_MAX_ZIP_MEMBERS)
+    try:
+        with zipfile.ZipFile(uploaded_file) as archive:
+            members = archive.infolist()
+            if max_members is not None and len(members) > max_members:
+                raise ArchiveLimitError(
+                    f'Zip file {uploaded_file.name} has {len(members)} entries '
+                    f'(limit is {max_members})'
+                )
+            members = [
+                member for member in members
+                if not member.is_dir() and member.filename.lower().endswith('.csv')
+            ]
+            total_size = sum(member.file_size for member in members)
+            if size_budget is not None and total_size > size_budget:
+                raise ArchiveLimitError(
+                    f'Zip file {uploaded_file.name} extracts to {total_size} bytes, '
+                    f'more than the {max_upload_size()} bytes allowed per batch'
+                )
+            for member in members:
+                path = Path(directory) / f'{first_index + len(entries):05d}.csv'
+                with archive.open(member) as source, open(path, 'wb') as target:
+                    shutil.copyfileobj(source, target)
+                entries.append((member.filename, str(path)))
+    except zipfile.BadZipFile as e:
+        raise UploadFormatError(f'Invalid zip file {uploaded_file.name}: {e}')
+    return entries
+
+
+def analyze_batch(uploaded_files, parse_options, top_n=None):
+    """
+    Analyze many uploads in parallel and merge their statistics.
+
+    Args:
+        uploaded_files (list): Django UploadedFiles (CSV or zip of CSVs)
+        parse_options (dict): Keyword arguments for analyze_stream()
+        top_n (int): Equipment types per result, or None for all
+
+    Returns:
+        dict: {'files': [per-file result], 'combined': merged result}.
+        A file that fails has an 'error' entry instead of statistics and
+        is left out of the combined summary.
+
+    Raises:
+        UploadFormatError: If an upload is not a readable zip archive
+        ArchiveLimitError: If zip archives would extract to too much data
+    """
+    with tempfile.TemporaryDirectory(prefix='analyzer-batch-') as directory:
+        # Step 1: Put every CSV on disk so worker processes can read it
+        entries = []
+        size_budget = max_upload_size()
+        for uploaded_file in uploaded_files:
+            if _is_zip(uploaded_file):
+                extracted = _extract_zip(uploaded_file, directory, len(entries), size_budget)
+                if size_budget is not None:
+                    size_budget -= sum(os.path.getsize(path) for _, path in extracted)
+                entries.extend(extracted)
+            else:
+                entries.append((uploaded_file.name, _spool(uploaded_file, directory, len(entries))))
+
+        # Step 2: Parse all files in parallel
+        executor, futures = _submit_all(entries, parse_options)
+
+        # Step 3: Collect per-file results and merge them
+        combined = SummaryAggregator()
+        file_results = []
+        for (file_name, _), future in zip(entries, futures):
+            try:
+                summary = future.result()
+            except BrokenProcessPool as e:
+                # A worker died; the next batch gets a new pool
+                discard_executor(executor)
+                file_results.append({'file_name': file_name, 'error': str(e)})
+                continue
+            except Exception as e:
+                file_results.append({'file_name': file_name, 'error': str(e)})
+                continue
+            combined.merge(summary)
+            file_results.append({'file_name': file_name, **summary.to_response(top_n)})
+
+    return {
+        'files': file_results,
+        'combined': combined.to_response(top_n)
+    }
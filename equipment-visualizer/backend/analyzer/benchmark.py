@@ -0,0 +1,319 @@
+"""
+Benchmark Harness for the Analysis Pipeline
+
+Generates deterministic synthetic equipment CSVs and measures how long
+(and how much memory) each stage of the /api/analyze/ pipeline takes.
+Run it with:
+
+    python manage.py benchmark --rows 1000,100000,1000000 --output bench.json
+
+Stages measured for every generated file:
+    decode       Read the upload (memory-mapped, like a spooled Django upload)
+    validate     Read and check the header line
+    parse        Typed chunked parsing (includes decode and validate)
+    aggregate    SummaryAggregator.update() time during a full analysis
+    analyze      Parse + aggregate, as analyze_upload() does it
+    serialize    Render the response dictionary with DRF's JSONRenderer
+    end_to_end   POST /api/analyze/ through Django's test client
+
+Timings are wall-clock seconds over several runs (median and min are
+reported). Peak memory is measured with tracemalloc in one extra,
+untimed run, so it does not slow down the timed runs. NumPy and Pandas
+report their allocations to tracemalloc; pyarrow's memory pool does not.
+
+The same seed and options always produce byte-identical files.
+"""
+
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from rest_framework.renderers import JSONRenderer
+
+from .engine import SummaryAggregator, open_upload
+from .parsing import SUMMARY_COLUMNS, iter_csv_chunks, pyarrow_available, read_header
+
+
+BENCHMARK_FORMAT_VERSION = 1
+
+# Rows generated per DataFrame, so 50M-row files need flat memory
+GENERATOR_CHUNK_ROWS = 1000000
+
+# Real type names first (sample_data.csv), then numbered ones
+TYPE_NAMES = ['Pump', 'Reactor', 'Heater', 'Compressor', 'Valve', 'Mixer',
+              'Separator', 'Exchanger', 'Condenser', 'Boiler']
+
+# Value ranges of the per-type means, taken from sample_data.csv
+VALUE_RANGES = {
+    'flowrate': (85.0, 210.0),
+    'pressure': (3.0, 9.0),
+    'temperature': (300.0, 410.0),
+}
+
+STAGES = ['decode', 'validate', 'parse', 'aggregate', 'analyze', 'serialize', 'end_to_end']
+
+
+def type_names(cardinality):
+    """
+    Return `cardinality` distinct equipment type names.
+    """
+    names = TYPE_NAMES[:cardinality]
+    names += [f'Type-{index:04d}' for index in range(len(names), cardinality)]
+    return names
+
+
+def generate_csv(path, rows, types=5, dirty=0.0, seed=0):
+    """
+    Write a synthetic equipment CSV with the sample_data.csv schema.
+
+    Types follow a skewed (1/rank) distribution, and every type has its
+    own mean flowrate, pressure and temperature. A `dirty` fraction of
+    rows gets one defect: an empty numeric cell, an empty type, a
+    tenfold value spike, or a type name padded with spaces.
+
+    Args:
+        path (Path): Output file
+        rows (int): Number of data rows
+        types (int): Number of distinct equipment types
+        dirty (float): Fraction of rows with a defect (0 to 1)
+        seed (int): Random seed; same arguments give identical files
+
+    Returns:
+        int: File size in bytes
+    """
+    names = np.array(type_names(types), dtype=object)
+    weights = 1.0 / np.arange(1, types + 1)
+    weights /= weights.sum()
+
+    setup = np.random.default_rng(seed)
+    type_means = {
+        column: setup.uniform(low, high, types)
+        for column, (low, high) in VALUE_RANGES.items()
+    }
+
+    path = Path(path)
+    with open(path, 'w', newline='') as csv_file:
+        csv_file.write('equipment_name,equipment_type,flowrate,pressure,temperature\n')
+        for start in range(0, rows, GENERATOR_CHUNK_ROWS):
+            count = min(GENERATOR_CHUNK_ROWS, rows - start)
+            # Seeded by (seed, first row), so every chunk is reproducible on its own
+            rng = np.random.default_rng([seed, start])
+
+            codes = rng.choice(types, size=count, p=weights)
+            frame = pd.DataFrame({
+                'equipment_name': [f'EQ-{index:09d}' for index in range(start, start + count)],
+                'equipment_type': names[codes],
+            })
+            for column in VALUE_RANGES:
+                means = type_means[column][codes]
+                frame[column] = np.round(rng.normal(means, means * 0.03), 2)
+
+            if dirty > 0:
+                _add_defects(frame, rng, dirty)
+
+            frame.to_csv(csv_file, header=False, index=False)
+
+    return path.stat().st_size
+
+
+def _add_defects(frame, rng, dirty):
+    defective = np.flatnonzero(rng.random(len(frame)) < dirty)
+    kinds = rng.integers(0, 4, size=defective.size)
+    columns = list(VALUE_RANGES)
+
+    missing = defective[kinds == 0]
+    for index, column in enumerate(columns):
+        rows = missing[missing % len(columns) == index]
+        frame.loc[rows, column] = np.nan
+
+    frame.loc[defective[kinds == 1], 'equipment_type'] = None
+
+    spikes = defective[kinds == 2]
+    frame.loc[spikes, 'temperature'] = frame.loc[spikes, 'temperature'] * 10
+
+    padded = defective[kinds == 3]
+    frame.loc[padded, 'equipment_type'] = ' ' + frame.loc[padded, 'equipment_type'] + ' '
+
+
+class FileUpload:
+    """
+    Minimal stand-in for Django's TemporaryUploadedFile (a file on disk).
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.name = self.path.name
+        self.size = self.path.stat().st_size
+
+    def temporary_file_path(self):
+        return str(self.path)
+
+    def chunks(self, chunk_size=None):
+        with open(self.path, 'rb') as data:
+            while True:
+                chunk = data.read(chunk_size or self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+
+def _measure(function, repeat):
+    """
+    Time function() `repeat` times, then measure its peak memory once.
+
+    function() may return a number of seconds to use instead of the
+    wall-clock time (for stages timed inside a larger run).
+    """
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        measured = function()
+        elapsed = time.perf_counter() - start
+        runs.append(measured if isinstance(measured, float) else elapsed)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_seconds': statistics.median(runs),
+        'min_seconds': min(runs),
+        'runs': runs,
+        'peak_bytes': peak
+    }
+
+
+def run_stages(path, parse_options, repeat=3, client=None):
+    """
+    Measure every pipeline stage on one CSV file.
+
+    Args:
+        path (Path): CSV file to analyze
+        parse_options (dict): chunk_rows, engine and float_dtype
+        repeat (int): Timed runs per stage
+        client: Django test Client for the end-to-end stage, or None to skip it
+
+    Returns:
+        dict: Stage name -> measurements (see _measure())
+    """
+    upload = FileUpload(path)
+
+    def decode():
+        stream = open_upload(upload)
+        while stream.read(1024 * 1024):
+            pass
+
+    def validate():
+        read_header(open_upload(upload))
+
+    def parse():
+        for _ in iter_csv_chunks(open_upload(upload), columns=SUMMARY_COLUMNS, **parse_options):
+            pass
+
+    def aggregate():
+        # Only the time spent inside update() counts for this stage
+        summary = SummaryAggregator()
+        seconds = 0.0
+        for chunk in iter_csv_chunks(open_upload(upload), columns=SUMMARY_COLUMNS, **parse_options):
+            start = time.perf_counter()
+            summary.update(chunk)
+            seconds += time.perf_counter() - start
+        return seconds
+
+    def analyze():
+        summary = SummaryAggregator()
+        for chunk in iter_csv_chunks(open_upload(upload), columns=SUMMARY_COLUMNS, **parse_options):
+            summary.update(chunk)
+        return summary
+
+    summary = analyze()
+    response_data = summary.to_response()
+
+    def serialize():
+        JSONRenderer().render(response_data)
+
+    stages = {
+        'decode': decode,
+        'validate': validate,
+        'parse': parse,
+        'aggregate': aggregate,
+        'analyze': analyze,
+        'serialize': serialize,
+    }
+
+    if client is not None:
+        def end_to_end():
+            with open(path, 'rb') as csv_file:
+                response = client.post('/api/analyze/', {'file': csv_file})
+            if response.status_code != 200:
+                raise RuntimeError(f'/api/analyze/ returned {response.status_code}: {response.content[:200]}')
+
+        stages['end_to_end'] = end_to_end
+
+    return {name: _measure(function, repeat) for name, function in stages.items()}
+
+
+def environment_info():
+    """
+    Versions and commit the results were measured with.
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'pyarrow': pyarrow_available(),
+    }
+
+
+def compare_results(previous, current, threshold=1.2, min_seconds=0.001):
+    """
+    Find stages that got slower between two benchmark result files.
+
+    Cases are matched by (rows, types, dirty) and stages by name. Stages
+    faster than min_seconds in both runs are ignored, since their timing
+    is mostly noise.
+
+    Returns:
+        list: (case, stage, old_seconds, new_seconds, ratio) for every
+        stage whose median time grew by more than `threshold`
+    """
+    def key(case):
+        return (case['rows'], case['types'], case['dirty'])
+
+    old_cases = {key(case): case for case in previous['cases']}
+    regressions = []
+    for case in current['cases']:
+        old_case = old_cases.get(key(case))
+        if old_case is None:
+            continue
+        for stage, measured in case['stages'].items():
+            old = old_case['stages'].get(stage)
+            if not old or not old['median_seconds']:
+                continue
+            if max(old['median_seconds'], measured['median_seconds']) < min_seconds:
+                continue
+            ratio = measured['median_seconds'] / old['median_seconds']
+            if ratio > threshold:
+                regressions.append(
+                    (key(case), stage, old['median_seconds'], measured['median_seconds'], ratio)
+                )
+    return regressions
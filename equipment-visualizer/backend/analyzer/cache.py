@@ -0,0 +1,300 @@
+"""
+Result Cache for Repeated CSV Analyses
+
+Operators often upload the same export several times. Instead of parsing
+it again, /api/analyze/ hashes the upload content and looks the result up
+in a cache first. A repeat upload is answered without touching Pandas.
+
+The cache backend is pluggable through the ANALYZER_RESULT_CACHE setting:
+
+    ANALYZER_RESULT_CACHE = {
+        'BACKEND': 'analyzer.cache.LocMemResultCache',
+        'OPTIONS': {'max_entries': 128},
+    }
+
+Available backends:
+    - LocMemResultCache: in-process LRU dictionary
+    - DjangoResultCache: any cache configured in Django's CACHES setting
+    - SQLiteResultCache: local SQLite file, shared by all worker processes
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+
+
+# Bump this when the response format changes so old entries are ignored
+CACHE_KEY_VERSION = 2
+
+DEFAULT_MAX_ENTRIES = 128
+
+
+def new_content_hash():
+    """
+    Return an empty hash object of the kind used for upload content.
+    """
+    return hashlib.blake2b(digest_size=20)
+
+
+def hash_upload(uploaded_file):
+    """
+    Compute a content hash of an uploaded file.
+
+    The file is read through uploaded_file.chunks(), so large uploads are
+    hashed without being loaded into memory.
+
+    Args:
+        uploaded_file: Django UploadedFile from request.FILES
+
+    Returns:
+        str: Hex digest of the file content
+    """
+    digest = new_content_hash()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(content_hash, options=None):
+    """
+    Build a cache key from a content hash and the analysis options.
+
+    Args:
+        content_hash (str): Result of hash_upload()
+        options (dict): Options that change the analysis result
+
+    Returns:
+        str: Cache key
+    """
+    options_json = json.dumps(options or {}, sort_keys=True, separators=(',', ':'))
+    options_hash = hashlib.blake2b(options_json.encode('utf-8'), digest_size=8).hexdigest()
+    return f'analyzer:v{CACHE_KEY_VERSION}:{content_hash}:{options_hash}'
+
+
+class BaseResultCache:
+    """
+    Base class for result cache backends.
+
+    Subclasses implement _get(), _set(), entry_count() and clear().
+    This class keeps the hit/miss counters.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the cached result for key, or None on a miss.
+        """
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """
+        Store a result dictionary under key.
+        """
+        self._set(key, value)
+
+    def stats(self):
+        """
+        Return hit/miss counters and the current number of entries.
+        """
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'backend': type(self).__name__,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'entries': self.entry_count(),
+            'max_entries': self.max_entries
+        }
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value):
+        raise NotImplementedError
+
+    def entry_count(self):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LocMemResultCache(BaseResultCache):
+    """
+    In-process LRU cache.
+
+    Fastest option, but each worker process has its own copy.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        super().__init__(max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                # Mark as most recently used
+                self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            # Evict least recently used entries
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def entry_count(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoResultCache(BaseResultCache):
+    """
+    Cache backed by Django's cache framework.
+
+    Eviction is handled by the configured cache itself (for example the
+    MAX_ENTRIES option of the locmem and database caches).
+    """
+
+    def __init__(self, max_entries=None, alias='default', timeout=None):
+        super().__init__(max_entries)
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def _cache(self):
+        return caches[self.alias]
+
+    def _get(self, key):
+        return self._cache.get(key)
+
+    def _set(self, key, value):
+        self._cache.set(key, value, self.timeout)
+
+    def entry_count(self):
+        # Django's cache API cannot count entries
+        return None
+
+    def clear(self):
+        self._cache.clear()
+
+
+class SQLiteResultCache(BaseResultCache):
+    """
+    LRU cache stored in a local SQLite file.
+
+    All worker processes on the machine share the same entries, and the
+    cache survives server restarts.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, path=None):
+        super().__init__(max_entries)
+        self.path = str(path or settings.BASE_DIR / 'analysis_cache.sqlite3')
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed REAL NOT NULL)'
+            )
+
+    @contextmanager
+    def _connect(self):
+        # A new connection per call keeps this safe across threads. It
+        # commits (or rolls back) and is closed when the block ends
+        with closing(sqlite3.connect(self.path, timeout=5)) as connection:
+            with connection:
+                yield connection
+
+    def _get(self, key):
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT value FROM results WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                'UPDATE results SET accessed = ? WHERE key = ?', (time.time(), key)
+            )
+        return json.loads(row[0])
+
+    def _set(self, key, value):
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO results (key, value, accessed) VALUES (?, ?, ?)',
+                (key, json.dumps(value), time.time())
+            )
+            # Evict least recently used entries
+            connection.execute(
+                'DELETE FROM results WHERE key NOT IN '
+                '(SELECT key FROM results ORDER BY accessed DESC LIMIT ?)',
+                (self.max_entries,)
+            )
+
+    def entry_count(self):
+        with self._connect() as connection:
+            return connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute('DELETE FROM results')
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """
+    Return the configured result cache, or None if caching is disabled.
+
+    The backend is built once per process from ANALYZER_RESULT_CACHE.
+    """
+    global _result_cache
+
+    config = getattr(settings, 'ANALYZER_RESULT_CACHE', None)
+    if not config:
+        return None
+
+    with _result_cache_lock:
+        if _result_cache is None:
+            backend_class = import_string(config['BACKEND'])
+            _result_cache = backend_class(**config.get('OPTIONS', {}))
+        return _result_cache
+
+
+def _reset_result_cache(setting, **kwargs):
+    # Rebuild the backend when tests override the setting
+    global _result_cache
+    if setting == 'ANALYZER_RESULT_CACHE':
+        _result_cache = None
+
+
+setting_changed.connect(_reset_result_cache)
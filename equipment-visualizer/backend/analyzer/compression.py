@@ -0,0 +1,188 @@
+"""
+Compressed Uploads
+
+CSV exports compress about tenfold, so clients may upload them gzip-,
+zstd- or zip-compressed. The format is detected from the first bytes of
+the upload (a Content-Encoding header on a multipart request would
+apply to the whole form body, not to the file part). The name of the
+file does not matter.
+
+decompress_stream() wraps a binary stream in a decompressing reader, so
+the parser pulls decompressed bytes block by block and the whole
+decompressed file never exists in memory or on disk. Uncompressed
+streams are returned unchanged, so memory-mapped CSVs keep their
+zero-copy path.
+
+gzip and zip use the standard library. zstd needs the optional
+`zstandard` package.
+
+This module does not import Django.
+"""
+
+import gzip
+import io
+import mmap
+import zipfile
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .parsing import UploadFormatError, peek
+
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+ZIP_MAGIC = b'PK\x03\x04'
+
+# Bytes read per call from a zstd stream
+ZSTD_READ_SIZE = 1024 * 1024
+
+# Buffer of the reader the parser pulls decompressed bytes from
+DECOMPRESSED_BUFFER_SIZE = 1024 * 1024
+
+
+class CompressionError(UploadFormatError):
+    """
+    Raised when a compressed upload cannot be opened.
+    """
+
+
+def detect_compression(stream):
+    """
+    Return 'gzip', 'zstd', 'zip' or None for an uncompressed stream.
+    """
+    head = peek(stream, 4)
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(ZSTD_MAGIC):
+        return 'zstd'
+    if head.startswith(ZIP_MAGIC):
+        return 'zip'
+    return None
+
+
+class _MappedFile(io.RawIOBase):
+    """
+    Seekable file object over a memory map (zipfile needs seekable()).
+    """
+
+    def __init__(self, mapping):
+        self._view = memoryview(mapping)
+        self._position = mapping.tell()
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, target):
+        size = max(0, min(len(target), len(self._view) - self._position))
+        target[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+
+# Errors of the decompressors when the compressed data is damaged
+# (truncated, bad checksum, not really compressed)
+DECOMPRESSION_ERRORS = (EOFError, zlib.error, gzip.BadGzipFile, zipfile.BadZipFile)
+if zstandard is not None:
+    DECOMPRESSION_ERRORS += (zstandard.ZstdError,)
+
+
+class _DecompressedFile(io.RawIOBase):
+    """
+    Decompressing reader whose decompression errors become CompressionError.
+
+    The errors happen while the parser reads, so the views can answer
+    400 instead of 500 for a damaged upload.
+    """
+
+    def __init__(self, reader):
+        self._reader = reader
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        try:
+            return self._reader.readinto(target)
+        except DECOMPRESSION_ERRORS as e:
+            raise CompressionError(f'Compressed upload is damaged: {e}')
+
+    def close(self):
+        self._reader.close()
+        super().close()
+
+
+def _open_zip_member(stream):
+    # The central directory is at the end of a zip file, so the archive
+    # has to be seekable
+    if isinstance(stream, mmap.mmap):
+        stream = _MappedFile(stream)
+    elif not (hasattr(stream, 'seekable') and stream.seekable()):
+        # Small in-memory uploads only: larger ones are memory-mapped
+        stream = io.BytesIO(stream.read())
+
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile as e:
+        raise CompressionError(f'Invalid zip archive: {e}')
+
+    members = [
+        member for member in archive.infolist()
+        if not member.is_dir() and not member.filename.startswith('__MACOSX/')
+    ]
+    if len(members) != 1:
+        raise CompressionError(
+            f'Zip archive must contain exactly one CSV file (found {len(members)}); '
+            'upload archives with several files to /api/analyze/batch/'
+        )
+    return archive.open(members[0])
+
+
+def decompress_stream(stream):
+    """
+    Return a binary stream of the decompressed contents of `stream`.
+
+    Args:
+        stream: Binary file-like object (or memory map) positioned at the
+            start of the upload
+
+    Returns:
+        Binary file-like object. `stream` itself if it is not compressed.
+
+    Raises:
+        CompressionError: If the archive is invalid, holds more than one
+            file, or is zstd-compressed and zstandard is not installed
+            (and later, while reading, if the compressed data is damaged)
+    """
+    compression = detect_compression(stream)
+    if compression is None:
+        return stream
+
+    if compression == 'gzip':
+        reader = gzip.GzipFile(fileobj=stream, mode='rb')
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise CompressionError('zstd uploads need the zstandard package on the server')
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            stream, read_size=ZSTD_READ_SIZE, read_across_frames=True
+        )
+    else:
+        reader = _open_zip_member(stream)
+    return io.BufferedReader(_DecompressedFile(reader), DECOMPRESSED_BUFFER_SIZE)
@@ -0,0 +1,104 @@
+"""
+Bounded Analysis Pool
+
+Async views hand their CPU-bound work (multipart parsing, CSV parsing,
+aggregation) to one process-wide thread pool, so the event loop only
+waits for results and keeps serving other requests. Parsing runs in
+Pandas/pyarrow native code, so the worker threads do not hold the GIL
+for most of an analysis.
+
+The pool accepts at most ANALYZER_ASYNC_WORKERS running plus
+ANALYZER_ASYNC_QUEUE waiting requests. Beyond that, run() raises
+PoolSaturatedError right away instead of queueing without limit; views
+answer it with 503 and a Retry-After header.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+# Defaults if the settings are missing
+DEFAULT_ASYNC_WORKERS = 4
+DEFAULT_ASYNC_QUEUE = 16
+DEFAULT_RETRY_AFTER = 5
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PoolSaturatedError(Exception):
+    """
+    Raised when the analysis pool has no room for another request.
+    """
+
+
+class AnalysisPool:
+    """
+    Thread pool with a limit on running plus waiting calls.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analyzer-async')
+
+    def _acquire(self):
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                return False
+            self.in_flight += 1
+            return True
+
+    def _release(self, future=None):
+        with self._lock:
+            self.in_flight -= 1
+
+    async def run(self, function, *args):
+        """
+        Run function(*args) in a worker thread and await its result.
+
+        Raises:
+            PoolSaturatedError: If the pool is full
+        """
+        if not self._acquire():
+            raise PoolSaturatedError
+        future = self._executor.submit(_call_in_worker, function, *args)
+        # The slot is freed when the work is done, even if the client has
+        # disconnected and the awaiting request was cancelled meanwhile
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+
+def _call_in_worker(function, *args):
+    try:
+        return function(*args)
+    finally:
+        # Worker threads are not request threads; release their DB connection
+        close_old_connections()
+
+
+def get_analysis_pool():
+    """
+    Return the process-wide analysis pool, creating it on first use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AnalysisPool(
+                workers=getattr(settings, 'ANALYZER_ASYNC_WORKERS', DEFAULT_ASYNC_WORKERS),
+                queue_size=getattr(settings, 'ANALYZER_ASYNC_QUEUE', DEFAULT_ASYNC_QUEUE)
+            )
+        return _pool
+
+
+def retry_after():
+    """
+    Seconds a client should wait before retrying a rejected request.
+    """
+    return getattr(settings, 'ANALYZER_RETRY_AFTER', DEFAULT_RETRY_AFTER)
@@ -0,0 +1,161 @@
+"""
+Dataset Ingestion
+
+Turns an uploaded CSV into a stored Dataset: the file is parsed once,
+chunk by chunk, and every chunk is both written to the columnar store
+and added to the running summary.
+
+Rows appended to the source CSV later are ingested the same way by
+append_upload(). Only the new rows are parsed: they are written as new
+parts and merged into the running summary stored on the Dataset.
+"""
+
+import io
+
+from django.db import transaction
+
+from .compression import detect_compression
+from .engine import SummaryAggregator, open_upload
+from .models import Dataset
+from .parsing import iter_csv_chunks, read_header
+from .storage import ColumnarWriter
+
+
+class OffsetMismatchError(ValueError):
+    """
+    Raised when an appended tail does not start where the dataset ends.
+    """
+
+    def __init__(self, expected_offset, offset):
+        self.expected_offset = expected_offset
+        super().__init__(f'Expected rows from byte offset {expected_offset}, got {offset}')
+
+
+def _csv_size(uploaded_file, stream):
+    """
+    Size in bytes of the uncompressed CSV behind an upload.
+
+    Append offsets refer to the uncompressed source file. For compressed
+    uploads this is the position of the decompressed stream, which the
+    parser has read to the end.
+    """
+    head = next(uploaded_file.chunks(), b'')[:4]
+    if detect_compression(io.BytesIO(head)) is None:
+        return uploaded_file.size or 0
+    return stream.tell()
+
+
+def ingest_upload(uploaded_file, **parse_options):
+    """
+    Parse an uploaded CSV into a new Dataset.
+
+    Args:
+        uploaded_file: Django UploadedFile from request.FILES
+        **parse_options: chunk_rows, engine, float_dtype and max_rows for
+            parsing.iter_csv_chunks()
+
+    Returns:
+        tuple: (Dataset, SummaryAggregator) for the new dataset
+
+    Raises:
+        MissingColumnsError: If a required column is not in the header
+    """
+    dataset = Dataset(name=uploaded_file.name or 'dataset.csv')
+    writer = ColumnarWriter(dataset.storage_dir)
+    aggregator = SummaryAggregator()
+
+    try:
+        stream = open_upload(uploaded_file)
+        header = read_header(stream)
+        for chunk in iter_csv_chunks(stream, header=header, **parse_options):
+            writer.write_chunk(chunk)
+            aggregator.update(chunk)
+        writer.close()
+    except Exception:
+        # Do not leave half-written datasets on disk
+        writer.abort()
+        raise
+
+    dataset.row_count = writer.row_count
+    dataset.size_bytes = _csv_size(uploaded_file, stream)
+    dataset.header = header
+    dataset.summary = aggregator.to_partial()
+    dataset.save()
+    return dataset, aggregator
+
+
+def dataset_aggregator(dataset):
+    """
+    Return the running summary of a dataset.
+
+    Datasets whose summary is missing or in an older partial format are
+    summarized from their stored columns instead.
+    """
+    if dataset.summary:
+        try:
+            return SummaryAggregator.from_partial(dataset.summary)
+        except ValueError:
+            pass
+    return dataset.open_store().summary()
+
+
+@transaction.atomic
+def append_upload(dataset_id, uploaded_file, offset=None, from_source=True, **parse_options):
+    """
+    Add rows appended to a dataset's source CSV.
+
+    The upload holds only the new bytes of the source file (complete rows,
+    no header line). The work done is proportional to the new rows, and
+    the resulting summary equals a full analysis of the whole file.
+
+    Args:
+        dataset_id (UUID): Dataset primary key
+        uploaded_file: Django UploadedFile with the appended rows
+        offset (int): Byte offset of the tail in the source file. If given,
+            it must equal the dataset's size_bytes, so a tail is never
+            ingested twice or with a gap.
+        from_source (bool): False for rows that are not part of the source
+            file (POST /api/datasets/<id>/rows/); size_bytes, the offset
+            in the source file, is then left unchanged.
+        **parse_options: chunk_rows, engine, float_dtype and max_rows for
+            parsing.iter_csv_chunks()
+
+    Returns:
+        tuple: (Dataset, SummaryAggregator) after the append
+
+    Raises:
+        Dataset.DoesNotExist: If there is no such dataset
+        OffsetMismatchError: If offset does not match the dataset
+        ValueError: If the dataset has no stored header
+    """
+    # Lock the row so concurrent appends to one dataset run one at a time
+    dataset = Dataset.objects.select_for_update().get(pk=dataset_id)
+    if offset is not None and offset != dataset.size_bytes:
+        raise OffsetMismatchError(dataset.size_bytes, offset)
+
+    if not dataset.header:
+        # Without the header the columns of a tail cannot be identified
+        raise ValueError('Dataset was stored without its CSV header; upload it again to append')
+
+    aggregator = dataset_aggregator(dataset)
+    writer = ColumnarWriter(dataset.storage_dir, append=True)
+
+    try:
+        tail = SummaryAggregator()
+        stream = open_upload(uploaded_file)
+        for chunk in iter_csv_chunks(stream, header=dataset.header, **parse_options):
+            if len(chunk):
+                writer.write_chunk(chunk)
+                tail.update(chunk)
+        writer.close()
+    except Exception:
+        writer.abort()
+        raise
+
+    aggregator.merge(tail)
+    dataset.row_count = writer.row_count
+    if from_source:
+        dataset.size_bytes += _csv_size(uploaded_file, stream)
+    dataset.summary = aggregator.to_partial()
+    dataset.save()
+    return dataset, aggregator
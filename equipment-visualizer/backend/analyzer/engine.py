@@ -0,0 +1,540 @@
+"""
+Streaming Aggregation Engine
+
+This module computes the statistics returned by /api/analyze/ without
+loading the whole upload into memory.
+
+The uploaded file is read chunk by chunk (straight from Django's
+UploadedFile.chunks(), or memory-mapped when Django has spooled it to a
+temporary file; compressed uploads are decompressed on the fly), parsed
+into small DataFrames, and folded into a
+running summary that only keeps sums, counts, per-type tallies and
+fixed-size quantile sketches and histograms (sketches.py). Peak memory
+therefore depends on the chunk size, not on the file size.
+
+Parsing itself (header validation, pinned dtypes, pyarrow fast path)
+lives in parsing.py.
+
+This module does not import Django so it can be reused outside the
+request/response cycle: background jobs, batch worker processes and the
+desktop app's local mode call analyze_path() on files on disk, and
+SummaryAggregator.to_response() gives the same dictionary as
+/api/analyze/.
+"""
+
+import heapq
+import io
+import math
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+
+from .compression import decompress_stream
+from .parsing import NUMERIC_COLUMNS, SUMMARY_COLUMNS, detect_format, iter_csv_chunks, read_header
+from .sketches import Histogram, TDigest
+from .timing import NULL_TIMER
+
+
+# Percentiles reported in the "distributions" part of the response
+DISTRIBUTION_PERCENTILES = [50, 95, 99]
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    Read-only file object on top of an iterable of byte chunks.
+
+    This lets Pandas pull data from UploadedFile.chunks() as if it was a
+    regular file, without ever joining the chunks into one bytes object.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        # Fetch the next non-empty chunk once the current one is used up
+        while not self._buffer:
+            try:
+                self._buffer = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+class TypeEncoder:
+    """
+    Maps equipment type values to int32 codes.
+
+    Codes are assigned in order of first appearance, so sorting by code
+    keeps the same tie order as Series.value_counts(). Missing types are
+    encoded as -1.
+    """
+
+    def __init__(self, names=None):
+        self.codes = {name: code for code, name in enumerate(names or [])}
+
+    @property
+    def names(self):
+        """
+        List of type names; index = code.
+        """
+        return list(self.codes)
+
+    def _code_for(self, equipment_type):
+        name = str(equipment_type)
+        if name not in self.codes:
+            self.codes[name] = len(self.codes)
+        return self.codes[name]
+
+    def encode(self, values):
+        """
+        Convert a Series of equipment types into int32 codes.
+
+        Args:
+            values (Series): equipment_type column of a chunk
+
+        Returns:
+            ndarray: int32 codes, -1 for missing values
+        """
+        codes, uniques = pd.factorize(values)
+        # The trailing -1 maps factorize's "missing" code (-1) back to -1
+        mapping = np.array([self._code_for(value) for value in uniques] + [-1], dtype=np.int32)
+        return mapping[codes]
+
+
+class SummaryAggregator:
+    """
+    Running statistics for one equipment dataset.
+
+    Feed DataFrame chunks to update(), then call to_response() to get the
+    same dictionary the /api/analyze/ endpoint has always returned.
+
+    The state is a mergeable partial aggregate: per column count, sum,
+    M2 (sum of squared deviations, for the variance), min and max, plus
+    type counts, and a quantile sketch and histogram per column (see
+    sketches.py). merge() combines two aggregators associatively, and
+    to_partial()/from_partial() turn the state into JSON so partials
+    computed on different shards or machines can be merged later.
+    """
+
+    PARTIAL_FORMAT = 'equipment-partial-summary'
+    PARTIAL_VERSION = 2
+
+    def __init__(self):
+        self.total_rows = 0
+        self.sums = {column: 0.0 for column in NUMERIC_COLUMNS}
+        self.counts = {column: 0 for column in NUMERIC_COLUMNS}
+        self.m2 = {column: 0.0 for column in NUMERIC_COLUMNS}
+        self.mins = {column: math.inf for column in NUMERIC_COLUMNS}
+        self.maxs = {column: -math.inf for column in NUMERIC_COLUMNS}
+        self.digests = {column: TDigest() for column in NUMERIC_COLUMNS}
+        self.histograms = {column: Histogram() for column in NUMERIC_COLUMNS}
+        # Insertion order = order of first appearance in the file
+        self.type_counts = {}
+
+    def _combine_column(self, column, count, total, m2, minimum, maximum):
+        """
+        Fold (count, sum, M2, min, max) of another part into a column.
+
+        Uses the pairwise update of Chan et al., so the variance stays
+        accurate no matter how the data is split into parts.
+        """
+        if count == 0:
+            return
+        own_count = self.counts[column]
+        if own_count:
+            delta = total / count - self.sums[column] / own_count
+            m2 += delta * delta * own_count * count / (own_count + count)
+        self.counts[column] = own_count + count
+        self.sums[column] += total
+        self.m2[column] += m2
+        self.mins[column] = min(self.mins[column], minimum)
+        self.maxs[column] = max(self.maxs[column], maximum)
+
+    def add_values(self, column, values):
+        """
+        Add an array of values of one numeric column.
+
+        Missing values (NaN) are skipped, exactly like Series.mean().
+        Values are accumulated in float64 even if parsed as float32.
+        """
+        values = np.asarray(values)
+        values = values[~np.isnan(values)].astype(np.float64, copy=False)
+        if values.size == 0:
+            return
+        total = float(values.sum())
+        m2 = float(np.square(values - total / values.size).sum())
+        self._combine_column(
+            column, int(values.size), total, m2, float(values.min()), float(values.max())
+        )
+        self.digests[column].update(values)
+        self.histograms[column].update(values)
+
+    def add_type_counts(self, type_names, counts):
+        """
+        Add counts per equipment type (names in order of first appearance).
+        """
+        for equipment_type, count in zip(type_names, counts):
+            if count:
+                self.type_counts[equipment_type] = self.type_counts.get(equipment_type, 0) + int(count)
+
+    def update(self, chunk):
+        """
+        Add one DataFrame chunk to the running statistics.
+
+        Args:
+            chunk (DataFrame): Rows containing the required columns
+        """
+        self.total_rows += len(chunk)
+
+        for column in NUMERIC_COLUMNS:
+            self.add_values(column, chunk[column].to_numpy())
+
+        # factorize() keeps first-appearance order, also for category dtype
+        # (whose value_counts() would follow the sorted category order)
+        codes, uniques = pd.factorize(chunk['equipment_type'])
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        self.add_type_counts(uniques, counts)
+
+    def merge(self, other):
+        """
+        Add the statistics of another aggregator (e.g. another file).
+
+        Sums and counts are added, so the merged means are weighted by
+        row count rather than being an average of averages.
+
+        Args:
+            other (SummaryAggregator): Statistics to add
+
+        Returns:
+            SummaryAggregator: self, for chaining
+        """
+        self.total_rows += other.total_rows
+        for column in NUMERIC_COLUMNS:
+            self._combine_column(
+                column,
+                other.counts[column],
+                other.sums[column],
+                other.m2[column],
+                other.mins[column],
+                other.maxs[column]
+            )
+            self.digests[column].merge(other.digests[column])
+            self.histograms[column].merge(other.histograms[column])
+        self.add_type_counts(other.type_counts.keys(), other.type_counts.values())
+        return self
+
+    def mean(self, column):
+        """
+        Return the running mean of a numeric column (None if it has no values).
+        """
+        if self.counts[column] == 0:
+            # NaN is not valid JSON, so an empty column has no average
+            return None
+        return self.sums[column] / self.counts[column]
+
+    def rounded_mean(self, column):
+        """
+        Return the mean rounded to 2 decimals, as shown to users.
+        """
+        mean = self.mean(column)
+        return None if mean is None else round(mean, 2)
+
+    def std(self, column):
+        """
+        Return the sample standard deviation (ddof=1), like Series.std().
+        """
+        if self.counts[column] < 2:
+            return None
+        return math.sqrt(self.m2[column] / (self.counts[column] - 1))
+
+    def sorted_type_counts(self, top_n=None):
+        """
+        Return type counts sorted like Series.value_counts().
+
+        Highest count first; ties keep their order of first appearance.
+        With top_n, only the top_n most common types (selected with a
+        heap, so thousands of types are not fully sorted).
+        """
+        if top_n is not None:
+            return dict(heapq.nlargest(top_n, self.type_counts.items(), key=lambda item: item[1]))
+        ordered = sorted(self.type_counts.items(), key=lambda item: item[1], reverse=True)
+        return dict(ordered)
+
+    def to_response(self, top_n=None):
+        """
+        Build the /api/analyze/ response dictionary.
+
+        With top_n, equipment_by_type only has the top_n most common
+        types, and equipment_by_type_other the number of remaining types
+        and their total count, so the response size does not grow with
+        the number of types.
+        """
+        response = {
+            'total_equipment': self.total_rows,
+            'average_flowrate': self.rounded_mean('flowrate'),
+            'average_pressure': self.rounded_mean('pressure'),
+            'average_temperature': self.rounded_mean('temperature'),
+            'equipment_by_type': self.sorted_type_counts(top_n),
+            'distributions': self.distributions()
+        }
+        if top_n is not None:
+            shown = response['equipment_by_type']
+            response['equipment_by_type_other'] = {
+                'types': len(self.type_counts) - len(shown),
+                'count': sum(self.type_counts.values()) - sum(shown.values())
+            }
+        return response
+
+    def distributions(self):
+        """
+        Return approximate quantiles and a histogram of every numeric column.
+        """
+        distributions = {}
+        for column in NUMERIC_COLUMNS:
+            estimates = self.digests[column].quantiles([q / 100 for q in DISTRIBUTION_PERCENTILES])
+            distribution = {
+                f'p{q}': None if value is None else round(value, 2)
+                for q, value in zip(DISTRIBUTION_PERCENTILES, estimates)
+            }
+            distribution['histogram'] = self.histograms[column].bins()
+            distributions[column] = distribution
+        return distributions
+
+    def column_statistics(self):
+        """
+        Return count, mean, std, min and max of every numeric column.
+        """
+        statistics = {}
+        for column in NUMERIC_COLUMNS:
+            has_values = self.counts[column] > 0
+            std = self.std(column)
+            statistics[column] = {
+                'count': self.counts[column],
+                'mean': self.rounded_mean(column),
+                'std': None if std is None else round(std, 2),
+                'min': round(self.mins[column], 2) if has_values else None,
+                'max': round(self.maxs[column], 2) if has_values else None
+            }
+        return statistics
+
+    def to_partial(self):
+        """
+        Serialize the full aggregate state as a JSON-compatible dictionary.
+        """
+        columns = {}
+        for column in NUMERIC_COLUMNS:
+            has_values = self.counts[column] > 0
+            columns[column] = {
+                'count': self.counts[column],
+                'sum': self.sums[column],
+                'm2': self.m2[column],
+                'min': self.mins[column] if has_values else None,
+                'max': self.maxs[column] if has_values else None,
+                'digest': self.digests[column].to_dict(),
+                'histogram': self.histograms[column].to_dict()
+            }
+        return {
+            'format': self.PARTIAL_FORMAT,
+            'version': self.PARTIAL_VERSION,
+            'total_rows': self.total_rows,
+            'columns': columns,
+            # Keys keep their order of first appearance
+            'type_counts': {str(name): count for name, count in self.type_counts.items()}
+        }
+
+    @classmethod
+    def from_partial(cls, data):
+        """
+        Rebuild an aggregator from to_partial() output.
+
+        Raises:
+            ValueError: If data is not a valid partial summary
+        """
+        if not isinstance(data, dict) or data.get('format') != cls.PARTIAL_FORMAT:
+            raise ValueError('Not an equipment partial summary')
+        if data.get('version') != cls.PARTIAL_VERSION:
+            raise ValueError(f'Unsupported partial summary version: {data.get("version")}')
+
+        aggregator = cls()
+        try:
+            aggregator.total_rows = int(data['total_rows'])
+            for column in NUMERIC_COLUMNS:
+                state = data['columns'][column]
+                count = int(state['count'])
+                if count:
+                    aggregator._combine_column(
+                        column, count, float(state['sum']), float(state['m2']),
+                        float(state['min']), float(state['max'])
+                    )
+                aggregator.digests[column] = TDigest.from_dict(state['digest'])
+                aggregator.histograms[column] = Histogram.from_dict(state['histogram'])
+            aggregator.add_type_counts(
+                data['type_counts'].keys(),
+                [int(count) for count in data['type_counts'].values()]
+            )
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f'Malformed partial summary: {e}')
+        return aggregator
+
+
+def parse_top_n(value):
+    """
+    Parse the top_n option (number of equipment types to return).
+
+    Args:
+        value (str): Query parameter value, or None for all types
+
+    Returns:
+        int or None: A positive number of types, or None
+
+    Raises:
+        ValueError: If the value is not a positive integer
+    """
+    if value in (None, ''):
+        return None
+    top_n = int(value)
+    if top_n < 1:
+        raise ValueError(f'must be at least 1, got {top_n}')
+    return top_n
+
+
+def analyze_stream(stream, progress=None, timer=NULL_TIMER, **parse_options):
+    """
+    Compute equipment statistics from a binary CSV stream.
+
+    Args:
+        stream: Binary file-like object
+        progress (callable): Optional; called with the number of rows
+            processed so far after every chunk
+        timer (StageTimer): Optional; records "parse" (reading and
+            parsing the CSV) and "aggregate" time and the row count
+        **parse_options: chunk_rows, engine, float_dtype and max_rows for
+            parsing.iter_csv_chunks()
+
+    Returns:
+        SummaryAggregator: The finished running summary
+
+    Raises:
+        MissingColumnsError: If a required column is not in the header
+        RowLimitError: If the stream has more rows than max_rows
+    """
+    aggregator = SummaryAggregator()
+    chunks = iter_csv_chunks(stream, columns=SUMMARY_COLUMNS, **parse_options)
+    while True:
+        with timer.stage('parse'):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        with timer.stage('aggregate'):
+            aggregator.update(chunk)
+        if progress is not None:
+            progress(aggregator.total_rows)
+    timer.count(rows=aggregator.total_rows)
+    return aggregator
+
+
+def map_file(path):
+    """
+    Return a read-only memory map of a file on disk.
+
+    The map behaves like a binary file (read, readline, seek), and the
+    parser hands it to pyarrow without copying. It is unmapped when the
+    last reference to it goes away; parsers may still hold zero-copy
+    views of it, so it is not closed explicitly.
+    """
+    with open(path, 'rb') as source:
+        if os.fstat(source.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            return io.BytesIO()
+        return mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def open_path(path):
+    """
+    Return a binary CSV stream over a file on disk.
+
+    The file is memory-mapped, and decompressed on the fly if it is
+    gzip-, zstd- or zip-compressed (see compression.py).
+    """
+    return decompress_stream(map_file(path))
+
+
+def analyze_path(path, **parse_options):
+    """
+    Compute equipment statistics from a file on disk.
+
+    The file may be a CSV (plain or compressed) or, with pyarrow
+    installed, a Parquet or Arrow IPC file.
+
+    Args:
+        path (str): Path of the file
+        **parse_options: See analyze_stream()
+
+    Returns:
+        SummaryAggregator: The finished running summary
+    """
+    return analyze_stream(open_path(path), **parse_options)
+
+
+def open_upload(uploaded_file):
+    """
+    Return a binary CSV stream over a Django UploadedFile.
+
+    Uploads Django has spooled to a temporary file (larger than
+    FILE_UPLOAD_MAX_MEMORY_SIZE) are memory-mapped, so they are parsed
+    in place. In-memory uploads are consumed through
+    uploaded_file.chunks() in fixed-size pieces. Compressed uploads are
+    decompressed on the fly.
+
+    Raises:
+        CompressionError: If a compressed upload cannot be opened
+    """
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        return open_path(uploaded_file.temporary_file_path())
+    return decompress_stream(io.BufferedReader(ChunkReader(uploaded_file.chunks())))
+
+
+def check_upload_header(uploaded_file):
+    """
+    Validate the header line of a CSV upload without reading the rest.
+
+    Lets a view reject a file with the wrong columns before it makes a
+    full pass over it (hashing it for the result cache or spooling it
+    for a job). Parquet and Arrow uploads, and empty files, are left to
+    the parser.
+
+    Raises:
+        MissingColumnsError: If a required column is not in the header
+        UploadFormatError: If a compressed upload cannot be opened
+    """
+    stream = open_upload(uploaded_file)
+    if detect_format(stream) != 'csv':
+        return
+    try:
+        read_header(stream)
+    except pd.errors.EmptyDataError:
+        pass
+
+
+def analyze_upload(uploaded_file, **parse_options):
+    """
+    Compute equipment statistics from a Django UploadedFile.
+
+    Args:
+        uploaded_file: Django UploadedFile from request.FILES
+        **parse_options: See analyze_stream()
+
+    Returns:
+        SummaryAggregator: The finished running summary
+    """
+    return analyze_stream(open_upload(uploaded_file), **parse_options)
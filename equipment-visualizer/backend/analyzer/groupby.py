@@ -0,0 +1,201 @@
+"""
+Per-Type Statistics
+
+Computes count/mean/std/min/max/percentiles of every numeric column for
+every equipment type in one vectorized group-by pass.
+
+Rows are represented by an int32 type code array plus one float array per
+numeric column. Sums and counts come from np.bincount, and a single
+lexsort by (type code, value) per column gives min, max and all
+percentiles for all types at once. There is no Python loop over types,
+so thousands of types cost the same as a handful.
+
+The result uses a compact columnar JSON layout:
+
+    {
+        "types": ["Pump", "Reactor", ...],
+        "count": [10, 9, ...],
+        "percentiles": [25, 50, 75, 95],
+        "columns": {
+            "flowrate": {"count": [...], "mean": [...], "std": [...],
+                         "min": [...], "max": [...], "p25": [...], ...},
+            ...
+        }
+    }
+
+Position i of every list belongs to types[i]. Types are ordered like
+equipment_by_type (highest row count first).
+"""
+
+import numpy as np
+
+from .engine import TypeEncoder
+from .parsing import NUMERIC_COLUMNS, SUMMARY_COLUMNS, iter_csv_chunks
+
+
+DEFAULT_PERCENTILES = [25, 50, 75, 95]
+
+# Same rounding as the averages returned by /api/analyze/
+STAT_DECIMALS = 2
+
+
+def parse_percentiles(value):
+    """
+    Parse a comma-separated percentile list such as "5,50,95".
+
+    Args:
+        value (str): Query parameter value, or None for the defaults
+
+    Returns:
+        list: Percentiles as numbers between 0 and 100
+
+    Raises:
+        ValueError: If a value is not a number in [0, 100]
+    """
+    if not value:
+        return list(DEFAULT_PERCENTILES)
+
+    percentiles = []
+    for item in value.split(','):
+        number = float(item)
+        if not 0 <= number <= 100:
+            raise ValueError(f'Percentile out of range: {item}')
+        percentiles.append(int(number) if number.is_integer() else number)
+    return percentiles
+
+
+def _percentile_key(q):
+    return f'p{q}'.replace('.', '_')
+
+
+def _column_statistics(codes, values, type_count, percentiles):
+    """
+    Compute per-type statistics of one numeric column.
+
+    Returns:
+        dict: Statistic name -> float64 array indexed by type code
+    """
+    # Ignore rows without a type or without a value (like pandas does)
+    mask = (codes >= 0) & ~np.isnan(values)
+    group = codes[mask]
+    values = np.asarray(values[mask], dtype=np.float64)
+
+    counts = np.bincount(group, minlength=type_count)
+    sums = np.bincount(group, weights=values, minlength=type_count)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+        squared = np.bincount(group, weights=(values - means[group]) ** 2, minlength=type_count)
+        # Sample standard deviation (ddof=1), same as Series.std()
+        stds = np.sqrt(squared / (counts - 1))
+    stds[counts < 2] = np.nan
+
+    # One sort by (type, value) gives min, max and percentiles of all types
+    sorted_values = values[np.lexsort((values, group))]
+    starts = np.cumsum(counts) - counts
+    present = counts > 0
+
+    def pick(positions):
+        result = np.full(type_count, np.nan)
+        result[present] = sorted_values[positions[present]]
+        return result
+
+    stats = {
+        'count': counts,
+        'mean': means,
+        'std': stds,
+        'min': pick(starts),
+        'max': pick(starts + counts - 1)
+    }
+
+    # Linear interpolation between closest ranks, same as Series.quantile()
+    for q in percentiles:
+        positions = starts + (counts - 1) * (q / 100.0)
+        lower = np.floor(positions).astype(np.int64)
+        upper = np.ceil(positions).astype(np.int64)
+        lower_values = pick(lower)
+        upper_values = pick(upper)
+        stats[_percentile_key(q)] = lower_values + (upper_values - lower_values) * (positions - lower)
+
+    return stats
+
+
+def _to_json_list(array):
+    """
+    Round an array and convert it to a list, with NaN -> None.
+    """
+    if array.dtype.kind in 'iu':
+        return array.tolist()
+    rounded = np.round(array, STAT_DECIMALS)
+    return [None if np.isnan(value) else value for value in rounded.tolist()]
+
+
+def group_statistics(codes, columns, type_names, percentiles=None):
+    """
+    Compute per-type statistics for all numeric columns.
+
+    Args:
+        codes (ndarray): int32 type code per row (-1 = missing type)
+        columns (dict): Column name -> float array with one value per row
+        type_names (list): Type name per code
+        percentiles (list): Percentiles to compute (default 25/50/75/95)
+
+    Returns:
+        dict: Compact columnar layout described in the module docstring
+    """
+    if percentiles is None:
+        percentiles = list(DEFAULT_PERCENTILES)
+
+    type_count = len(type_names)
+    row_counts = np.bincount(codes[codes >= 0], minlength=type_count)
+
+    # Highest row count first; stable sort keeps first-appearance order on ties
+    order = np.argsort(-row_counts, kind='stable')
+    order = order[row_counts[order] > 0]
+
+    result = {
+        'types': [type_names[code] for code in order],
+        'count': row_counts[order].tolist(),
+        'percentiles': percentiles,
+        'columns': {}
+    }
+
+    for name, values in columns.items():
+        stats = _column_statistics(codes, values, type_count, percentiles)
+        result['columns'][name] = {
+            stat: _to_json_list(array[order]) for stat, array in stats.items()
+        }
+
+    return result
+
+
+def collect_group_columns(stream, **parse_options):
+    """
+    Parse a CSV stream into the compact arrays used by group_statistics().
+
+    Only the type codes and numeric columns are kept (4 numbers per row),
+    not the parsed DataFrames.
+
+    Args:
+        stream: Binary file-like object
+        **parse_options: chunk_rows, engine, float_dtype and max_rows for
+            parsing.iter_csv_chunks()
+
+    Returns:
+        tuple: (codes, columns, type_names)
+    """
+    encoder = TypeEncoder()
+    code_parts = []
+    column_parts = {column: [] for column in NUMERIC_COLUMNS}
+
+    for chunk in iter_csv_chunks(stream, columns=SUMMARY_COLUMNS, **parse_options):
+        code_parts.append(encoder.encode(chunk['equipment_type']))
+        for column in NUMERIC_COLUMNS:
+            column_parts[column].append(chunk[column].to_numpy())
+
+    codes = np.concatenate(code_parts) if code_parts else np.empty(0, dtype=np.int32)
+    columns = {
+        column: np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+        for column, parts in column_parts.items()
+    }
+    return codes, columns, encoder.names
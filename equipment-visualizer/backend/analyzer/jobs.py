@@ -0,0 +1,251 @@
+"""
+Background Analysis Jobs
+
+POST /api/analyze/?async=1 does not analyze the file inside the request.
+The upload is spooled to disk, an AnalysisJob row is created in the
+existing SQLite database, and the job is handed to a local worker pool.
+The request returns the job ID right away.
+
+Workers record the number of rows processed after every parsed chunk,
+so GET /api/jobs/<id>/ can report progress while the job runs, and the
+final result (or error) once it is done. No external broker is needed.
+
+The pool lives in the server process, so jobs that were queued or
+running when that process stopped are lost with it. Every job records
+its owner (host, process ID and a per-process token). When a job is
+created or its status is requested, queued or running jobs whose owner
+process is no longer alive are marked failed and their spooled uploads
+removed, so clients polling them get an answer instead of waiting
+forever. Jobs of other live worker processes are left alone.
+"""
+
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .cache import get_result_cache, make_cache_key, new_content_hash
+from .engine import analyze_path
+from .models import AnalysisJob
+from .parsing import MissingColumnsError, RowLimitError, UploadFormatError
+
+
+DEFAULT_JOB_WORKERS = 2
+
+INTERRUPTED_ERROR = 'The server restarted before the analysis finished; upload the file again'
+
+# Owner of the jobs this process creates: "host:pid:token". The token
+# tells this process apart from an earlier one that had the same PID
+# (a restarted container usually gets the same PID again).
+PROCESS_OWNER = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pid_alive(pid):
+    """
+    Check whether a process with this ID runs on this machine.
+    """
+    if os.name == 'nt':
+        # os.kill() would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x00100000, False, pid)  # SYNCHRONIZE
+        if not handle:
+            return False
+        try:
+            return kernel32.WaitForSingleObject(handle, 0) == 0x00000102  # WAIT_TIMEOUT
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def owner_alive(owner):
+    """
+    Check whether the process that owns a job is still running.
+
+    Owners on other hosts cannot be checked and count as alive. Jobs
+    without an owner (created before owners were recorded) count as
+    dead.
+    """
+    if owner == PROCESS_OWNER:
+        return True
+    host, _, rest = owner.partition(':')
+    pid, _, token = rest.partition(':')
+    if not pid.isdigit():
+        return False
+    if host != socket.gethostname():
+        return True
+    if int(pid) == os.getpid():
+        # Same PID, different token: an earlier process
+        return False
+    return _pid_alive(int(pid))
+
+
+def recover_interrupted_jobs():
+    """
+    Fail the queued or running jobs whose owner process has stopped.
+
+    Returns:
+        int: Number of jobs marked failed
+    """
+    active = AnalysisJob.objects.filter(
+        status__in=[AnalysisJob.Status.QUEUED, AnalysisJob.Status.RUNNING]
+    ).exclude(owner=PROCESS_OWNER)
+    owners = {}
+    job_ids = []
+    for job_id, owner in active.values_list('id', 'owner'):
+        if owner not in owners:
+            owners[owner] = owner_alive(owner)
+        if not owners[owner]:
+            job_ids.append(job_id)
+    if not job_ids:
+        return 0
+
+    for job_id in job_ids:
+        AnalysisJob(id=job_id).upload_path.unlink(missing_ok=True)
+    # Only jobs that are still unfinished; the status filter makes this safe
+    return active.filter(id__in=job_ids).update(
+        status=AnalysisJob.Status.FAILED,
+        error=INTERRUPTED_ERROR,
+        finished_at=timezone.now()
+    )
+
+
+def get_executor():
+    """
+    Return the process-wide worker pool, creating it on first use.
+
+    Parsing runs in Pandas/pyarrow native code, so worker threads do
+    not hold the GIL for most of a job.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ANALYZER_JOB_WORKERS', DEFAULT_JOB_WORKERS),
+                thread_name_prefix='analyzer-job'
+            )
+        return _executor
+
+
+def spool_upload(uploaded_file, path):
+    """
+    Copy an upload to disk and hash it in the same pass.
+
+    Args:
+        uploaded_file: Django UploadedFile from request.FILES
+        path (Path): Destination file
+
+    Returns:
+        str: Content hash (same as cache.hash_upload())
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    digest = new_content_hash()
+    with open(path, 'wb') as spool_file:
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+            spool_file.write(chunk)
+    return digest.hexdigest()
+
+
+def submit_job(uploaded_file, parse_options, cache_options, top_n=None):
+    """
+    Create an AnalysisJob for an upload and queue it.
+
+    If the same file was analyzed before, the job is completed from the
+    result cache immediately.
+
+    Args:
+        uploaded_file: Django UploadedFile from request.FILES
+        parse_options (dict): Keyword arguments for analyze_stream()
+        cache_options (dict): Options that are part of the cache key
+        top_n (int): Equipment types in the result, or None for all
+
+    Returns:
+        AnalysisJob: The new job
+    """
+    recover_interrupted_jobs()
+    job = AnalysisJob(
+        file_name=uploaded_file.name or 'upload.csv',
+        size_bytes=uploaded_file.size or 0,
+        owner=PROCESS_OWNER
+    )
+    content_hash = spool_upload(uploaded_file, job.upload_path)
+
+    result_cache = get_result_cache()
+    cache_key = None
+    if result_cache is not None:
+        cache_key = make_cache_key(content_hash, cache_options)
+        cached_data = result_cache.get(cache_key)
+        if cached_data is not None:
+            job.upload_path.unlink(missing_ok=True)
+            job.status = AnalysisJob.Status.DONE
+            job.result = cached_data
+            job.rows_processed = cached_data['total_equipment']
+            job.started_at = job.finished_at = timezone.now()
+            job.save()
+            return job
+
+    job.save()
+    get_executor().submit(run_job, job.id, parse_options, cache_key, top_n)
+    return job
+
+
+def run_job(job_id, parse_options, cache_key=None, top_n=None):
+    """
+    Analyze a spooled upload (runs in a worker thread).
+
+    Args:
+        job_id (UUID): AnalysisJob primary key
+        parse_options (dict): Keyword arguments for analyze_stream()
+        cache_key (str): Where to store the result, or None
+        top_n (int): Equipment types in the result, or None for all
+    """
+    jobs = AnalysisJob.objects.filter(pk=job_id)
+    upload_path = AnalysisJob(id=job_id).upload_path
+
+    def report_progress(rows_processed):
+        jobs.update(rows_processed=rows_processed)
+
+    try:
+        jobs.update(status=AnalysisJob.Status.RUNNING, started_at=timezone.now())
+
+        summary = analyze_path(upload_path, progress=report_progress, **parse_options)
+        result = summary.to_response(top_n)
+
+        jobs.update(
+            status=AnalysisJob.Status.DONE,
+            rows_processed=summary.total_rows,
+            result=result,
+            finished_at=timezone.now()
+        )
+
+        result_cache = get_result_cache()
+        if result_cache is not None and cache_key is not None:
+            result_cache.set(cache_key, result)
+
+    except (MissingColumnsError, RowLimitError, UploadFormatError) as e:
+        jobs.update(status=AnalysisJob.Status.FAILED, error=str(e), finished_at=timezone.now())
+    except Exception as e:
+        jobs.update(
+            status=AnalysisJob.Status.FAILED,
+            error=f'Error processing file: {str(e)}',
+            finished_at=timezone.now()
+        )
+    finally:
+        upload_path.unlink(missing_ok=True)
+        # Worker threads are not request threads; release their DB connection
+        connection.close()
@@ -0,0 +1,176 @@
+"""
+Live Dataset Streams
+
+GET /api/datasets/<id>/stream/ keeps the connection open and pushes the
+dataset's statistics as Server-Sent Events while rows are added to it
+(PATCH /api/datasets/<id>/append/ or POST /api/datasets/<id>/rows/).
+
+The stream checks the dataset once per interval (one small query for
+its updated_at) and sends at most one event per interval. Appends that
+happen within one interval are coalesced: the event carries the
+statistics after all of them. The first event ("summary") is the full
+/api/analyze/ dictionary; later events ("delta") hold only the keys
+whose values changed, so clients merge them into what they have. For
+dictionary values (equipment_by_type, distributions, ...) the delta goes
+one level down: it holds only the changed entries, and null for entries
+that are gone (a type that dropped out of the top_n), so clients merge
+those dictionaries too and remove the null entries.
+Because the state lives in the database, streams work across server
+processes and reconnecting clients simply get a new full summary.
+
+Events look like this:
+
+    event: summary
+    data: {"total_equipment": 25, ...}
+
+    event: delta
+    data: {"total_equipment": 31, "equipment_by_type": {"Pump": 14}, ...}
+
+When nothing changed, a comment line (": keepalive") is sent instead,
+so clients and proxies can tell a quiet stream from a dead connection.
+"event: deleted" ends the stream when the dataset is deleted.
+"""
+
+import asyncio
+import json
+import math
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .datasets import dataset_aggregator
+from .models import Dataset
+
+
+DEFAULT_STREAM_INTERVAL = 1.0
+
+KEEPALIVE = b': keepalive\n\n'
+
+
+def stream_interval(requested=None):
+    """
+    Seconds between events of a stream.
+
+    Args:
+        requested (str): The ?interval= query parameter, or None
+
+    Returns:
+        float: The requested interval, but never below
+        ANALYZER_STREAM_INTERVAL (clients can only ask for fewer events)
+
+    Raises:
+        ValueError: If the requested interval is not a finite number
+    """
+    minimum = getattr(settings, 'ANALYZER_STREAM_INTERVAL', DEFAULT_STREAM_INTERVAL)
+    if requested in (None, ''):
+        return minimum
+    interval = float(requested)
+    if not math.isfinite(interval):
+        # nan would slip past max(); inf would overflow time.sleep()
+        raise ValueError(f'interval must be a finite number, got {requested}')
+    return max(interval, minimum)
+
+
+def summary_delta(previous, current):
+    """
+    Keys of a summary whose values changed.
+
+    Dictionary values that were dictionaries before as well are diffed one
+    level down: only their changed entries are kept, and removed entries
+    are None.
+    """
+    delta = {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if old == value:
+            continue
+        if isinstance(value, dict) and isinstance(old, dict):
+            changed = {name: item for name, item in value.items() if old.get(name) != item}
+            changed.update({name: None for name in old if name not in value})
+            value = changed
+        delta[key] = value
+    return delta
+
+
+def format_event(event, data):
+    """
+    Encode one Server-Sent Event.
+    """
+    return f'event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'.encode()
+
+
+class DatasetStream:
+    """
+    Follows one dataset and produces the events of its stream.
+
+    poll() does the database work and is synchronous; iter_sync() and
+    iter_async() wrap it for WSGI and ASGI servers.
+    """
+
+    def __init__(self, dataset_id, top_n=None, interval=DEFAULT_STREAM_INTERVAL):
+        self.dataset_id = dataset_id
+        self.top_n = top_n
+        self.interval = interval
+        self.version = None
+        self.sent = None
+        self.finished = False
+
+    def poll(self):
+        """
+        Check the dataset once.
+
+        Returns:
+            bytes: The next event, or KEEPALIVE if nothing changed
+        """
+        version = (
+            Dataset.objects.filter(pk=self.dataset_id)
+            .values_list('updated_at', flat=True)
+            .first()
+        )
+        if version is None:
+            self.finished = True
+            return format_event('deleted', {'id': str(self.dataset_id)})
+        if version == self.version:
+            return KEEPALIVE
+
+        dataset = Dataset.objects.filter(pk=self.dataset_id).first()
+        if dataset is None:
+            self.finished = True
+            return format_event('deleted', {'id': str(self.dataset_id)})
+        self.version = dataset.updated_at
+        summary = dataset_aggregator(dataset).to_response(self.top_n)
+
+        if self.sent is None:
+            self.sent = summary
+            return format_event('summary', summary)
+
+        delta = summary_delta(self.sent, summary)
+        self.sent = summary
+        return format_event('delta', delta) if delta else KEEPALIVE
+
+    def iter_sync(self):
+        """
+        Events for a WSGI server (blocks its request thread).
+        """
+        while True:
+            started = time.monotonic()
+            yield self.poll()
+            if self.finished:
+                return
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def iter_async(self):
+        """
+        Events for an ASGI server (waits without holding a thread).
+        """
+        # Not thread-sensitive: polls of many streams run in the default
+        # executor side by side, instead of queueing for the one thread
+        # that runs sync views
+        poll = sync_to_async(self.poll, thread_sensitive=False)
+        while True:
+            started = time.monotonic()
+            yield await poll()
+            if self.finished:
+                return
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
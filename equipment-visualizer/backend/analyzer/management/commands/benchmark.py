@@ -0,0 +1,143 @@
+"""
+python manage.py benchmark
+
+Generates synthetic equipment CSVs and measures the analysis pipeline
+stage by stage (see analyzer/benchmark.py). Results are written as JSON
+so runs on different commits can be compared with --compare.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from analyzer.benchmark import (
+    BENCHMARK_FORMAT_VERSION, STAGES, compare_results, environment_info, generate_csv, run_stages
+)
+from analyzer.views import _parse_options
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the CSV analysis pipeline on synthetic data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', default='1000,100000,1000000',
+            help='Comma-separated row counts (default: 1000,100000,1000000)'
+        )
+        parser.add_argument('--types', type=int, default=5, help='Distinct equipment types')
+        parser.add_argument('--dirty', type=float, default=0.0,
+                            help='Fraction of rows with a defect (0 to 1)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per stage')
+        parser.add_argument('--data-dir',
+                            help='Keep generated CSVs here and reuse them (default: temporary)')
+        parser.add_argument('--output', default='benchmark-results.json',
+                            help='Where to write the JSON results')
+        parser.add_argument('--no-end-to-end', action='store_true',
+                            help='Skip the Django test client stage (it holds the upload in memory)')
+        parser.add_argument('--compare', help='Earlier results file to compare against')
+        parser.add_argument('--threshold', type=float, default=1.2,
+                            help='Slowdown ratio reported as a regression (default: 1.2)')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error if --compare finds a regression')
+
+    def handle(self, *args, **options):
+        try:
+            row_counts = [int(value) for value in options['rows'].split(',')]
+        except ValueError:
+            raise CommandError('--rows must be comma-separated integers')
+        if not 0 <= options['dirty'] <= 1:
+            raise CommandError('--dirty must be between 0 and 1')
+
+        if options['data_dir']:
+            data_dir = Path(options['data_dir'])
+            data_dir.mkdir(parents=True, exist_ok=True)
+            temp_dir = None
+        else:
+            temp_dir = tempfile.TemporaryDirectory(prefix='analyzer-bench-')
+            data_dir = Path(temp_dir.name)
+
+        client = None if options['no_end_to_end'] else Client(SERVER_NAME='localhost')
+
+        results = {
+            'format_version': BENCHMARK_FORMAT_VERSION,
+            'created_at': timezone.now().isoformat(),
+            'environment': environment_info(),
+            'cases': []
+        }
+
+        try:
+            # Measure parsing work, without the result cache or upload limits
+            with override_settings(ANALYZER_RESULT_CACHE=None, ANALYZER_MAX_UPLOAD_SIZE=None,
+                                   ANALYZER_MAX_UPLOAD_ROWS=None):
+                # Read inside the override, so the in-process stages have no row limit either
+                parse_options = _parse_options()
+                results['parse_options'] = parse_options
+                for rows in row_counts:
+                    results['cases'].append(
+                        self.run_case(data_dir, rows, options, parse_options, client)
+                    )
+        finally:
+            if temp_dir is not None:
+                temp_dir.cleanup()
+
+        with open(options['output'], 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+        self.stdout.write(f'Results written to {options["output"]}')
+
+        if options['compare']:
+            self.compare(options)
+
+    def run_case(self, data_dir, rows, options, parse_options, client):
+        path = data_dir / f'bench-{rows}-t{options["types"]}-d{options["dirty"]}-s{options["seed"]}.csv'
+        if not path.exists():
+            self.stdout.write(f'Generating {rows:,} rows...')
+            generate_csv(path, rows, options['types'], options['dirty'], options['seed'])
+
+        self.stdout.write(f'Benchmarking {rows:,} rows ({path.stat().st_size:,} bytes)')
+        stages = run_stages(path, parse_options, options['repeat'], client)
+
+        for stage in STAGES:
+            if stage in stages:
+                measured = stages[stage]
+                self.stdout.write(
+                    f'  {stage:<11} {measured["median_seconds"]:9.4f} s '
+                    f'(min {measured["min_seconds"]:.4f})  '
+                    f'peak {measured["peak_bytes"] / 1024 / 1024:8.1f} MiB'
+                )
+
+        # Throughput of the full request, or of the analysis alone
+        total = stages.get('end_to_end', stages['analyze'])['median_seconds']
+        return {
+            'rows': rows,
+            'types': options['types'],
+            'dirty': options['dirty'],
+            'seed': options['seed'],
+            'bytes': path.stat().st_size,
+            'rows_per_second': rows / total if total else None,
+            'stages': stages
+        }
+
+    def compare(self, options):
+        with open(options['compare']) as previous_file:
+            previous = json.load(previous_file)
+        with open(options['output']) as current_file:
+            current = json.load(current_file)
+
+        regressions = compare_results(previous, current, options['threshold'])
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('No regressions'))
+            return
+
+        for (rows, types, dirty), stage, old, new, ratio in regressions:
+            self.stdout.write(self.style.WARNING(
+                f'REGRESSION {rows:,} rows / {types} types / dirty {dirty}: '
+                f'{stage} {old:.4f} s -> {new:.4f} s ({ratio:.2f}x)'
+            ))
+        if options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} stage(s) slower than {options["threshold"]}x')
@@ -0,0 +1,232 @@
+"""
+Request Metrics
+
+StageTimingMiddleware gives every request a StageTimer (timing.py) as
+request.analyzer_timer. Views pass it down to the analysis code, which
+records its stages. When the response is ready, the middleware
+
+- adds a Server-Timing header with every stage and the total, so the
+  browser's network panel shows where the time went, and
+- records the request in the process-wide METRICS registry, served in
+  Prometheus text format by GET /api/metrics/.
+
+Only requests handled by analyzer views are recorded. With
+ANALYZER_METRICS_ENABLED = False the middleware removes itself at
+startup (MiddlewareNotUsed), views get NULL_TIMER, and no timing code
+runs at all.
+"""
+
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .timing import StageTimer
+
+
+# Upper bounds of the latency histogram buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Upper bounds of the throughput histogram buckets (rows per second)
+THROUGHPUT_BUCKETS = (1e3, 1e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 2.5e7)
+
+
+def metrics_enabled():
+    return getattr(settings, 'ANALYZER_METRICS_ENABLED', True)
+
+
+class _Histogram:
+    """
+    Cumulative-style histogram as used by Prometheus.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        bounds = [f'{bound:g}' for bound in self.buckets] + ['+Inf']
+        for bound, count in zip(bounds, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{_labels(labels, le=bound)} {cumulative}'
+        yield f'{name}_sum{_labels(labels)} {self.sum!r}'
+        yield f'{name}_count{_labels(labels)} {self.count}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in items) + '}'
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-memory metrics for one server process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}       # (view, status) -> count
+            self.latency = {}        # view -> _Histogram
+            self.stages = {}         # (view, stage) -> _Histogram
+            self.rows = {}           # view -> rows processed
+            self.bytes = {}          # view -> bytes processed
+            self.throughput = {}     # view -> _Histogram of rows/sec
+
+    def record(self, view, status, total, timer):
+        """
+        Add one finished request.
+
+        Args:
+            view (str): URL name of the view
+            status (int): HTTP status code
+            total (float): Seconds from request to rendered response
+            timer (StageTimer): Stages, rows and bytes of the request
+        """
+        with self._lock:
+            key = (view, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.latency.setdefault(view, _Histogram(LATENCY_BUCKETS)).observe(total)
+
+            for stage, seconds in timer.durations.items():
+                self.stages.setdefault((view, stage), _Histogram(LATENCY_BUCKETS)).observe(seconds)
+
+            if timer.rows or timer.bytes:
+                self.rows[view] = self.rows.get(view, 0) + timer.rows
+                self.bytes[view] = self.bytes.get(view, 0) + timer.bytes
+            if timer.rows and total > 0:
+                self.throughput.setdefault(view, _Histogram(THROUGHPUT_BUCKETS)).observe(
+                    timer.rows / total
+                )
+
+    def render(self):
+        """
+        Return all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            lines += [
+                '# HELP analyzer_requests_total Requests handled by analyzer views.',
+                '# TYPE analyzer_requests_total counter',
+            ]
+            for (view, status), count in sorted(self.requests.items()):
+                lines.append(f'analyzer_requests_total{_labels([("view", view), ("status", status)])} {count}')
+
+            lines += [
+                '# HELP analyzer_request_duration_seconds Time from request to rendered response.',
+                '# TYPE analyzer_request_duration_seconds histogram',
+            ]
+            for view, histogram in sorted(self.latency.items()):
+                lines += histogram.lines('analyzer_request_duration_seconds', [('view', view)])
+
+            lines += [
+                '# HELP analyzer_stage_duration_seconds Time spent in one stage of a request.',
+                '# TYPE analyzer_stage_duration_seconds histogram',
+            ]
+            for (view, stage), histogram in sorted(self.stages.items()):
+                lines += histogram.lines(
+                    'analyzer_stage_duration_seconds', [('view', view), ('stage', stage)]
+                )
+
+            lines += [
+                '# HELP analyzer_rows_processed_total CSV rows analyzed.',
+                '# TYPE analyzer_rows_processed_total counter',
+            ]
+            for view, rows in sorted(self.rows.items()):
+                lines.append(f'analyzer_rows_processed_total{_labels([("view", view)])} {rows}')
+
+            lines += [
+                '# HELP analyzer_bytes_processed_total Upload bytes analyzed.',
+                '# TYPE analyzer_bytes_processed_total counter',
+            ]
+            for view, count in sorted(self.bytes.items()):
+                lines.append(f'analyzer_bytes_processed_total{_labels([("view", view)])} {count}')
+
+            lines += [
+                '# HELP analyzer_throughput_rows_per_second Rows per second of each request.',
+                '# TYPE analyzer_throughput_rows_per_second histogram',
+            ]
+            for view, histogram in sorted(self.throughput.items()):
+                lines += histogram.lines('analyzer_throughput_rows_per_second', [('view', view)])
+
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry()
+
+
+class StageTimingMiddleware:
+    """
+    Times analyzer requests; see the module docstring.
+
+    Works in both sync (WSGI) and async (ASGI) mode, so it does not force
+    async views onto a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = self._start(request)
+        return self._finish(request, start, self.get_response(request))
+
+    async def __acall__(self, request):
+        start = self._start(request)
+        return self._finish(request, start, await self.get_response(request))
+
+    def _start(self, request):
+        request.analyzer_timer = StageTimer()
+        return time.perf_counter()
+
+    def _finish(self, request, start, response):
+        match = request.resolver_match
+        if match is None or not match.func.__module__.startswith('analyzer.'):
+            return response
+
+        total = time.perf_counter() - start
+        response['Server-Timing'] = request.analyzer_timer.server_timing(total)
+        METRICS.record(match.url_name, response.status_code, total, request.analyzer_timer)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that too
+        timer = getattr(request, 'analyzer_timer', None)
+        if timer is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timer.add('serialize', time.perf_counter() - start)
+            )
+        return response
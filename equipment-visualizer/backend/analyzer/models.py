@@ -1,3 +1,94 @@
+import uuid
+from pathlib import Path
+
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+from .storage import ColumnarDataset
+
+
+class Dataset(models.Model):
+    """
+    An uploaded equipment CSV, parsed once and stored in columnar form.
+
+    Only metadata lives in the database. The parsed columns are stored
+    as NumPy arrays under ANALYZER_DATASET_ROOT (see analyzer/storage.py).
+    
+    Datasets can grow: rows appended to the source CSV are sent to
+    PATCH /api/datasets/<id>/append/. size_bytes is the byte offset in the
+    source file up to which rows have been ingested (rows posted to
+    /api/datasets/<id>/rows/ are not in that file and do not move it),
+    header is the CSV header (appended tails have none), and summary
+    holds the running partial aggregate (SummaryAggregator.to_partial()),
+    so an append only has to parse the new rows.
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=255)
+    row_count = models.PositiveBigIntegerField(default=0)
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    header = models.JSONField(default=list, blank=True)
+    summary = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f'{self.name} ({self.row_count} rows)'
+    
+    @property
+    def storage_dir(self):
+        """
+        Directory holding this dataset's column files.
+        """
+        return Path(settings.ANALYZER_DATASET_ROOT) / str(self.id)
+    
+    def open_store(self):
+        """
+        Open the stored columns for querying.
+        """
+        return ColumnarDataset(self.storage_dir)
+
+
+class AnalysisJob(models.Model):
+    """
+    A background analysis started with POST /api/analyze/?async=1.
+
+    The upload is spooled to ANALYZER_JOB_ROOT and analyzed by the local
+    worker pool (analyzer/jobs.py). Clients poll GET /api/jobs/<id>/ for
+    progress and the final result. owner identifies the server process
+    whose pool runs the job.
+    """
+    
+    class Status(models.TextChoices):
+        QUEUED = 'queued'
+        RUNNING = 'running'
+        DONE = 'done'
+        FAILED = 'failed'
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    file_name = models.CharField(max_length=255)
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    rows_processed = models.PositiveBigIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    owner = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f'{self.file_name} ({self.status})'
+    
+    @property
+    def upload_path(self):
+        """
+        Where the upload is spooled until the worker has analyzed it.
+        """
+        return Path(settings.ANALYZER_JOB_ROOT) / f'{self.id}.csv'
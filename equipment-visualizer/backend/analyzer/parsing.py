@@ -0,0 +1,453 @@
+"""
+Typed CSV Parsing
+
+Fast parsing layer for the known equipment CSV schema.
+
+- The header line is read and validated on its own, before any bulk
+  parsing, so files with the wrong columns are rejected immediately.
+- Only the columns a caller needs are parsed (usecols / include_columns).
+- dtypes are pinned instead of inferred: equipment_type becomes a
+  category, the numeric columns become float64 (or float32 if the
+  ANALYZER_FLOAT_DTYPE setting asks for it).
+- Raw bytes are parsed directly; there is no decode to a Python str.
+- When pyarrow is installed, its multithreaded streaming CSV reader is
+  used. Otherwise the Pandas C engine parses the file in chunks. Both
+  give chunks of chunk_rows rows, so the chunk-wise quantile sketches
+  give the same estimates either way.
+- Memory-mapped files (engine.map_file()) are handed to pyarrow as one
+  zero-copy buffer over the mapping, so the file is parsed straight from
+  the page cache without being copied into Python bytes objects.
+- An optional row limit stops parsing as soon as a file turns out to
+  be too long.
+
+Parquet and Arrow IPC (file or stream) uploads are accepted as well,
+when pyarrow is installed. The format is detected from the first bytes
+of the upload. These files are already typed and columnar, so there is
+no text parsing at all: only the requested columns are read (Parquet
+column projection), record batches from memory-mapped uploads are
+zero-copy views of the mapping, and the columns are cast to the same
+pinned types the CSV path produces. Every format therefore gives the
+same chunks, and the same statistics, as the equivalent CSV.
+
+This module does not import Django.
+"""
+
+import csv
+import mmap
+
+import pandas as pd
+from pandas._libs.parsers import STR_NA_VALUES
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+try:
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa_parquet = None
+
+
+# Columns every equipment CSV must contain
+REQUIRED_COLUMNS = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+
+# Columns we compute averages for
+NUMERIC_COLUMNS = ['flowrate', 'pressure', 'temperature']
+
+# Columns needed for the summary statistics (equipment_name is not)
+SUMMARY_COLUMNS = ['equipment_type'] + NUMERIC_COLUMNS
+
+# Number of CSV rows parsed per DataFrame chunk
+DEFAULT_CHUNK_ROWS = 100000
+
+# Bytes per block for the pyarrow streaming reader
+PYARROW_BLOCK_SIZE = 16 * 1024 * 1024
+
+# A header line longer than this is not an equipment CSV
+MAX_HEADER_BYTES = 64 * 1024
+
+FLOAT_DTYPES = ('float64', 'float32')
+
+CSV_ENGINES = ('auto', 'pyarrow', 'c')
+
+# Cells the Pandas C engine reads as missing; pyarrow is given the same
+# list so both engines drop the same rows
+CSV_NULL_VALUES = sorted(STR_NA_VALUES)
+
+PARQUET_MAGIC = b'PAR1'
+ARROW_FILE_MAGIC = b'ARROW1'
+# Arrow IPC streams start with the 0xFFFFFFFF continuation marker
+ARROW_STREAM_MAGIC = b'\xff\xff\xff\xff'
+
+FORMAT_NAMES = {
+    'csv': 'CSV',
+    'parquet': 'Parquet',
+    'arrow': 'Arrow IPC file',
+    'arrow_stream': 'Arrow IPC stream',
+}
+
+
+class UploadFormatError(ValueError):
+    """
+    Raised when an upload is not in a format that can be read.
+    """
+
+
+class MissingColumnsError(ValueError):
+    """
+    Raised when the CSV header does not contain all required columns.
+    """
+
+    def __init__(self, missing_columns):
+        self.missing_columns = missing_columns
+        super().__init__(f'Missing columns: {", ".join(missing_columns)}')
+
+    def __reduce__(self):
+        # Keep the column list intact when sent back from a worker process
+        return (type(self), (self.missing_columns,))
+
+
+class RowLimitError(ValueError):
+    """
+    Raised when a CSV has more data rows than allowed.
+    """
+
+    def __init__(self, max_rows):
+        self.max_rows = max_rows
+        super().__init__(f'File has more than {max_rows} rows')
+
+    def __reduce__(self):
+        return (type(self), (self.max_rows,))
+
+
+def pyarrow_available():
+    """
+    Return True if the pyarrow CSV reader can be used.
+    """
+    return pa_csv is not None
+
+
+def peek(stream, size):
+    """
+    Return the next `size` bytes of a stream without consuming them.
+    """
+    if isinstance(stream, mmap.mmap):
+        position = stream.tell()
+        return stream[position:position + size]
+    if hasattr(stream, 'peek'):
+        return stream.peek(size)[:size]
+    position = stream.tell()
+    head = stream.read(size)
+    stream.seek(position)
+    return head
+
+
+def detect_format(stream):
+    """
+    Return 'parquet', 'arrow', 'arrow_stream' or 'csv' for a binary stream.
+    """
+    head = peek(stream, len(ARROW_FILE_MAGIC))
+    if head.startswith(PARQUET_MAGIC):
+        return 'parquet'
+    if head.startswith(ARROW_FILE_MAGIC):
+        return 'arrow'
+    if head.startswith(ARROW_STREAM_MAGIC):
+        return 'arrow_stream'
+    return 'csv'
+
+
+def _readline(stream, limit):
+    if isinstance(stream, mmap.mmap):
+        # mmap.readline() has no size limit
+        start = stream.tell()
+        end = stream.find(b'\n', start, start + limit)
+        return stream.read(end + 1 - start if end >= 0 else limit)
+    return stream.readline(limit)
+
+
+def read_header(stream):
+    """
+    Read and validate the header line of a CSV stream.
+
+    Only the first line is consumed; the stream is left positioned at
+    the first data row.
+
+    Args:
+        stream: Binary file-like object positioned at the start of the CSV
+
+    Returns:
+        list: Column names in file order
+
+    Raises:
+        EmptyDataError: If the stream is empty
+        MissingColumnsError: If a required column is not in the header
+        UploadFormatError: If the stream is Parquet or Arrow, not CSV
+    """
+    file_format = detect_format(stream)
+    if file_format != 'csv':
+        raise UploadFormatError(f'Expected a CSV file, got {FORMAT_NAMES[file_format]}')
+
+    line = _readline(stream, MAX_HEADER_BYTES)
+    if not line.strip():
+        # Same message Pandas gives for an empty file
+        raise pd.errors.EmptyDataError('No columns to parse from file')
+
+    # utf-8-sig drops the byte order mark Excel puts in front of CSV exports
+    header = next(csv.reader([line.decode('utf-8-sig')]))
+    validate_header(header)
+    return header
+
+
+def validate_header(header):
+    """
+    Check that a header contains all required columns.
+
+    Raises:
+        MissingColumnsError: If a required column is missing
+    """
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing_columns:
+        raise MissingColumnsError(missing_columns)
+
+
+def column_dtypes(columns, float_dtype='float64'):
+    """
+    Return the pinned Pandas dtype of each requested column.
+    """
+    dtypes = {
+        'equipment_name': object,
+        'equipment_type': 'category'
+    }
+    for column in NUMERIC_COLUMNS:
+        dtypes[column] = float_dtype
+    return {column: dtypes[column] for column in columns}
+
+
+def _pyarrow_types(columns, float_dtype):
+    float_type = pa.float32() if float_dtype == 'float32' else pa.float64()
+    types = {
+        'equipment_name': pa.string(),
+        'equipment_type': pa.dictionary(pa.int32(), pa.string())
+    }
+    for column in NUMERIC_COLUMNS:
+        types[column] = float_type
+    return {column: types[column] for column in columns}
+
+
+def _iter_pyarrow_chunks(stream, header, columns, chunk_rows, float_dtype):
+    if isinstance(stream, mmap.mmap):
+        # Wrap the rest of the mapping without copying it
+        stream = pa.BufferReader(pa.py_buffer(stream)[stream.tell():])
+
+    try:
+        reader = pa_csv.open_csv(
+            stream,
+            read_options=pa_csv.ReadOptions(
+                column_names=header,
+                block_size=PYARROW_BLOCK_SIZE,
+                use_threads=True
+            ),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types=_pyarrow_types(columns, float_dtype),
+                null_values=CSV_NULL_VALUES,
+                strings_can_be_null=True
+            )
+        )
+    except pa.ArrowInvalid as e:
+        # Nothing after the header line: no chunks
+        if 'Empty CSV file' in str(e):
+            return
+        raise
+
+    # The reader yields one batch per byte block; regroup them into the
+    # same chunks as the C engine (the quantile sketches see chunks)
+    for table in _rechunk(reader, chunk_rows):
+        yield table.to_pandas(split_blocks=True)
+
+
+def _arrow_source(stream):
+    """
+    Return a random-access pyarrow file over a binary stream.
+
+    Memory maps are wrapped without copying; other streams are read
+    into memory (in-memory uploads are small, larger ones are mapped).
+    """
+    if isinstance(stream, mmap.mmap):
+        return pa.BufferReader(pa.py_buffer(stream)[stream.tell():])
+    return pa.BufferReader(pa.py_buffer(stream.read()))
+
+
+def _table_to_frame(table, columns, float_dtype):
+    """
+    Cast the requested columns of a table to the pinned types.
+    """
+    types = _pyarrow_types(columns, float_dtype)
+    arrays = []
+    for column in columns:
+        array = table.column(column)
+        target = types[column]
+        if pa.types.is_dictionary(target) and not pa.types.is_dictionary(array.type):
+            array = array.cast(pa.string()).dictionary_encode()
+        arrays.append(array.cast(target))
+    # split_blocks lets columns without nulls stay zero-copy views
+    return pa.Table.from_arrays(arrays, names=columns).to_pandas(split_blocks=True)
+
+
+def _rechunk(batches, chunk_rows):
+    """
+    Regroup record batches into tables of exactly chunk_rows rows.
+
+    Chunks then have the same boundaries as with the C engine, which
+    keeps the approximate quantiles identical to a CSV upload. Slicing
+    and regrouping batches does not copy any data.
+    """
+    pending = []
+    pending_rows = 0
+    for batch in batches:
+        start = 0
+        while start < batch.num_rows:
+            piece = batch.slice(start, chunk_rows - pending_rows)
+            pending.append(piece)
+            pending_rows += piece.num_rows
+            start += piece.num_rows
+            if pending_rows == chunk_rows:
+                yield pa.Table.from_batches(pending)
+                pending = []
+                pending_rows = 0
+    if pending:
+        yield pa.Table.from_batches(pending)
+
+
+def _iter_parquet_chunks(stream, columns, chunk_rows, float_dtype):
+    if pa_parquet is None:
+        raise UploadFormatError('Parquet uploads need pyarrow with Parquet support on the server')
+    parquet_file = pa_parquet.ParquetFile(_arrow_source(stream))
+    validate_header(parquet_file.schema_arrow.names)
+
+    # Only the requested columns are read and decompressed
+    batches = parquet_file.iter_batches(batch_size=chunk_rows, columns=columns)
+    for table in _rechunk(batches, chunk_rows):
+        yield _table_to_frame(table, columns, float_dtype)
+
+
+def _iter_arrow_chunks(stream, file_format, columns, chunk_rows, float_dtype):
+    if file_format == 'arrow':
+        reader = pa.ipc.open_file(_arrow_source(stream))
+        batches = (reader.get_batch(index) for index in range(reader.num_record_batches))
+    else:
+        # The stream format is read sequentially, batch by batch
+        source = _arrow_source(stream) if isinstance(stream, mmap.mmap) else pa.PythonFile(stream, mode='r')
+        reader = pa.ipc.open_stream(source)
+        batches = reader
+    validate_header(reader.schema.names)
+
+    for table in _rechunk(batches, chunk_rows):
+        yield _table_to_frame(table, columns, float_dtype)
+
+
+def _iter_binary_chunks(stream, file_format, columns, chunk_rows, float_dtype):
+    if pa is None:
+        raise UploadFormatError(f'{FORMAT_NAMES[file_format]} uploads need pyarrow on the server')
+    try:
+        if file_format == 'parquet':
+            yield from _iter_parquet_chunks(stream, columns, chunk_rows, float_dtype)
+        else:
+            yield from _iter_arrow_chunks(stream, file_format, columns, chunk_rows, float_dtype)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise UploadFormatError(f'Invalid {FORMAT_NAMES[file_format]} file: {e}')
+
+
+def _iter_pandas_chunks(stream, header, columns, chunk_rows, float_dtype):
+    reader = pd.read_csv(
+        stream,
+        header=None,
+        names=header,
+        usecols=columns,
+        dtype=column_dtypes(columns, float_dtype),
+        chunksize=chunk_rows,
+        encoding='utf-8'
+    )
+    with reader:
+        yield from reader
+
+
+def _empty_frame(columns, float_dtype):
+    return pd.DataFrame({
+        column: pd.Series(dtype=dtype)
+        for column, dtype in column_dtypes(columns, float_dtype).items()
+    })
+
+
+def iter_csv_chunks(stream, chunk_rows=DEFAULT_CHUNK_ROWS, columns=None,
+                    engine='auto', float_dtype='float64', header=None, max_rows=None):
+    """
+    Parse a binary CSV stream into typed DataFrame chunks.
+
+    The header is validated first; the bulk of the file is only parsed
+    when all required columns are present.
+
+    Parquet and Arrow IPC streams are detected and read instead (see the
+    module docstring); `engine` only applies to CSV.
+
+    Args:
+        stream: Binary file-like object positioned at the start of the CSV
+        chunk_rows (int): Rows per chunk (every engine and format)
+        columns (list): Columns to parse (default: all required columns)
+        engine (str): 'auto' or 'pyarrow' (pyarrow if installed, otherwise
+            the Pandas C engine) or 'c' (always the Pandas C engine)
+        float_dtype (str): 'float64' or 'float32' for the numeric columns
+        header (list): Column names, if the stream has no header line of its
+            own (e.g. rows appended to a file whose header was read earlier)
+        max_rows (int): Maximum number of data rows, or None for no limit
+
+    Yields:
+        DataFrame: Chunks containing the requested columns, in that order.
+        At least one (possibly empty) chunk is always yielded.
+
+    Raises:
+        MissingColumnsError: If a required column is not in the header
+        RowLimitError: If the stream has more than max_rows rows (raised
+            before the chunk that crosses the limit is yielded)
+        UploadFormatError: If a Parquet or Arrow file cannot be read
+    """
+    if columns is None:
+        columns = REQUIRED_COLUMNS
+    if float_dtype not in FLOAT_DTYPES:
+        raise ValueError(f'Unsupported float dtype: {float_dtype}')
+    if engine not in CSV_ENGINES:
+        raise ValueError(f'Unsupported CSV engine: {engine}')
+
+    # A stream with a known header is the tail of a CSV
+    file_format = detect_format(stream) if header is None else 'csv'
+
+    if file_format != 'csv':
+        chunks = _iter_binary_chunks(stream, file_format, columns, chunk_rows, float_dtype)
+    else:
+        if header is None:
+            header = read_header(stream)
+        else:
+            validate_header(header)
+
+        use_pyarrow = engine != 'c' and pyarrow_available()
+        if use_pyarrow:
+            chunks = _iter_pyarrow_chunks(stream, header, columns, chunk_rows, float_dtype)
+        else:
+            chunks = _iter_pandas_chunks(stream, header, columns, chunk_rows, float_dtype)
+
+    produced = False
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+        if max_rows is not None and rows > max_rows:
+            raise RowLimitError(max_rows)
+        produced = True
+        yield chunk[columns]
+
+    if not produced:
+        # Header-only file (or a table without rows)
+        yield _empty_frame(columns, float_dtype)
+
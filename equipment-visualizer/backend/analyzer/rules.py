@@ -0,0 +1,325 @@
+"""
+Anomaly and Out-of-Range Rules
+
+Finds the individual equipment rows that are out of spec. Rules are
+configured as dictionaries (ANALYZER_RULES setting, or per request):
+
+    {'name': 'pressure_limit', 'type': 'range', 'column': 'pressure', 'max': 10.0}
+    {'name': 'temperature_spike', 'type': 'zscore', 'column': 'temperature',
+     'window': 100, 'threshold': 3.0}
+
+Rule types:
+    range   Flags values below 'min' or above 'max' (either may be omitted).
+    zscore  Rolling z-score per equipment_type: a value is compared with
+            the mean and standard deviation of the previous 'window'
+            readings of the same type (in file order), and flagged if it
+            is more than 'threshold' standard deviations away.
+
+Every rule is evaluated as one NumPy boolean mask over the whole column;
+there is no per-row Python code except for building the reason text of
+the (limited number of) flagged rows returned. Both rules are O(rows).
+The z-score rule groups rows by type with a counting sort: bincount()
+gives the group sizes, their cumulative sums the group starts, and a
+stable radix sort of the (8- or 16-bit) type codes scatters the rows
+into their groups. All window sums then come from cumulative sums,
+independent of the window size. Only above 65536 types does grouping
+fall back to a comparison sort (O(rows log rows)).
+
+Equipment names are only needed for the flagged rows that are returned,
+so they are not kept in memory: evaluate_rules() asks for them by row
+index once it knows which rows to return.
+
+This module does not import Django.
+"""
+
+import numpy as np
+
+from .engine import TypeEncoder
+from .parsing import NUMERIC_COLUMNS, SUMMARY_COLUMNS, iter_csv_chunks
+
+
+# Flagged rows returned by default (the total count is always reported)
+DEFAULT_FLAGGED_LIMIT = 1000
+
+# Readings of the same type needed before the z-score rule can fire
+DEFAULT_MIN_PERIODS = 10
+
+
+class RangeRule:
+    """
+    Flags values outside [min, max].
+    """
+
+    def __init__(self, name, column, min=None, max=None):
+        if min is None and max is None:
+            raise ValueError(f'Rule {name}: give "min", "max" or both')
+        self.name = name
+        self.column = column
+        self.min = None if min is None else float(min)
+        self.max = None if max is None else float(max)
+
+    def describe(self):
+        return {'name': self.name, 'type': 'range', 'column': self.column,
+                'min': self.min, 'max': self.max}
+
+    def evaluate(self, values, codes):
+        """
+        Return (mask of flagged rows, value to report per row).
+        """
+        # NaN compares False, so missing values are never flagged
+        mask = np.zeros(values.shape, dtype=bool)
+        if self.min is not None:
+            mask |= values < self.min
+        if self.max is not None:
+            mask |= values > self.max
+        return mask, values
+
+    def reason(self, value):
+        if self.max is not None and value > self.max:
+            return f'{self.column} {value:g} above max {self.max:g}'
+        return f'{self.column} {value:g} below min {self.min:g}'
+
+
+def _group_by_type(codes):
+    """
+    Counting sort of the rows by type code (rows with a missing type are left out).
+
+    Returns:
+        tuple: (row index per position, type code per position, position
+        where the group of each position starts)
+    """
+    present = np.flatnonzero(codes >= 0)
+    present_codes = codes[present]
+    type_count = int(present_codes.max()) + 1 if present.size else 0
+
+    # Group sizes and starts come straight from the counts
+    group_sizes = np.bincount(present_codes, minlength=type_count)
+    type_starts = np.cumsum(group_sizes) - group_sizes
+
+    # NumPy's stable sort is a radix sort (linear) for 8- and 16-bit keys
+    if type_count <= 1 << 8:
+        present_codes = present_codes.astype(np.uint8)
+    elif type_count <= 1 << 16:
+        present_codes = present_codes.astype(np.uint16)
+    order = present[np.argsort(present_codes, kind='stable')]
+    group = codes[order]
+    return order, group, type_starts[group]
+
+
+class ZScoreRule:
+    """
+    Flags values far from the rolling mean of their equipment type.
+    """
+
+    def __init__(self, name, column, threshold=3.0, window=100, min_periods=DEFAULT_MIN_PERIODS):
+        self.name = name
+        self.column = column
+        self.threshold = float(threshold)
+        self.window = int(window)
+        self.min_periods = max(int(min_periods), 2)
+        if self.window < self.min_periods:
+            raise ValueError(f'Rule {name}: window must be at least {self.min_periods}')
+        if self.threshold <= 0:
+            raise ValueError(f'Rule {name}: threshold must be positive')
+
+    def describe(self):
+        return {'name': self.name, 'type': 'zscore', 'column': self.column,
+                'threshold': self.threshold, 'window': self.window,
+                'min_periods': self.min_periods}
+
+    def evaluate(self, values, codes):
+        """
+        Return (mask of flagged rows, z-score per row).
+        """
+        row_count = values.size
+        scores = np.full(row_count, np.nan)
+
+        # Group rows by type, keeping file order inside each group
+        order, group, group_starts = _group_by_type(codes)
+        x = np.asarray(values[order], dtype=np.float64)
+        valid = ~np.isnan(x)
+
+        # Centre every type on its own mean so the cumulative sums below
+        # do not lose precision to large absolute values
+        type_count = int(group.max()) + 1 if group.size else 0
+        counts = np.bincount(group[valid], minlength=type_count)
+        sums = np.bincount(group[valid], weights=x[valid], minlength=type_count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            type_means = np.where(counts > 0, sums / counts, 0.0)
+        centred = np.where(valid, x - type_means[group], 0.0)
+
+        # Window of row i = previous `window` rows of the same type
+        positions = np.arange(group.size)
+        window_starts = np.maximum(positions - self.window, group_starts)
+
+        cum_values = np.r_[0.0, np.cumsum(centred)]
+        cum_squares = np.r_[0.0, np.cumsum(centred * centred)]
+        cum_counts = np.r_[0, np.cumsum(valid)]
+
+        n = cum_counts[positions] - cum_counts[window_starts]
+        s1 = cum_values[positions] - cum_values[window_starts]
+        s2 = cum_squares[positions] - cum_squares[window_starts]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = s1 / n
+            variance = (s2 - n * mean * mean) / (n - 1)
+            z = (centred - mean) / np.sqrt(np.maximum(variance, 0.0))
+        usable = valid & (n >= self.min_periods) & (variance > 0)
+        scores[order[usable]] = z[usable]
+
+        with np.errstate(invalid='ignore'):
+            mask = np.abs(scores) > self.threshold
+        return mask, scores
+
+    def reason(self, score):
+        return (f'{self.column} z-score {score:.2f} beyond ±{self.threshold:g} '
+                f'(last {self.window} readings of the same type)')
+
+
+RULE_TYPES = {
+    'range': RangeRule,
+    'zscore': ZScoreRule,
+}
+
+
+def parse_rules(config):
+    """
+    Build rule objects from a list of rule dictionaries.
+
+    Raises:
+        ValueError: If a rule is not valid
+    """
+    if not isinstance(config, list):
+        raise ValueError('Rules must be a list')
+
+    rules = []
+    for index, item in enumerate(config):
+        if not isinstance(item, dict):
+            raise ValueError(f'Rule {index} must be an object')
+        options = dict(item)
+        rule_type = options.pop('type', None)
+        if rule_type not in RULE_TYPES:
+            raise ValueError(f'Rule {index}: unknown type {rule_type!r}')
+        if options.get('column') not in NUMERIC_COLUMNS:
+            raise ValueError(f'Rule {index}: column must be one of {", ".join(NUMERIC_COLUMNS)}')
+        options.setdefault('name', f'{options["column"]}_{rule_type}')
+        try:
+            rules.append(RULE_TYPES[rule_type](**options))
+        except TypeError as e:
+            raise ValueError(f'Rule {index}: {e}')
+    return rules
+
+
+def evaluate_rules(rules, codes, columns, type_names, lookup_names, limit=DEFAULT_FLAGGED_LIMIT):
+    """
+    Evaluate rules over whole columns and list the flagged rows.
+
+    Args:
+        rules (list): Rule objects from parse_rules()
+        codes (ndarray): int32 type code per row (-1 = missing type)
+        columns (dict): Column name -> float array with one value per row
+        type_names (list): Type name per code
+        lookup_names (callable): Takes a sorted array of row indices and
+            returns their equipment_name values (called once, only if
+            rows are flagged)
+        limit (int): Maximum number of flagged rows to return
+
+    Returns:
+        dict: {'rules': [...with 'flagged' counts], 'total_rows',
+        'flagged_count', 'flagged': [{'row', 'equipment_name',
+        'equipment_type', 'reasons'}], 'truncated'}
+    """
+    row_count = codes.size
+    any_flagged = np.zeros(row_count, dtype=bool)
+    results = []
+
+    for rule in rules:
+        mask, details = rule.evaluate(columns[rule.column], codes)
+        any_flagged |= mask
+        results.append((rule, mask, details))
+
+    flagged_rows = np.flatnonzero(any_flagged)
+    shown_rows = flagged_rows[:limit]
+
+    # Reason text is only built for the rows that are returned
+    reasons = {int(row): [] for row in shown_rows}
+    for rule, mask, details in results:
+        for row in shown_rows[mask[shown_rows]]:
+            reasons[int(row)].append(rule.reason(float(details[row])))
+
+    names = lookup_names(shown_rows) if shown_rows.size else []
+    flagged = []
+    for row, name in zip(shown_rows, names):
+        code = codes[row]
+        flagged.append({
+            'row': int(row),
+            'equipment_name': str(name),
+            'equipment_type': type_names[code] if code >= 0 else None,
+            'reasons': reasons[int(row)]
+        })
+
+    return {
+        'rules': [
+            {**rule.describe(), 'flagged': int(np.count_nonzero(mask))}
+            for rule, mask, _ in results
+        ],
+        'total_rows': int(row_count),
+        'flagged_count': int(flagged_rows.size),
+        'flagged': flagged,
+        'truncated': bool(flagged_rows.size > limit)
+    }
+
+
+def collect_rule_columns(stream, **parse_options):
+    """
+    Parse a CSV stream into the arrays used by evaluate_rules().
+
+    Args:
+        stream: Binary file-like object
+        **parse_options: chunk_rows, engine, float_dtype and max_rows for
+            parsing.iter_csv_chunks()
+
+    Returns:
+        tuple: (codes, columns, type_names)
+    """
+    encoder = TypeEncoder()
+    code_parts = []
+    column_parts = {column: [] for column in NUMERIC_COLUMNS}
+
+    for chunk in iter_csv_chunks(stream, columns=SUMMARY_COLUMNS, **parse_options):
+        code_parts.append(encoder.encode(chunk['equipment_type']))
+        for column in NUMERIC_COLUMNS:
+            column_parts[column].append(chunk[column].to_numpy())
+
+    codes = np.concatenate(code_parts) if code_parts else np.empty(0, dtype=np.int32)
+    columns = {
+        column: np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+        for column, parts in column_parts.items()
+    }
+    return codes, columns, encoder.names
+
+
+def read_names(stream, rows, **parse_options):
+    """
+    Read the equipment_name of some rows of a CSV stream.
+
+    Parsing stops after the last requested row.
+
+    Args:
+        stream: Binary file-like object
+        rows (ndarray): Sorted row indices
+        **parse_options: Same options as for collect_rule_columns()
+
+    Returns:
+        list: One name per requested row
+    """
+    names = []
+    offset = 0
+    for chunk in iter_csv_chunks(stream, columns=['equipment_name'], **parse_options):
+        end = offset + len(chunk)
+        selected = rows[(rows >= offset) & (rows < end)]
+        names.extend(chunk['equipment_name'].to_numpy()[selected - offset])
+        offset = end
+        if len(names) == len(rows):
+            break
+    return names
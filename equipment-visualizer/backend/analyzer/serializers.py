@@ -0,0 +1,20 @@
+from rest_framework import serializers
+
+from .models import AnalysisJob, Dataset
+
+
+class DatasetSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Dataset
+        fields = ['id', 'name', 'row_count', 'size_bytes', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class AnalysisJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AnalysisJob
+        fields = [
+            'id', 'file_name', 'size_bytes', 'status', 'rows_processed',
+            'result', 'error', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,216 @@
+"""
+Columnar Dataset Storage
+
+Uploaded datasets are parsed once and written to disk as typed NumPy
+arrays, so follow-up queries never have to read the CSV again.
+
+Layout of one dataset directory:
+
+    <dataset_root>/<dataset_id>/
+        meta.json                  # type names, number of parts and rows
+        part-00000/
+            equipment_name.npy     # fixed-width unicode strings
+            equipment_type.npy     # int32 codes into meta.json "types" (-1 = missing)
+            flowrate.npy           # float64 (float32 if ANALYZER_FLOAT_DTYPE says so)
+            pressure.npy
+            temperature.npy
+        part-00001/
+            ...
+
+Each parsed CSV chunk becomes one part, so writing a dataset uses the
+same flat amount of memory as the streaming aggregation engine.
+Arrays are loaded with mmap_mode='r', so reading only pages in the
+columns a query actually touches.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from .engine import SummaryAggregator, TypeEncoder
+from .parsing import NUMERIC_COLUMNS
+
+
+STORAGE_FORMAT_VERSION = 1
+
+META_FILE = 'meta.json'
+
+
+def _part_name(index):
+    return f'part-{index:05d}'
+
+
+class ColumnarWriter:
+    """
+    Writes DataFrame chunks into a new dataset directory.
+
+    With append=True, new parts are added to an existing dataset instead;
+    type codes already stored keep their meaning.
+    """
+
+    def __init__(self, directory, append=False):
+        self.directory = Path(directory)
+        if append:
+            with open(self.directory / META_FILE) as meta_file:
+                meta = json.load(meta_file)
+            self.type_encoder = TypeEncoder(meta['types'])
+            self.part_count = meta['parts']
+            self.row_count = meta['rows']
+        else:
+            self.directory.mkdir(parents=True, exist_ok=False)
+            # Equipment type codes are shared by all parts of the dataset
+            self.type_encoder = TypeEncoder()
+            self.part_count = 0
+            self.row_count = 0
+        self.append = append
+        self.first_new_part = self.part_count
+
+    def write_chunk(self, chunk):
+        """
+        Write one DataFrame chunk as a new part.
+
+        Args:
+            chunk (DataFrame): Rows containing the required columns
+        """
+        part_dir = self.directory / _part_name(self.part_count)
+        part_dir.mkdir()
+
+        for column in NUMERIC_COLUMNS:
+            np.save(part_dir / f'{column}.npy', chunk[column].to_numpy())
+
+        np.save(part_dir / 'equipment_type.npy', self.type_encoder.encode(chunk['equipment_type']))
+        np.save(
+            part_dir / 'equipment_name.npy',
+            chunk['equipment_name'].astype(str).to_numpy(dtype=str)
+        )
+
+        self.part_count += 1
+        self.row_count += len(chunk)
+
+    def close(self):
+        """
+        Write meta.json. The dataset is readable after this call.
+        """
+        meta = {
+            'format_version': STORAGE_FORMAT_VERSION,
+            'types': self.type_encoder.names,
+            'parts': self.part_count,
+            'rows': self.row_count
+        }
+        # Replace meta.json atomically: readers see the old or the new
+        # part count, never a half-written file
+        temp_path = self.directory / f'{META_FILE}.tmp'
+        with open(temp_path, 'w') as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(temp_path, self.directory / META_FILE)
+
+    def abort(self):
+        """
+        Remove everything written so far (used when parsing fails).
+
+        In append mode only the new parts are removed.
+        """
+        if not self.append:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            return
+        for index in range(self.first_new_part, self.part_count):
+            shutil.rmtree(self.directory / _part_name(index), ignore_errors=True)
+
+
+class ColumnarDataset:
+    """
+    Read access to a dataset directory written by ColumnarWriter.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        with open(self.directory / META_FILE) as meta_file:
+            self.meta = json.load(meta_file)
+
+    @property
+    def types(self):
+        """
+        List of equipment type names; index = code stored in the arrays.
+        """
+        return self.meta['types']
+
+    @property
+    def row_count(self):
+        return self.meta['rows']
+
+    def column(self, name):
+        """
+        Load one column across all parts.
+
+        Args:
+            name (str): Column name (one of the required CSV columns)
+
+        Returns:
+            ndarray: Memory-mapped array if the dataset has a single part,
+            otherwise a concatenated copy
+        """
+        arrays = [
+            np.load(self.directory / _part_name(index) / f'{name}.npy', mmap_mode='r')
+            for index in range(self.meta['parts'])
+        ]
+        if not arrays:
+            dtype = np.int32 if name == 'equipment_type' else np.float64
+            return np.empty(0, dtype=dtype)
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.concatenate(arrays)
+
+    def take(self, name, rows):
+        """
+        Load the values of one column at some rows.
+
+        Only the pages holding those rows are read.
+
+        Args:
+            name (str): Column name (one of the required CSV columns)
+            rows (ndarray): Sorted row indices
+
+        Returns:
+            list: One value per requested row
+        """
+        values = []
+        offset = 0
+        for index in range(self.meta['parts']):
+            array = np.load(self.directory / _part_name(index) / f'{name}.npy', mmap_mode='r')
+            end = offset + len(array)
+            selected = rows[(rows >= offset) & (rows < end)]
+            values.extend(array[selected - offset].tolist())
+            offset = end
+            if len(values) == len(rows):
+                break
+        return values
+
+    def summary(self):
+        """
+        Compute the /api/analyze/ statistics from the stored columns.
+
+        Returns:
+            SummaryAggregator: Same statistics as a full CSV analysis
+        """
+        aggregator = SummaryAggregator()
+        aggregator.total_rows = self.row_count
+
+        for column in NUMERIC_COLUMNS:
+            aggregator.add_values(column, self.column(column))
+
+        # Codes are assigned in order of first appearance, so bincount
+        # keeps the same tie order as value_counts()
+        codes = self.column('equipment_type')
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.types))
+        aggregator.add_type_counts(self.types, counts)
+        return aggregator
+
+
+def delete_dataset_files(directory):
+    """
+    Remove a dataset directory from disk.
+    """
+    shutil.rmtree(directory, ignore_errors=True)
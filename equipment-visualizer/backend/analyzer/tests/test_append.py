@@ -0,0 +1,51 @@
+from django.test import TestCase, override_settings
+
+from .utils import (
+    multipart_patch, reference_summary, sample_bytes, sample_upload, split_rows, summary_fields,
+    use_temp_directory
+)
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class AppendTests(TestCase):
+    """
+    Appending to a stored dataset with the byte offset protocol.
+    """
+
+    def setUp(self):
+        use_temp_directory(self, 'ANALYZER_DATASET_ROOT')
+        self.head, self.tail = split_rows(sample_bytes(), 10)
+        response = self.client.post('/api/datasets/', {'file': sample_upload(self.head)})
+        self.assertEqual(response.status_code, 201)
+        self.dataset = response.json()
+
+    def append(self, data, offset):
+        return multipart_patch(
+            self.client, f'/api/datasets/{self.dataset["id"]}/append/',
+            {'file': sample_upload(data, 'new.csv'), 'offset': offset}
+        )
+
+    def test_append_matches_a_full_upload(self):
+        self.assertEqual(self.dataset['size_bytes'], len(self.head))
+
+        response = self.append(self.tail, len(self.head))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['size_bytes'], len(sample_bytes()))
+        self.assertEqual(summary_fields(response.json()['summary']), reference_summary(sample_bytes()))
+
+    def test_wrong_offset_returns_409(self):
+        response = self.append(self.tail, len(self.head) + 1)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['expected_offset'], len(self.head))
+        summary = self.client.get(f'/api/datasets/{self.dataset["id"]}/summary/').json()
+        self.assertEqual(summary['total_equipment'], 10)
+
+    def test_repeated_append_is_rejected(self):
+        self.assertEqual(self.append(self.tail, len(self.head)).status_code, 200)
+
+        response = self.append(self.tail, len(self.head))
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['expected_offset'], len(sample_bytes()))
@@ -0,0 +1,73 @@
+import io
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from .. import batch
+from .utils import HEADER, reference_summary, sample_bytes, sample_upload, split_rows, summary_fields
+
+
+def zip_upload(members, name='logs.zip'):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for member_name, data in members.items():
+            archive.writestr(member_name, data)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@override_settings(ANALYZER_BATCH_WORKERS=1)
+class BatchUploadTests(TestCase):
+    """
+    /api/analyze/batch/ merges many files and rejects broken or oversized archives.
+    """
+
+    def test_combined_summary_matches_the_whole_file(self):
+        head, tail = split_rows(sample_bytes(), 7)
+        upload = zip_upload({'a.csv': head, 'b.csv': HEADER + tail, 'notes.txt': b'skipped'})
+
+        response = self.client.post('/api/analyze/batch/', {'files': [upload]})
+
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual([entry['file_name'] for entry in result['files']], ['a.csv', 'b.csv'])
+        self.assertEqual(summary_fields(result['combined']), reference_summary(sample_bytes()))
+
+    def test_invalid_zip_returns_400(self):
+        upload = SimpleUploadedFile('logs.zip', b'PK\x03\x04 this is not really a zip')
+
+        response = self.client.post('/api/analyze/batch/', {'files': [upload]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Invalid zip file logs.zip', response.json()['error'])
+
+    def test_zip_larger_than_the_upload_limit_returns_413(self):
+        upload = zip_upload({'big.csv': sample_bytes() * 20})
+
+        with override_settings(ANALYZER_MAX_UPLOAD_SIZE=len(sample_bytes()) * 10):
+            response = self.client.post('/api/analyze/batch/', {'files': [upload]})
+
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('extracts to', response.json()['error'])
+
+    def test_zip_with_too_many_members_returns_413(self):
+        upload = zip_upload({f'{index}.csv': sample_bytes() for index in range(3)})
+
+        with override_settings(ANALYZER_MAX_ZIP_MEMBERS=2):
+            response = self.client.post('/api/analyze/batch/', {'files': [upload]})
+
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('3 entries', response.json()['error'])
+
+    def test_broken_pool_is_replaced(self):
+        broken = mock.Mock()
+        broken.submit.side_effect = BrokenProcessPool('worker died')
+        batch._executor = broken
+
+        response = self.client.post('/api/analyze/batch/', {'files': [sample_upload()]})
+
+        self.assertEqual(response.status_code, 200)
+        broken.shutdown.assert_called_once()
+        self.assertIsNot(batch.get_executor(), broken)
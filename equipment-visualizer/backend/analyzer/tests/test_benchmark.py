@@ -0,0 +1,81 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from ..benchmark import compare_results, generate_csv
+
+
+class GenerateCsvTests(SimpleTestCase):
+    """
+    The synthetic data generator is deterministic and schema-correct.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_same_seed_gives_identical_files(self):
+        first = self.directory / 'a.csv'
+        second = self.directory / 'b.csv'
+        generate_csv(first, 500, types=7, dirty=0.1, seed=3)
+        generate_csv(second, 500, types=7, dirty=0.1, seed=3)
+
+        self.assertEqual(first.read_bytes(), second.read_bytes())
+
+    def test_rows_and_types(self):
+        path = self.directory / 'a.csv'
+        generate_csv(path, 1000, types=4)
+
+        df = pd.read_csv(path)
+        self.assertEqual(len(df), 1000)
+        self.assertLessEqual(df['equipment_type'].nunique(), 4)
+        self.assertFalse(df[['flowrate', 'pressure', 'temperature']].isna().any().any())
+
+
+class CompareResultsTests(SimpleTestCase):
+    """
+    Regressions are stages whose median time grew past the threshold.
+    """
+
+    def results(self, seconds):
+        return {'cases': [{
+            'rows': 1000, 'types': 5, 'dirty': 0.0,
+            'stages': {stage: {'median_seconds': value} for stage, value in seconds.items()}
+        }]}
+
+    def test_slower_stage_is_reported(self):
+        previous = self.results({'parse': 1.0, 'aggregate': 1.0})
+        current = self.results({'parse': 1.5, 'aggregate': 1.1})
+
+        regressions = compare_results(previous, current, threshold=1.2)
+
+        self.assertEqual([(stage, ratio) for _, stage, _, _, ratio in regressions], [('parse', 1.5)])
+
+    def test_tiny_stages_are_ignored(self):
+        previous = self.results({'parse': 0.0001})
+        current = self.results({'parse': 0.0005})
+        self.assertEqual(compare_results(previous, current), [])
+
+
+class BenchmarkCommandTests(SimpleTestCase):
+    """
+    python manage.py benchmark writes its results file.
+    """
+
+    @override_settings(ANALYZER_MAX_UPLOAD_ROWS=100)
+    def test_row_limit_does_not_apply(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'results.json'
+            call_command('benchmark', rows='300', repeat=1, no_end_to_end=True,
+                         data_dir=directory, output=str(output), stdout=io.StringIO())
+
+            results = json.loads(output.read_text())
+
+        self.assertIsNone(results['parse_options']['max_rows'])
+        self.assertEqual(results['cases'][0]['rows'], 300)
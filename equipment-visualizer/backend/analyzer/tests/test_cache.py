@@ -0,0 +1,100 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..cache import LocMemResultCache, SQLiteResultCache, make_cache_key
+from .utils import sample_upload
+
+
+class ResultCacheBackendTests(SimpleTestCase):
+    """
+    Every backend counts hits and misses and evicts the least recently used entry.
+    """
+
+    def backends(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return [
+            LocMemResultCache(max_entries=2),
+            SQLiteResultCache(max_entries=2, path=Path(directory.name) / 'cache.sqlite3'),
+        ]
+
+    def test_hit_and_miss_counters(self):
+        for cache in self.backends():
+            with self.subTest(backend=type(cache).__name__):
+                cache.set('a', {'total_equipment': 1})
+                self.assertEqual(cache.get('a'), {'total_equipment': 1})
+                self.assertIsNone(cache.get('b'))
+
+                stats = cache.stats()
+                self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (1, 1, 0.5))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        for cache in self.backends():
+            with self.subTest(backend=type(cache).__name__):
+                cache.set('a', {'value': 1})
+                cache.set('b', {'value': 2})
+                # Reading "a" makes "b" the least recently used entry
+                with mock.patch('analyzer.cache.time.time', return_value=2e9):
+                    cache.get('a')
+                with mock.patch('analyzer.cache.time.time', return_value=3e9):
+                    cache.set('c', {'value': 3})
+
+                self.assertEqual(cache.entry_count(), 2)
+                self.assertIsNone(cache.get('b'))
+                self.assertEqual(cache.get('a'), {'value': 1})
+
+    def test_sqlite_connections_are_closed(self):
+        cache = self.backends()[1]
+        connections = []
+        real_connect = sqlite3.connect
+
+        def connect(*args, **kwargs):
+            connections.append(real_connect(*args, **kwargs))
+            return connections[-1]
+
+        with mock.patch('analyzer.cache.sqlite3.connect', side_effect=connect):
+            cache.set('a', {'value': 1})
+            cache.get('a')
+
+        for connection in connections:
+            with self.assertRaises(sqlite3.ProgrammingError):
+                connection.execute('SELECT 1')
+
+    def test_options_change_the_key(self):
+        self.assertNotEqual(
+            make_cache_key('abc', {'engine': 'c'}), make_cache_key('abc', {'engine': 'pyarrow'})
+        )
+
+
+@override_settings(ANALYZER_RESULT_CACHE={
+    'BACKEND': 'analyzer.cache.LocMemResultCache', 'OPTIONS': {'max_entries': 8}
+})
+class ResultCacheViewTests(TestCase):
+    """
+    /api/analyze/ answers repeat uploads from the cache.
+    """
+
+    def test_repeat_upload_is_a_hit(self):
+        before = self.client.get('/api/cache/stats/').json()
+        first = self.client.post('/api/analyze/', {'file': sample_upload()})
+        second = self.client.post('/api/analyze/', {'file': sample_upload()})
+
+        self.assertEqual(first['X-Analyzer-Cache'], 'MISS')
+        self.assertEqual(second['X-Analyzer-Cache'], 'HIT')
+        self.assertEqual(first.json(), second.json())
+        after = self.client.get('/api/cache/stats/').json()
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+
+    def test_wrong_columns_are_rejected_before_hashing(self):
+        data = b'equipment_name,flowrate\n' + b'P-1,10\n' * 1000
+
+        with mock.patch('analyzer.views.hash_upload') as hash_upload:
+            response = self.client.post('/api/analyze/', {'file': sample_upload(data)})
+
+        self.assertEqual(response.status_code, 400)
+        hash_upload.assert_not_called()
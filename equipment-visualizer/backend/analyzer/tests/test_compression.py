@@ -0,0 +1,56 @@
+import gzip
+import io
+import unittest
+import zipfile
+
+from django.test import TestCase, override_settings
+
+from ..compression import zstandard
+from .utils import reference_summary, sample_bytes, sample_upload, summary_fields
+
+
+def zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class CompressedUploadTests(TestCase):
+    """
+    Compressed uploads give the same statistics as the plain CSV.
+    """
+
+    def analyze(self, data, name):
+        return self.client.post('/api/analyze/', {'file': sample_upload(data, name)})
+
+    def assert_matches_the_csv(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(summary_fields(response.json()), reference_summary(sample_bytes()))
+
+    def test_gzip(self):
+        self.assert_matches_the_csv(self.analyze(gzip.compress(sample_bytes()), 'sample.csv.gz'))
+
+    @unittest.skipIf(zstandard is None, 'zstandard is not installed')
+    def test_zstd(self):
+        data = zstandard.ZstdCompressor().compress(sample_bytes())
+        self.assert_matches_the_csv(self.analyze(data, 'sample.csv.zst'))
+
+    def test_zip(self):
+        data = zip_bytes({'sample.csv': sample_bytes()})
+        self.assert_matches_the_csv(self.analyze(data, 'sample.zip'))
+
+    def test_format_is_detected_from_content(self):
+        self.assert_matches_the_csv(self.analyze(gzip.compress(sample_bytes()), 'sample.csv'))
+
+    def test_zip_with_several_csv_files_returns_400(self):
+        data = zip_bytes({'a.csv': sample_bytes(), 'b.csv': sample_bytes()})
+        response = self.analyze(data, 'logs.zip')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('exactly one CSV file', response.json()['error'])
+
+    def test_truncated_gzip_returns_400(self):
+        data = gzip.compress(sample_bytes())[:-20]
+        self.assertEqual(self.analyze(data, 'sample.csv.gz').status_code, 400)
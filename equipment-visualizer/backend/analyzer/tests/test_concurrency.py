@@ -0,0 +1,48 @@
+import asyncio
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+
+from ..concurrency import AnalysisPool, PoolSaturatedError
+from .utils import reference_summary, sample_bytes, sample_upload, summary_fields
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class AnalysisPoolTests(TestCase):
+    """
+    /api/analyze/ runs in a bounded pool and answers 503 when it is full.
+    """
+
+    async def test_upload_is_analyzed_in_the_pool(self):
+        response = await self.async_client.post('/api/analyze/', {'file': sample_upload()})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(summary_fields(response.json()), reference_summary(sample_bytes()))
+
+    def test_full_pool_returns_503(self):
+        pool = AnalysisPool(workers=1, queue_size=0)
+        pool.in_flight = pool.capacity
+
+        with mock.patch('analyzer.views.get_analysis_pool', return_value=pool):
+            response = self.client.post('/api/analyze/', {'file': sample_upload()})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+
+    def test_slots_are_freed_when_calls_finish(self):
+        pool = AnalysisPool(workers=1, queue_size=1)
+        release = threading.Event()
+
+        async def run_three():
+            first = asyncio.ensure_future(pool.run(release.wait))
+            second = asyncio.ensure_future(pool.run(release.wait))
+            await asyncio.sleep(0)
+            with self.assertRaises(PoolSaturatedError):
+                await pool.run(release.wait)
+            release.set()
+            return await asyncio.gather(first, second)
+
+        self.assertEqual(async_to_sync(run_three)(), [True, True])
+        self.assertEqual(pool.in_flight, 0)
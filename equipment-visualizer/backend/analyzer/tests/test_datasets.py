@@ -0,0 +1,62 @@
+import shutil
+
+from django.test import TestCase, override_settings
+
+from .utils import reference_summary, sample_bytes, sample_upload, summary_fields, use_temp_directory
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class DatasetTests(TestCase):
+    """
+    Upload once, then query the stored columns.
+    """
+
+    def setUp(self):
+        self.dataset_root = use_temp_directory(self, 'ANALYZER_DATASET_ROOT')
+        response = self.client.post('/api/datasets/', {'file': sample_upload()})
+        self.assertEqual(response.status_code, 201)
+        self.dataset = response.json()
+        self.url = f'/api/datasets/{self.dataset["id"]}/'
+
+    def test_summary_matches_the_upload(self):
+        expected = reference_summary(sample_bytes())
+        self.assertEqual(summary_fields(self.dataset['summary']), expected)
+
+        response = self.client.get(f'{self.url}summary/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(summary_fields(response.json()), expected)
+
+    def test_queries_match_the_upload_endpoints(self):
+        for view in ('by-type', 'anomalies'):
+            with self.subTest(view=view):
+                stored = self.client.get(f'{self.url}{view}/')
+                uploaded = self.client.post(f'/api/analyze/{view}/', {'file': sample_upload()})
+
+                self.assertEqual(stored.status_code, 200)
+                self.assertEqual(stored.json(), uploaded.json())
+
+    def test_list_and_delete(self):
+        listed = self.client.get('/api/datasets/').json()
+        self.assertEqual([dataset['id'] for dataset in listed], [self.dataset['id']])
+
+        self.assertEqual(self.client.delete(self.url).status_code, 204)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertFalse((self.dataset_root / self.dataset['id']).exists())
+
+    def test_missing_files_return_410(self):
+        shutil.rmtree(self.dataset_root / self.dataset['id'])
+
+        for view in ('by-type', 'anomalies'):
+            with self.subTest(view=view):
+                response = self.client.get(f'{self.url}{view}/')
+                self.assertEqual(response.status_code, 410)
+                self.assertIn('upload the file again', response.json()['error'])
+
+    def test_damaged_files_return_410(self):
+        meta_path = self.dataset_root / self.dataset['id'] / 'meta.json'
+        meta_path.write_text('{not json')
+
+        response = self.client.get(f'{self.url}by-type/')
+
+        self.assertEqual(response.status_code, 410)
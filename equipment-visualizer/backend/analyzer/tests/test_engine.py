@@ -0,0 +1,44 @@
+from django.test import TestCase, override_settings
+
+from ..engine import analyze_path
+from ..parsing import pyarrow_available
+from .utils import HEADER, SAMPLE_PATH, reference_summary, sample_bytes, sample_upload, summary_fields
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class SampleParityTests(TestCase):
+    """
+    The streaming engine gives the original statistics for sample_data.csv.
+    """
+
+    def setUp(self):
+        self.expected = reference_summary(sample_bytes())
+
+    def test_engines_and_chunk_sizes(self):
+        engines = ['c', 'pyarrow'] if pyarrow_available() else ['c']
+        for engine in engines:
+            for chunk_rows in (1, 7, 100000):
+                with self.subTest(engine=engine, chunk_rows=chunk_rows):
+                    summary = analyze_path(SAMPLE_PATH, engine=engine, chunk_rows=chunk_rows)
+                    self.assertEqual(summary_fields(summary.to_response()), self.expected)
+
+    def test_analyze_endpoint(self):
+        response = self.client.post('/api/analyze/', {'file': sample_upload()})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(summary_fields(response.json()), self.expected)
+
+    def test_missing_columns_return_400(self):
+        data = b'equipment_name,flowrate\nP-1,10\n'
+
+        response = self.client.post('/api/analyze/', {'file': sample_upload(data)})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('equipment_type', response.json()['error'])
+
+    def test_header_only_file(self):
+        response = self.client.post('/api/analyze/', {'file': sample_upload(HEADER)})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_equipment'], 0)
+        self.assertIsNone(response.json()['average_flowrate'])
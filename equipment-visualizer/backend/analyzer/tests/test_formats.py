@@ -0,0 +1,96 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..benchmark import generate_csv
+from ..engine import analyze_stream
+from ..parsing import iter_csv_chunks, pyarrow_available
+from .utils import sample_bytes, sample_upload
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa = None
+
+
+def convert(data, file_format):
+    """
+    Convert CSV bytes to Parquet, Arrow IPC file or Arrow IPC stream bytes.
+    """
+    # Empty cells become nulls, as in the historian's exports
+    table = pa_csv.read_csv(
+        io.BytesIO(data), convert_options=pa_csv.ConvertOptions(strings_can_be_null=True)
+    )
+    sink = io.BytesIO()
+    if file_format == 'parquet':
+        # Small row groups, so chunks span several of them
+        pa_parquet.write_table(table, sink, row_group_size=700)
+    else:
+        new_writer = pa.ipc.new_file if file_format == 'arrow' else pa.ipc.new_stream
+        with new_writer(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=700)
+    return sink.getvalue()
+
+
+@unittest.skipUnless(pyarrow_available(), 'pyarrow is not installed')
+class FormatParityTests(SimpleTestCase):
+    """
+    Parquet, Arrow and both CSV engines give identical chunks and statistics.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        path = Path(directory.name) / 'generated.csv'
+        generate_csv(path, 5000, types=7, dirty=0.05, seed=4)
+        cls.csv = path.read_bytes()
+
+    def analyze(self, data, **options):
+        return analyze_stream(io.BytesIO(data), chunk_rows=1000, **options).to_response()
+
+    def test_chunks_have_chunk_rows_rows(self):
+        for engine in ('c', 'pyarrow'):
+            with self.subTest(engine=engine):
+                chunks = iter_csv_chunks(io.BytesIO(self.csv), chunk_rows=1000, engine=engine)
+                self.assertEqual([len(chunk) for chunk in chunks], [1000] * 5)
+
+    def test_csv_engines_match_across_chunks(self):
+        # Distributions come from per-chunk sketches, so they only match
+        # when both engines cut the file at the same rows
+        self.assertEqual(self.analyze(self.csv, engine='pyarrow'), self.analyze(self.csv, engine='c'))
+
+    def test_binary_formats_match_csv(self):
+        expected = self.analyze(self.csv, engine='c')
+        for file_format in ('parquet', 'arrow', 'arrow_stream'):
+            with self.subTest(format=file_format):
+                self.assertEqual(self.analyze(convert(self.csv, file_format)), expected)
+
+
+@unittest.skipUnless(pyarrow_available(), 'pyarrow is not installed')
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class FormatUploadTests(TestCase):
+    """
+    /api/analyze/ accepts Parquet and Arrow uploads.
+    """
+
+    def test_parquet_upload_matches_csv(self):
+        expected = self.client.post('/api/analyze/', {'file': sample_upload()}).json()
+
+        response = self.client.post(
+            '/api/analyze/', {'file': sample_upload(convert(sample_bytes(), 'parquet'), 'sample.parquet')}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected)
+
+    def test_damaged_parquet_returns_400(self):
+        data = convert(sample_bytes(), 'parquet')[:-100] + b'PAR1'
+        response = self.client.post('/api/analyze/', {'file': sample_upload(data, 'sample.parquet')})
+        self.assertEqual(response.status_code, 400)
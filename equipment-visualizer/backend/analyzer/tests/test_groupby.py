@@ -0,0 +1,48 @@
+import pandas as pd
+from django.test import TestCase, override_settings
+
+from .utils import SAMPLE_PATH, sample_upload
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class StatisticsPerTypeTests(TestCase):
+    """
+    /api/analyze/by-type/ matches a Pandas groupby.
+    """
+
+    def setUp(self):
+        self.grouped = pd.read_csv(SAMPLE_PATH).groupby('equipment_type')
+
+    def test_statistics_match_pandas(self):
+        response = self.client.post('/api/analyze/by-type/', {'file': sample_upload()})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        for column in ('flowrate', 'pressure', 'temperature'):
+            expected = self.grouped[column]
+            statistics = data['columns'][column]
+            for index, equipment_type in enumerate(data['types']):
+                with self.subTest(column=column, equipment_type=equipment_type):
+                    self.assertEqual(statistics['count'][index], expected.count()[equipment_type])
+                    self.assertEqual(statistics['mean'][index], round(expected.mean()[equipment_type], 2))
+                    self.assertEqual(statistics['std'][index], round(expected.std()[equipment_type], 2))
+                    self.assertEqual(statistics['min'][index], expected.min()[equipment_type])
+                    self.assertEqual(statistics['max'][index], expected.max()[equipment_type])
+
+    def test_requested_percentiles(self):
+        response = self.client.post('/api/analyze/by-type/?percentiles=10,90', {'file': sample_upload()})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['percentiles'], [10, 90])
+        pump = data['types'].index('Pump')
+        expected = self.grouped['flowrate'].quantile(0.9)['Pump']
+        self.assertEqual(data['columns']['flowrate']['p90'][pump], round(expected, 2))
+
+    def test_invalid_percentiles_return_400(self):
+        for value in ('abc', '101'):
+            with self.subTest(value=value):
+                response = self.client.post(
+                    f'/api/analyze/by-type/?percentiles={value}', {'file': sample_upload()}
+                )
+                self.assertEqual(response.status_code, 400)
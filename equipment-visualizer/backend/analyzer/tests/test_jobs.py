@@ -0,0 +1,80 @@
+import time
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from .. import jobs
+from ..models import AnalysisJob
+from .utils import reference_summary, sample_bytes, sample_upload, summary_fields, use_temp_directory
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class BackgroundJobTests(TransactionTestCase):
+    """
+    POST /api/analyze/?async=1 returns a job that finishes in the worker pool.
+    """
+
+    def setUp(self):
+        self.job_root = use_temp_directory(self, 'ANALYZER_JOB_ROOT')
+
+    def test_submit_poll_done(self):
+        response = self.client.post('/api/analyze/?async=1', {'file': sample_upload()})
+        self.assertEqual(response.status_code, 202)
+        url = f'/api/jobs/{response.json()["id"]}/'
+
+        deadline = time.monotonic() + 30
+        while True:
+            job = self.client.get(url).json()
+            if job['status'] in ('done', 'failed') or time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+
+        self.assertEqual(job['status'], 'done', job['error'])
+        self.assertEqual(summary_fields(job['result']), reference_summary(sample_bytes()))
+        self.assertEqual(job['rows_processed'], job['result']['total_equipment'])
+        self.assertEqual(list(self.job_root.iterdir()), [])
+
+
+class InterruptedJobTests(TestCase):
+    """
+    Jobs whose owner process stopped are reported as failed; jobs of
+    live processes are left alone.
+    """
+
+    def create(self, owner, status=AnalysisJob.Status.RUNNING):
+        return AnalysisJob.objects.create(file_name='a.csv', status=status, owner=owner)
+
+    def test_status_request_fails_jobs_of_stopped_processes(self):
+        orphan = self.create(f'{jobs.socket.gethostname()}:12345:earlier')
+        done = self.create('', status=AnalysisJob.Status.DONE)
+
+        with mock.patch('analyzer.jobs._pid_alive', return_value=False):
+            response = self.client.get(f'/api/jobs/{orphan.id}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'failed')
+        self.assertEqual(response.json()['error'], jobs.INTERRUPTED_ERROR)
+        done.refresh_from_db()
+        self.assertEqual(done.status, AnalysisJob.Status.DONE)
+
+    def test_jobs_of_live_processes_are_kept(self):
+        own = self.create(jobs.PROCESS_OWNER)
+        other_worker = self.create(f'{jobs.socket.gethostname()}:12345:token')
+        other_host = self.create('elsewhere:1:token', status=AnalysisJob.Status.QUEUED)
+
+        with mock.patch('analyzer.jobs._pid_alive', return_value=True):
+            self.assertEqual(jobs.recover_interrupted_jobs(), 0)
+
+        for job in (own, other_worker, other_host):
+            job.refresh_from_db()
+            self.assertNotEqual(job.status, AnalysisJob.Status.FAILED)
+
+    def test_earlier_process_with_the_same_pid_is_dead(self):
+        restarted = self.create(f'{jobs.socket.gethostname()}:{jobs.os.getpid()}:earlier')
+        legacy = self.create('', status=AnalysisJob.Status.QUEUED)
+
+        self.assertEqual(jobs.recover_interrupted_jobs(), 2)
+
+        for job in (restarted, legacy):
+            job.refresh_from_db()
+            self.assertEqual(job.status, AnalysisJob.Status.FAILED)
@@ -0,0 +1,129 @@
+import json
+import uuid
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..live import KEEPALIVE, DatasetStream, summary_delta
+from .utils import multipart_patch, sample_bytes, sample_upload, split_rows, use_temp_directory
+
+
+def parse_event(data):
+    """
+    (event, payload) of one encoded Server-Sent Event.
+    """
+    lines = dict(line.split(': ', 1) for line in data.decode().strip().splitlines())
+    return lines['event'], json.loads(lines['data'])
+
+
+class SummaryDeltaTests(SimpleTestCase):
+    """
+    Deltas hold the changed keys, and the changed entries of dictionaries.
+    """
+
+    def test_unchanged_summary(self):
+        summary = {'total_equipment': 25, 'equipment_by_type': {'Pump': 10}}
+
+        self.assertEqual(summary_delta(summary, dict(summary)), {})
+
+    def test_nested_entries(self):
+        previous = {
+            'total_equipment': 25,
+            'average_pressure': 6.1,
+            'equipment_by_type': {'Pump': 10, 'Reactor': 9, 'Heater': 6},
+            'equipment_by_type_other': {'types': 0, 'count': 0},
+        }
+        current = {
+            'total_equipment': 27,
+            'average_pressure': 6.1,
+            'equipment_by_type': {'Pump': 12, 'Reactor': 9, 'Valve': 7},
+            'equipment_by_type_other': {'types': 1, 'count': 0},
+        }
+
+        self.assertEqual(summary_delta(previous, current), {
+            'total_equipment': 27,
+            'equipment_by_type': {'Pump': 12, 'Valve': 7, 'Heater': None},
+            'equipment_by_type_other': {'types': 1},
+        })
+
+    def test_dictionary_replaces_other_value(self):
+        delta = summary_delta({'distributions': None}, {'distributions': {'flowrate': {'p50': 1.0}}})
+
+        self.assertEqual(delta, {'distributions': {'flowrate': {'p50': 1.0}}})
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None, ANALYZER_STREAM_INTERVAL=0.01)
+class DatasetStreamTests(TestCase):
+    """
+    The events of /api/datasets/<id>/stream/ while rows are added.
+    """
+
+    def setUp(self):
+        use_temp_directory(self, 'ANALYZER_DATASET_ROOT')
+        self.head, self.tail = split_rows(sample_bytes(), 10)
+        response = self.client.post('/api/datasets/', {'file': sample_upload(self.head)})
+        self.assertEqual(response.status_code, 201)
+        self.dataset = response.json()
+        self.url = f'/api/datasets/{self.dataset["id"]}/'
+
+    def append(self, data, offset):
+        return multipart_patch(
+            self.client, f'{self.url}append/', {'file': sample_upload(data, 'new.csv'), 'offset': offset}
+        )
+
+    def test_stream_events(self):
+        stream = DatasetStream(self.dataset['id'])
+
+        event, summary = parse_event(stream.poll())
+        self.assertEqual(event, 'summary')
+        self.assertEqual(summary['total_equipment'], 10)
+        self.assertEqual(stream.poll(), KEEPALIVE)
+
+        self.assertEqual(self.append(self.tail, len(self.head)).status_code, 200)
+        event, delta = parse_event(stream.poll())
+        self.assertEqual(event, 'delta')
+        self.assertEqual(delta['total_equipment'], 25)
+        self.assertEqual(delta['equipment_by_type'], {'Pump': 10, 'Reactor': 9, 'Heater': 6})
+
+        self.client.delete(self.url)
+        event, _ = parse_event(stream.poll())
+        self.assertEqual(event, 'deleted')
+        self.assertTrue(stream.finished)
+
+    def test_nested_delta(self):
+        # The first 10 rows have 4 pumps, 3 heaters and 3 reactors
+        stream = DatasetStream(self.dataset['id'], top_n=1)
+        _, summary = parse_event(stream.poll())
+        self.assertEqual(summary['equipment_by_type'], {'Pump': 4})
+
+        rows = b'x,Heater,1,2,3\ny,Heater,1,2,3\n'
+        response = self.client.post(f'{self.url}rows/', rows, content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        _, delta = parse_event(stream.poll())
+
+        self.assertEqual(delta['total_equipment'], 12)
+        self.assertEqual(delta['equipment_by_type'], {'Heater': 5, 'Pump': None})
+        self.assertEqual(delta['equipment_by_type_other'], {'count': 7})
+        self.assertEqual(set(delta['distributions']), {'flowrate', 'pressure', 'temperature'})
+
+    def test_posted_rows_keep_the_source_offset(self):
+        response = self.client.post(f'{self.url}rows/', b'x,Pump,1,2,3\n', content_type='text/csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['row_count'], 11)
+        self.assertEqual(response.json()['size_bytes'], len(self.head))
+
+        response = self.append(self.tail, len(self.head))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['row_count'], 26)
+
+    def test_invalid_interval_returns_400(self):
+        for interval in ('abc', 'nan', 'inf', '-inf'):
+            with self.subTest(interval=interval):
+                response = self.client.get(f'{self.url}stream/?interval={interval}')
+
+                self.assertEqual(response.status_code, 400)
+
+    def test_unknown_dataset_returns_404(self):
+        response = self.client.get(f'/api/datasets/{uuid.uuid4()}/stream/')
+
+        self.assertEqual(response.status_code, 404)
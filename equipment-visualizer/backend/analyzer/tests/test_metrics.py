@@ -0,0 +1,43 @@
+from django.test import TestCase, override_settings
+
+from ..metrics import METRICS
+from .utils import sample_bytes, sample_upload
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class MetricsTests(TestCase):
+    """
+    Stage timings reach the Server-Timing header and /api/metrics/.
+    """
+
+    def setUp(self):
+        METRICS.reset()
+        self.addCleanup(METRICS.reset)
+
+    def test_server_timing_header(self):
+        response = self.client.post('/api/analyze/', {'file': sample_upload()})
+
+        self.assertEqual(response.status_code, 200)
+        stages = [entry.split(';')[0].strip() for entry in response['Server-Timing'].split(',')]
+        for stage in ('validate', 'total'):
+            self.assertIn(stage, stages)
+
+    def test_metrics_output(self):
+        self.client.post('/api/analyze/', {'file': sample_upload()})
+
+        response = self.client.get('/api/metrics/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        text = response.content.decode()
+        self.assertIn('analyzer_requests_total{view="analyze_csv",status="200"} 1', text)
+        self.assertIn('analyzer_request_duration_seconds_count{view="analyze_csv"} 1', text)
+        rows = sample_bytes().count(b'\n') - 1
+        self.assertIn(f'analyzer_rows_processed_total{{view="analyze_csv"}} {rows}', text)
+
+    def test_metrics_only_answer_get(self):
+        self.assertEqual(self.client.post('/api/metrics/').status_code, 405)
+
+    def test_disabled_metrics_return_404(self):
+        with override_settings(ANALYZER_METRICS_ENABLED=False):
+            self.assertEqual(self.client.get('/api/metrics/').status_code, 404)
@@ -0,0 +1,69 @@
+import io
+import unittest
+
+from django.test import SimpleTestCase
+
+from ..engine import analyze_stream
+from ..parsing import MissingColumnsError, RowLimitError, iter_csv_chunks, pyarrow_available, read_header
+from .utils import HEADER
+
+
+class HeaderTests(SimpleTestCase):
+    """
+    The header line is read and checked before any rows are parsed.
+    """
+
+    def test_byte_order_mark_is_dropped(self):
+        stream = io.BytesIO(b'\xef\xbb\xbf' + HEADER + b'a,X,1,2,3\n')
+        self.assertEqual(read_header(stream)[0], 'equipment_name')
+        self.assertEqual(stream.read(), b'a,X,1,2,3\n')
+
+    def test_missing_column(self):
+        with self.assertRaises(MissingColumnsError):
+            read_header(io.BytesIO(b'equipment_name,equipment_type,flowrate\n'))
+
+
+class ChunkTests(SimpleTestCase):
+    """
+    Chunks have pinned dtypes and respect the row limit.
+    """
+
+    def test_pinned_dtypes(self):
+        stream = io.BytesIO(HEADER + b'a,X,1,2,3\n')
+        chunk = next(iter_csv_chunks(stream, engine='c', float_dtype='float32'))
+        self.assertEqual(str(chunk['equipment_type'].dtype), 'category')
+        self.assertEqual(str(chunk['flowrate'].dtype), 'float32')
+
+    def test_row_limit(self):
+        stream = io.BytesIO(HEADER + b'a,X,1,2,3\n' * 5)
+        with self.assertRaises(RowLimitError):
+            list(iter_csv_chunks(stream, engine='c', chunk_rows=2, max_rows=4))
+
+
+@unittest.skipUnless(pyarrow_available(), 'pyarrow is not installed')
+class CsvEngineParityTests(SimpleTestCase):
+    """
+    The pyarrow and C engines must give the same statistics.
+    """
+
+    def analyze(self, data, engine):
+        return analyze_stream(io.BytesIO(data), engine=engine).to_response()
+
+    def test_missing_types_are_dropped_by_both_engines(self):
+        data = HEADER + (
+            b'a,,1,2,3\n'
+            b'b,X,4,5,6\n'
+            b'c,NA,7,8,9\n'
+            b'd,"  ",1,1,1\n'
+        )
+        c_result = self.analyze(data, 'c')
+        self.assertEqual(c_result['equipment_by_type'], {'X': 1, '  ': 1})
+        self.assertEqual(self.analyze(data, 'pyarrow'), c_result)
+
+    def test_missing_numbers_are_skipped_by_both_engines(self):
+        data = HEADER + (
+            b'a,X,1,,3\n'
+            b'b,X,NA,5,null\n'
+            b'c,Y,7,8,9\n'
+        )
+        self.assertEqual(self.analyze(data, 'pyarrow'), self.analyze(data, 'c'))
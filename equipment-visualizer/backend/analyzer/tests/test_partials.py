@@ -0,0 +1,43 @@
+import json
+
+from django.test import TestCase, override_settings
+
+from ..engine import SummaryAggregator, analyze_path
+from .utils import HEADER, SAMPLE_PATH, reference_summary, sample_bytes, sample_upload, split_rows, summary_fields
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class PartialMergeTests(TestCase):
+    """
+    Partials of the shards of a file merge into the summary of the whole file.
+    """
+
+    def test_merged_partials_match_the_whole_file(self):
+        head, tail = split_rows(sample_bytes(), 10)
+        partials = []
+        for index, data in enumerate([head, HEADER + tail]):
+            response = self.client.post(
+                '/api/analyze/?partial=1', {'file': sample_upload(data, f'part{index}.csv')}
+            )
+            self.assertEqual(response.status_code, 200)
+            partials.append(response.json())
+
+        response = self.client.post(
+            '/api/partials/merge/', {'partials': partials}, content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(summary_fields(response.json()['summary']), reference_summary(sample_bytes()))
+
+    def test_partial_round_trip(self):
+        summary = analyze_path(SAMPLE_PATH)
+        restored = SummaryAggregator.from_partial(json.loads(json.dumps(summary.to_partial())))
+        self.assertEqual(restored.to_response(), summary.to_response())
+
+    def test_invalid_partials_return_400(self):
+        for body in ({}, {'partials': []}, {'partials': [{'version': -1}]}):
+            with self.subTest(body=body):
+                response = self.client.post(
+                    '/api/partials/merge/', body, content_type='application/json'
+                )
+                self.assertEqual(response.status_code, 400)
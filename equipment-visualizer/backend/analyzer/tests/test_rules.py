@@ -0,0 +1,104 @@
+import json
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..rules import ZScoreRule, _group_by_type
+from .utils import HEADER, SAMPLE_PATH, sample_upload, use_temp_directory
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class AnomalyRuleTests(TestCase):
+    """
+    /api/analyze/anomalies/ flags the rows that break a rule.
+    """
+
+    def analyze(self, data, rules):
+        return self.client.post(
+            '/api/analyze/anomalies/', {'file': sample_upload(data), 'rules': json.dumps(rules)}
+        )
+
+    def test_range_rule(self):
+        df = pd.read_csv(SAMPLE_PATH)
+        rules = [{'name': 'pressure_limit', 'type': 'range', 'column': 'pressure', 'max': 6}]
+
+        response = self.analyze(None, rules)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['total_rows'], len(df))
+        flagged = df.index[df['pressure'] > 6]
+        self.assertEqual([row['row'] for row in data['flagged']], flagged.tolist())
+        self.assertEqual(
+            [row['equipment_name'] for row in data['flagged']],
+            df.loc[flagged, 'equipment_name'].tolist()
+        )
+
+    def test_zscore_rule_flags_a_spike(self):
+        rows = [f'p{index},Pump,100,5,{300 + index % 3}\n'.encode() for index in range(30)]
+        rows.append(b'spike,Pump,100,5,400\n')
+        rules = [{'name': 'spike', 'type': 'zscore', 'column': 'temperature',
+                  'window': 10, 'threshold': 3}]
+
+        response = self.analyze(HEADER + b''.join(rows), rules)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['equipment_name'] for row in response.json()['flagged']], ['spike'])
+
+    def test_names_of_flagged_rows_in_later_chunks(self):
+        rows = [f'eq{index},Pump,100,{index},300\n'.encode() for index in range(50)]
+        rules = [{'type': 'range', 'column': 'pressure', 'max': 45}]
+
+        with override_settings(ANALYZER_CHUNK_ROWS=7):
+            response = self.analyze(HEADER + b''.join(rows), rules)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row['equipment_name'] for row in response.json()['flagged']],
+            [f'eq{index}' for index in range(46, 50)]
+        )
+
+    def test_dataset_anomalies_match_the_upload(self):
+        use_temp_directory(self, 'ANALYZER_DATASET_ROOT')
+        dataset = self.client.post('/api/datasets/', {'file': sample_upload()}).json()
+        rules = [{'type': 'range', 'column': 'temperature', 'max': 350}]
+
+        stored = self.client.get(f'/api/datasets/{dataset["id"]}/anomalies/', {'rules': json.dumps(rules)})
+
+        self.assertEqual(stored.status_code, 200)
+        self.assertEqual(stored.json(), self.analyze(None, rules).json())
+
+    def test_invalid_rules_return_400(self):
+        response = self.analyze(None, [{'type': 'nope'}])
+        self.assertEqual(response.status_code, 400)
+
+
+class ZScoreRuleTests(SimpleTestCase):
+    """
+    The vectorized z-score matches a per-type rolling window.
+    """
+
+    def test_grouping_keeps_file_order(self):
+        codes = np.array([2, 0, -1, 2, 1, 0, 2, -1, 1], dtype=np.int32)
+        order, group, starts = _group_by_type(codes)
+        self.assertEqual(order.tolist(), [1, 5, 4, 8, 0, 3, 6])
+        self.assertEqual(group.tolist(), [0, 0, 1, 1, 2, 2, 2])
+        self.assertEqual(starts.tolist(), [0, 0, 2, 2, 4, 4, 4])
+
+    def test_matches_rolling_reference(self):
+        rng = np.random.default_rng(3)
+        codes = rng.integers(-1, 4, 2000).astype(np.int32)
+        values = rng.normal(300, 5, codes.size)
+        values[rng.integers(0, codes.size, 100)] = np.nan
+        rule = ZScoreRule('spike', 'temperature', window=20, min_periods=10)
+
+        _, scores = rule.evaluate(values, codes)
+
+        expected = np.full(codes.size, np.nan)
+        for code in range(4):
+            rows = np.flatnonzero(codes == code)
+            series = pd.Series(values[rows])
+            window = series.shift(1).rolling(20, min_periods=10)
+            expected[rows] = ((series - window.mean()) / window.std()).to_numpy()
+        np.testing.assert_allclose(scores, expected, rtol=1e-7, atol=1e-9)
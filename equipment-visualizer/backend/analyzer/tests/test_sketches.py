@@ -0,0 +1,93 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from ..sketches import DEFAULT_COMPRESSION, Histogram, TDigest
+
+
+def digest_of(chunks):
+    """
+    Build one digest per chunk and merge them, as the partials do.
+    """
+    merged = TDigest()
+    for chunk in chunks:
+        digest = TDigest()
+        digest.update(chunk)
+        merged.merge(digest)
+    return merged
+
+
+class TDigestTests(SimpleTestCase):
+    """
+    Quantile estimates stay within the documented rank error.
+    """
+
+    def test_small_columns_are_exact(self):
+        values = np.array([3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0])
+        qs = [0.0, 0.1, 0.5, 0.9, 1.0]
+        digest = TDigest()
+        digest.update(values)
+        self.assertEqual(
+            np.round(digest.quantiles(qs), 9).tolist(),
+            np.round(pd.Series(values).quantile(qs).to_numpy(), 9).tolist()
+        )
+
+    def test_rank_error_bound(self):
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(3.0, 1.0, 200000)
+        values[rng.integers(0, values.size, 200)] *= 50
+        sorted_values = np.sort(values)
+
+        for name, digest in [('stream', digest_of([values])),
+                             ('merged', digest_of(np.array_split(values, 37)))]:
+            estimates = digest.quantiles([0.5, 0.95, 0.99])
+            for q, estimate in zip([0.5, 0.95, 0.99], estimates):
+                with self.subTest(digest=name, q=q):
+                    rank = np.searchsorted(sorted_values, estimate) / values.size
+                    bound = 2 * math.pi * math.sqrt(q * (1 - q)) / DEFAULT_COMPRESSION
+                    self.assertLessEqual(abs(rank - q), bound)
+            self.assertEqual(digest.min, values.min())
+            self.assertEqual(digest.max, values.max())
+
+    def test_round_trip(self):
+        digest = digest_of([np.arange(5000.0)])
+        restored = TDigest.from_dict(json.loads(json.dumps(digest.to_dict())))
+        self.assertEqual(restored.quantiles([0.25, 0.75]), digest.quantiles([0.25, 0.75]))
+
+
+class HistogramTests(SimpleTestCase):
+    """
+    Merged histograms have exact counts.
+    """
+
+    def exact_counts(self, values, bins):
+        edges = np.asarray(bins['edges'])
+        width = edges[1] - edges[0]
+        keys = np.floor(values / width).astype(np.int64) - int(round(edges[0] / width))
+        return np.bincount(keys, minlength=len(bins['counts'])).tolist()
+
+    def test_merge_equals_counting_all_values(self):
+        rng = np.random.default_rng(1)
+        # Chunks with different ranges force the bin width to grow
+        chunks = [rng.normal(100, 1, 5000), rng.normal(100, 40, 5000), rng.normal(-300, 5, 100)]
+        values = np.concatenate(chunks)
+
+        merged = Histogram()
+        for chunk in chunks:
+            histogram = Histogram()
+            histogram.update(chunk)
+            merged.merge(histogram)
+
+        bins = merged.bins()
+        self.assertLessEqual(len(bins['counts']), merged.max_bins)
+        self.assertEqual(sum(bins['counts']), values.size)
+        self.assertEqual(bins['counts'], self.exact_counts(values, bins))
+
+    def test_round_trip(self):
+        histogram = Histogram()
+        histogram.update(np.linspace(0, 1000, 777))
+        restored = Histogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+        self.assertEqual(restored.bins(), histogram.bins())
@@ -0,0 +1,84 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..engine import analyze_upload, parse_top_n
+from .utils import sample_upload
+
+
+# Type counts in sample_data.csv
+SAMPLE_TYPES = {'Pump': 10, 'Reactor': 9, 'Heater': 6}
+
+
+class ParseTopNTests(SimpleTestCase):
+    """
+    Values of the ?top_n= option.
+    """
+
+    def test_missing_means_all_types(self):
+        self.assertIsNone(parse_top_n(None))
+        self.assertIsNone(parse_top_n(''))
+
+    def test_positive_integer(self):
+        self.assertEqual(parse_top_n('3'), 3)
+
+    def test_invalid_values(self):
+        for value in ('abc', '0', '-1', '1.5'):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_top_n(value)
+
+
+class TopNResponseTests(SimpleTestCase):
+    """
+    SummaryAggregator.to_response() with and without top_n.
+    """
+
+    def setUp(self):
+        self.summary = analyze_upload(sample_upload())
+
+    def test_all_types_without_top_n(self):
+        response = self.summary.to_response()
+
+        self.assertEqual(response['equipment_by_type'], SAMPLE_TYPES)
+        self.assertNotIn('equipment_by_type_other', response)
+
+    def test_top_types_and_other(self):
+        response = self.summary.to_response(2)
+
+        self.assertEqual(list(response['equipment_by_type'].items()), [('Pump', 10), ('Reactor', 9)])
+        self.assertEqual(response['equipment_by_type_other'], {'types': 1, 'count': 6})
+        self.assertEqual(response['total_equipment'], 25)
+
+    def test_top_n_above_type_count(self):
+        response = self.summary.to_response(10)
+
+        self.assertEqual(response['equipment_by_type'], SAMPLE_TYPES)
+        self.assertEqual(response['equipment_by_type_other'], {'types': 0, 'count': 0})
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class TopNEndpointTests(TestCase):
+    """
+    The ?top_n= option of /api/analyze/.
+    """
+
+    def test_analyze_top_n(self):
+        response = self.client.post('/api/analyze/?top_n=1', {'file': sample_upload()})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['equipment_by_type'], {'Pump': 10})
+        self.assertEqual(response.data['equipment_by_type_other'], {'types': 2, 'count': 15})
+
+    def test_invalid_top_n_returns_400(self):
+        for value in ('abc', '0'):
+            with self.subTest(value=value):
+                response = self.client.post(f'/api/analyze/?top_n={value}', {'file': sample_upload()})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('Invalid top_n', response.data['error'])
+
+    def test_partial_keeps_all_types(self):
+        # Partials are merged later, so they must not drop any type
+        response = self.client.post('/api/analyze/?partial=1&top_n=1', {'file': sample_upload()})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('equipment_by_type_other', response.data)
+        self.assertEqual(len(response.data['type_counts']), 3)
@@ -0,0 +1,39 @@
+from django.test import TestCase, override_settings
+
+from .utils import sample_bytes, sample_upload
+
+
+@override_settings(ANALYZER_RESULT_CACHE=None)
+class UploadLimitTests(TestCase):
+    """
+    Too large uploads get 413, by body size or by number of rows.
+    """
+
+    def test_body_larger_than_the_limit_returns_413(self):
+        with override_settings(ANALYZER_MAX_UPLOAD_SIZE=len(sample_bytes()) // 2):
+            response = self.client.post('/api/analyze/', {'file': sample_upload()})
+
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('Upload too large', response.json()['error'])
+
+    def test_body_within_the_limit_is_accepted(self):
+        with override_settings(ANALYZER_MAX_UPLOAD_SIZE=len(sample_bytes()) * 2):
+            response = self.client.post('/api/analyze/', {'file': sample_upload()})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_too_many_rows_return_413(self):
+        for url in ('/api/analyze/', '/api/analyze/by-type/', '/api/datasets/'):
+            with self.subTest(url=url), override_settings(ANALYZER_MAX_UPLOAD_ROWS=10):
+                response = self.client.post(url, {'file': sample_upload()})
+
+                self.assertEqual(response.status_code, 413)
+                self.assertEqual(response.json()['error'], 'File has more than 10 rows')
+
+    def test_row_limit_counts_data_rows_only(self):
+        rows = sample_bytes().count(b'\n') - 1
+        with override_settings(ANALYZER_MAX_UPLOAD_ROWS=rows):
+            response = self.client.post('/api/analyze/', {'file': sample_upload()})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_equipment'], rows)
@@ -0,0 +1,76 @@
+"""
+Shared helpers for the analyzer tests.
+"""
+
+import io
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+
+
+SAMPLE_PATH = Path(__file__).resolve().parents[3] / 'sample_data.csv'
+
+HEADER = b'equipment_name,equipment_type,flowrate,pressure,temperature\n'
+
+SUMMARY_KEYS = ['total_equipment', 'average_flowrate', 'average_pressure',
+                'average_temperature', 'equipment_by_type']
+
+
+def sample_bytes():
+    return SAMPLE_PATH.read_bytes()
+
+
+def sample_upload(data=None, name='sample_data.csv'):
+    return SimpleUploadedFile(name, sample_bytes() if data is None else data)
+
+
+def split_rows(data, first_rows):
+    """
+    Split a CSV into its first rows (with the header) and the rest (without).
+    """
+    lines = data.splitlines(keepends=True)
+    return b''.join(lines[:first_rows + 1]), b''.join(lines[first_rows + 1:])
+
+
+def reference_summary(data):
+    """
+    The statistics /api/analyze/ returned before the streaming engine.
+    """
+    df = pd.read_csv(io.BytesIO(data))
+    return {
+        'total_equipment': len(df),
+        'average_flowrate': round(df['flowrate'].mean(), 2),
+        'average_pressure': round(df['pressure'].mean(), 2),
+        'average_temperature': round(df['temperature'].mean(), 2),
+        'equipment_by_type': df['equipment_type'].value_counts().to_dict()
+    }
+
+
+def summary_fields(result):
+    """
+    The keys of a result that reference_summary() has.
+    """
+    return {key: result[key] for key in SUMMARY_KEYS}
+
+
+def multipart_patch(client, url, data):
+    """
+    PATCH a multipart form (the test client only encodes POST bodies).
+    """
+    return client.patch(url, encode_multipart(BOUNDARY, data), content_type=MULTIPART_CONTENT)
+
+
+def use_temp_directory(test_case, setting):
+    """
+    Point a directory setting at a temporary directory for one test.
+    """
+    directory = tempfile.TemporaryDirectory()
+    test_case.addCleanup(directory.cleanup)
+    settings_override = override_settings(**{setting: directory.name})
+    settings_override.enable()
+    test_case.addCleanup(settings_override.disable)
+    return Path(directory.name)
@@ -0,0 +1,85 @@
+"""
+Stage Timing
+
+A StageTimer records how long each stage of handling one request took
+(multipart parsing, CSV parsing, aggregation, ...), plus the number of
+rows and bytes processed:
+
+    with timer.stage('parse'):
+        chunk = next(chunks)
+
+Time spent in the same stage several times (once per chunk) is added up.
+Code that is not instrumented gets NULL_TIMER, whose stage() returns a
+shared no-op context manager, so disabled timing costs almost nothing.
+
+This module does not import Django; metrics.py turns the timings into
+Server-Timing headers and Prometheus metrics.
+"""
+
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class StageTimer:
+    """
+    Durations, rows and bytes of one request.
+    """
+
+    def __init__(self):
+        # Insertion order = order in which stages first ran
+        self.durations = {}
+        self.rows = 0
+        self.bytes = 0
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time the body of a with block as stage `name`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        """
+        Add a duration measured elsewhere to stage `name`.
+        """
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def count(self, rows=0, bytes=0):
+        """
+        Add processed rows and bytes.
+        """
+        self.rows += rows
+        self.bytes += bytes
+
+    def server_timing(self, total=None):
+        """
+        Format the durations as a Server-Timing header value (milliseconds).
+        """
+        entries = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.durations.items()]
+        if total is not None:
+            entries.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(entries)
+
+
+class NullTimer:
+    """
+    Timer that records nothing.
+    """
+
+    _context = nullcontext()
+
+    def stage(self, name):
+        return self._context
+
+    def add(self, name, seconds):
+        pass
+
+    def count(self, rows=0, bytes=0):
+        pass
+
+
+NULL_TIMER = NullTimer()
@@ -0,0 +1,47 @@
+"""
+Upload Size Limits
+
+UploadSizeLimitMiddleware rejects requests to analyzer views whose body
+is larger than ANALYZER_MAX_UPLOAD_SIZE with 413, using the
+Content-Length header. It runs after URL resolution but before the view
+touches request.FILES, so an oversized upload is never parsed. Under
+WSGI the body is not even read; under ASGI, Django receives the body
+before any middleware runs.
+
+The row limit (ANALYZER_MAX_UPLOAD_ROWS) can only be checked while the
+CSV is parsed; see parsing.RowLimitError.
+"""
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+
+
+def max_upload_size():
+    """
+    Largest accepted request body in bytes, or None for no limit.
+    """
+    return getattr(settings, 'ANALYZER_MAX_UPLOAD_SIZE', None)
+
+
+class UploadSizeLimitMiddleware(MiddlewareMixin):
+    """
+    Returns 413 for analyzer requests with a too large body.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        limit = max_upload_size()
+        if limit is None or not view_func.__module__.startswith('analyzer.'):
+            return None
+
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+
+        if length > limit:
+            return JsonResponse(
+                {'error': f'Upload too large: {length} bytes (limit is {limit} bytes)'},
+                status=413
+            )
+        return None
@@ -3,4 +3,19 @@ from . import views
 
 urlpatterns = [
     path('analyze/', views.analyze_csv, name='analyze_csv'),
+    path('analyze/batch/', views.analyze_batch_csv, name='analyze_batch'),
+    path('analyze/by-type/', views.analyze_by_type, name='analyze_by_type'),
+    path('analyze/anomalies/', views.analyze_anomalies, name='analyze_anomalies'),
+    path('partials/merge/', views.merge_partials, name='merge_partials'),
+    path('jobs/<uuid:job_id>/', views.job_detail, name='job_detail'),
+    path('cache/stats/', views.cache_stats, name='cache_stats'),
+    path('metrics/', views.metrics, name='metrics'),
+    path('datasets/', views.dataset_list, name='dataset_list'),
+    path('datasets/<uuid:dataset_id>/', views.dataset_detail, name='dataset_detail'),
+    path('datasets/<uuid:dataset_id>/append/', views.dataset_append, name='dataset_append'),
+    path('datasets/<uuid:dataset_id>/rows/', views.dataset_rows, name='dataset_rows'),
+    path('datasets/<uuid:dataset_id>/stream/', views.dataset_stream, name='dataset_stream'),
+    path('datasets/<uuid:dataset_id>/summary/', views.dataset_summary, name='dataset_summary'),
+    path('datasets/<uuid:dataset_id>/by-type/', views.dataset_by_type, name='dataset_by_type'),
+    path('datasets/<uuid:dataset_id>/anomalies/', views.dataset_anomalies, name='dataset_anomalies'),
 ]
\ No newline at end of file
@@ -1,72 +1,820 @@
+import json
+
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-import pandas as pd
-import io
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
+
+from .batch import ArchiveLimitError, analyze_batch
+from .cache import get_result_cache, hash_upload, make_cache_key
+from .concurrency import PoolSaturatedError, get_analysis_pool, retry_after
+from .datasets import OffsetMismatchError, append_upload, dataset_aggregator, ingest_upload
+from .engine import SummaryAggregator, analyze_upload, check_upload_header, open_upload, parse_top_n
+from .groupby import collect_group_columns, group_statistics, parse_percentiles
+from .jobs import recover_interrupted_jobs, submit_job
+from .live import DatasetStream, stream_interval
+from .metrics import METRICS, metrics_enabled
+from .models import AnalysisJob, Dataset
+from .parsing import (
+    DEFAULT_CHUNK_ROWS, NUMERIC_COLUMNS, MissingColumnsError, RowLimitError, UploadFormatError
+)
+from .rules import (
+    DEFAULT_FLAGGED_LIMIT, collect_rule_columns, evaluate_rules, parse_rules, read_names
+)
+from .serializers import AnalysisJobSerializer, DatasetSerializer
+from .storage import delete_dataset_files
+from .timing import NULL_TIMER
+
+
+def _parse_options():
+    """
+    CSV parsing options from settings (see analyzer/parsing.py).
+    """
+    return {
+        'chunk_rows': getattr(settings, 'ANALYZER_CHUNK_ROWS', DEFAULT_CHUNK_ROWS),
+        'engine': getattr(settings, 'ANALYZER_CSV_ENGINE', 'auto'),
+        'float_dtype': getattr(settings, 'ANALYZER_FLOAT_DTYPE', 'float64'),
+        'max_rows': getattr(settings, 'ANALYZER_MAX_UPLOAD_ROWS', None)
+    }
+
+
+def _top_n_option(request):
+    """
+    The ?top_n= option: only the top_n most common equipment types are
+    returned, plus the remainder in equipment_by_type_other.
+    
+    Returns:
+        tuple: (top_n, error_response). top_n is None for all types;
+        error_response is a 400 response for an invalid value, else None.
+    """
+    try:
+        return parse_top_n(request.query_params.get('top_n')), None
+    except ValueError as e:
+        return None, Response(
+            {'error': f'Invalid top_n: {str(e)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+def _header_error(uploaded_file):
+    """
+    Check the CSV header of an upload before the file is read in full.
+    
+    Returns:
+        Response: 400 response if the header is not valid, else None
+    """
+    try:
+        check_upload_header(uploaded_file)
+    except (MissingColumnsError, UploadFormatError) as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return None
+
+
+def _dataset_files_error(error):
+    """
+    Response for a dataset whose stored files cannot be read.
+    
+    The metadata row exists but the column files are missing or damaged
+    (deleted by hand, disk full during a write); the data is gone, so the
+    response is 410 rather than a server error.
+    """
+    return Response(
+        {'error': f'Stored data of this dataset is missing or damaged ({error}); upload the file again'},
+        status=status.HTTP_410_GONE
+    )
+
+
+def _rule_options(rules_json, limit):
+    """
+    Anomaly rules and result limit for a request.
+    
+    Args:
+        rules_json (str): JSON list of rules, or None for ANALYZER_RULES
+        limit (str): Maximum number of flagged rows, or None for the default
+    
+    Returns:
+        tuple: (rules, limit)
+    
+    Raises:
+        ValueError: If the rules or the limit are not valid
+    """
+    if rules_json:
+        try:
+            config = json.loads(rules_json)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Rules are not valid JSON: {e}')
+    else:
+        config = getattr(settings, 'ANALYZER_RULES', [])
+    
+    rules = parse_rules(config)
+    limit = int(limit) if limit else getattr(settings, 'ANALYZER_FLAGGED_LIMIT', DEFAULT_FLAGGED_LIMIT)
+    if limit < 0:
+        raise ValueError('Limit must not be negative')
+    return rules, limit
+
+
+def _cache_lookup(uploaded_file, options):
+    """
+    Look up the result of a previous analysis of the same file.
+    
+    Returns:
+        tuple: (result_cache, cache_key, cached_response). The cache and
+        key are None when caching is disabled; cached_response is None
+        on a miss.
+    """
+    result_cache = get_result_cache()
+    if result_cache is None:
+        return None, None, None
+    
+    cache_key = make_cache_key(hash_upload(uploaded_file), options)
+    cached_data = result_cache.get(cache_key)
+    if cached_data is None:
+        return result_cache, cache_key, None
+    
+    response = Response(cached_data, status=status.HTTP_200_OK)
+    response['X-Analyzer-Cache'] = 'HIT'
+    return result_cache, cache_key, response
+
+
+def _cache_store(result_cache, cache_key, response_data):
+    """
+    Store a fresh result in the cache and build its response.
+    """
+    response = Response(response_data, status=status.HTTP_200_OK)
+    if result_cache is not None:
+        result_cache.set(cache_key, response_data)
+        response['X-Analyzer-Cache'] = 'MISS'
+    return response
+
+
+def _render_in_worker(view, request):
+    # Rendering the JSON is CPU work too, so it happens in the worker
+    response = view(request)
+    with getattr(request, 'analyzer_timer', NULL_TIMER).stage('serialize'):
+        response.render()
+    return response
+
+
+@csrf_exempt
+async def analyze_csv(request):
+    """
+    Async entry point of /api/analyze/.
+    
+    Under ASGI, Django receives the upload without blocking the event
+    loop or a thread, so one instance can hold many slow uploads at once.
+    All CPU-bound work (multipart parsing, CSV parsing, aggregation,
+    rendering) then runs analyze_csv_sync() in the bounded analysis pool
+    (see concurrency.py). When the pool is full, the response is 503 with
+    a Retry-After header instead of an ever longer queue.
+    """
+    try:
+        return await get_analysis_pool().run(_render_in_worker, analyze_csv_sync, request)
+    except PoolSaturatedError:
+        response = JsonResponse({'error': 'Server is busy, please retry later'}, status=503)
+        response['Retry-After'] = str(retry_after())
+        return response
 
 
 @api_view(['POST'])
-def analyze_csv(request):
+def analyze_csv_sync(request):
     """
     This function receives a CSV file, processes it, and returns statistics.
     
     Flow:
     1. Check if file exists in request
-    2. Read CSV using Pandas
-    3. Calculate statistics
+       (repeat uploads are answered from the result cache)
+    2. Stream the CSV through the typed parser in chunks
+    3. Keep running statistics
     4. Return JSON response
+    
+    The file may be gzip-, zstd- or zip-compressed (detected from its
+    first bytes); it is decompressed while it is parsed. Parquet and
+    Arrow IPC files are read instead of CSV when the upload is one, with
+    the same response.
+    
+    With ?async=1 the file is analyzed by a background worker instead:
+    the response is 202 with a job ID to poll at /api/jobs/<id>/.
+    
+    With ?partial=1 the response is the mergeable partial aggregate
+    (see SummaryAggregator.to_partial()) instead of the final summary.
+    Partials of several shards can be combined at /api/partials/merge/.
+    
+    With ?top_n=N only the N most common equipment types are listed;
+    the rest are summed up in equipment_by_type_other.
+    
+    Stage times (multipart, cache, parse, aggregate) are reported in the
+    Server-Timing header and at /api/metrics/.
     """
+    timer = getattr(request, 'analyzer_timer', NULL_TIMER)
     
     # Step 1: Check if file was uploaded
-    if 'file' not in request.FILES:
+    # (the multipart body is parsed on first access to request.FILES)
+    with timer.stage('multipart'):
+        has_file = 'file' in request.FILES
+    if not has_file:
         return Response(
             {'error': 'No file provided'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
     csv_file = request.FILES['file']
+    timer.count(bytes=csv_file.size)
+    partial = request.query_params.get('partial') in ('1', 'true')
+    top_n, error_response = _top_n_option(request)
+    if error_response is not None:
+        return error_response
     
-    # Step 2: Read CSV file using Pandas
+    # Options that change the result are part of the cache key
+    parse_options = _parse_options()
+    options = {'float_dtype': parse_options['float_dtype'], 'engine': parse_options['engine']}
+    if partial:
+        options['partial'] = True
+    elif top_n is not None:
+        # Partials always keep every type, so they can be merged
+        options['top_n'] = top_n
+    
+    # Wrong columns: reject the file before hashing or spooling all of it
+    with timer.stage('validate'):
+        error_response = _header_error(csv_file)
+    if error_response is not None:
+        return error_response
+    
+    # Large files: queue a background job and return its ID right away
+    if request.query_params.get('async') in ('1', 'true') and not partial:
+        job = submit_job(csv_file, parse_options, options, top_n)
+        return Response(AnalysisJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+    
+    # Return the cached result if this exact file was analyzed before
+    with timer.stage('cache'):
+        result_cache, cache_key, cached_response = _cache_lookup(csv_file, options)
+    if cached_response is not None:
+        return cached_response
+    
+    # Step 2: Stream the CSV through the aggregation engine
     try:
-        # Read the file content
-        file_content = csv_file.read().decode('utf-8')
-        
-        # Convert to Pandas DataFrame
-        df = pd.read_csv(io.StringIO(file_content))
-        
-        # Step 3: Validate required columns exist
-        required_columns = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
-        
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
+        # The file is parsed chunk by chunk, so memory stays flat
+        # no matter how large the upload is.
+        # Step 3: Validate required columns exist (the header line is
+        # checked before the bulk of the file is parsed)
+        try:
+            summary = analyze_upload(csv_file, timer=timer, **parse_options)
+        except (MissingColumnsError, UploadFormatError) as e:
             return Response(
-                {'error': f'Missing columns: {", ".join(missing_columns)}'},
+                {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        except RowLimitError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
         
-        # Step 4: Calculate statistics
-        total_equipment = len(df)
-        avg_flowrate = df['flowrate'].mean()
-        avg_pressure = df['pressure'].mean()
-        avg_temperature = df['temperature'].mean()
-        
-        # Count equipment per type
-        equipment_counts = df['equipment_type'].value_counts().to_dict()
-        
-        # Step 5: Prepare response data
-        response_data = {
-            'total_equipment': total_equipment,
-            'average_flowrate': round(avg_flowrate, 2),
-            'average_pressure': round(avg_pressure, 2),
-            'average_temperature': round(avg_temperature, 2),
-            'equipment_by_type': equipment_counts
-        }
+        # Step 4 and 5: Running sums/counts become the response data
+        response_data = summary.to_partial() if partial else summary.to_response(top_n)
         
         # Step 6: Return JSON response
-        return Response(response_data, status=status.HTTP_200_OK)
+        return _cache_store(result_cache, cache_key, response_data)
         
     except Exception as e:
         return Response(
             {'error': f'Error processing file: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+
+@api_view(['POST'])
+def merge_partials(request):
+    """
+    Merge partial aggregates into one final summary.
+    
+    Expects JSON {"partials": [...]} where every item is the output of
+    /api/analyze/?partial=1 (for example one per shard of a large
+    export). The merge is associative, so partials can also be merged in
+    stages: the response includes the merged partial for that purpose.
+    Accepts ?top_n= like /api/analyze/ for the summary.
+    """
+    partials = request.data.get('partials') if isinstance(request.data, dict) else None
+    if not isinstance(partials, list) or not partials:
+        return Response(
+            {'error': 'No partials provided'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    top_n, error_response = _top_n_option(request)
+    if error_response is not None:
+        return error_response
+    
+    merged = SummaryAggregator()
+    try:
+        for partial in partials:
+            merged.merge(SummaryAggregator.from_partial(partial))
+    except ValueError as e:
+        return Response(
+            {'error': f'Invalid partial: {str(e)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    response_data = {
+        'summary': merged.to_response(top_n),
+        'columns': merged.column_statistics(),
+        'partial': merged.to_partial()
+    }
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+def analyze_by_type(request):
+    """
+    Receive a CSV file and return statistics per equipment type.
+    
+    For every type: count, mean, std, min, max and percentiles of
+    flowrate, pressure and temperature, computed in one vectorized
+    group-by pass. Percentiles can be chosen with ?percentiles=5,50,95.
+    """
+    if 'file' not in request.FILES:
+        return Response(
+            {'error': 'No file provided'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        percentiles = parse_percentiles(request.query_params.get('percentiles'))
+    except ValueError as e:
+        return Response(
+            {'error': f'Invalid percentiles: {str(e)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    csv_file = request.FILES['file']
+    parse_options = _parse_options()
+    options = {
+        'view': 'by_type',
+        'percentiles': percentiles,
+        'float_dtype': parse_options['float_dtype'],
+        'engine': parse_options['engine']
+    }
+    
+    error_response = _header_error(csv_file)
+    if error_response is not None:
+        return error_response
+    
+    result_cache, cache_key, cached_response = _cache_lookup(csv_file, options)
+    if cached_response is not None:
+        return cached_response
+    
+    try:
+        codes, columns, type_names = collect_group_columns(open_upload(csv_file), **parse_options)
+        response_data = group_statistics(codes, columns, type_names, percentiles)
+    except (MissingColumnsError, UploadFormatError) as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except RowLimitError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    except Exception as e:
+        return Response(
+            {'error': f'Error processing file: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    return _cache_store(result_cache, cache_key, response_data)
+
+
+@api_view(['POST'])
+def analyze_anomalies(request):
+    """
+    Receive a CSV file and return the equipment rows that break a rule.
+    
+    Rules come from the ANALYZER_RULES setting, or from an optional
+    "rules" form field holding a JSON list (see analyzer/rules.py).
+    ?limit=N caps the number of flagged rows listed; flagged_count is
+    always the full count.
+    """
+    if 'file' not in request.FILES:
+        return Response(
+            {'error': 'No file provided'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        rules, limit = _rule_options(request.data.get('rules'), request.query_params.get('limit'))
+    except ValueError as e:
+        return Response(
+            {'error': f'Invalid rules: {str(e)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    csv_file = request.FILES['file']
+    parse_options = _parse_options()
+    options = {
+        'view': 'anomalies',
+        'rules': [rule.describe() for rule in rules],
+        'limit': limit,
+        'float_dtype': parse_options['float_dtype'],
+        'engine': parse_options['engine']
+    }
+    
+    error_response = _header_error(csv_file)
+    if error_response is not None:
+        return error_response
+    
+    result_cache, cache_key, cached_response = _cache_lookup(csv_file, options)
+    if cached_response is not None:
+        return cached_response
+    
+    try:
+        codes, columns, type_names = collect_rule_columns(open_upload(csv_file), **parse_options)
+        response_data = evaluate_rules(
+            rules, codes, columns, type_names,
+            lambda rows: read_names(open_upload(csv_file), rows, **parse_options), limit
+        )
+    except (MissingColumnsError, UploadFormatError) as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except RowLimitError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    except Exception as e:
+        return Response(
+            {'error': f'Error processing file: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    return _cache_store(result_cache, cache_key, response_data)
+
+
+@api_view(['POST'])
+def analyze_batch_csv(request):
+    """
+    Receive many CSV files (field "files", or a zip of CSVs) in one request.
+    
+    Files are parsed in parallel worker processes. The response has the
+    statistics of each file plus a combined summary with weighted means
+    and summed type counts.
+    """
+    uploaded_files = request.FILES.getlist('files') + request.FILES.getlist('file')
+    if not uploaded_files:
+        return Response(
+            {'error': 'No files provided'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    top_n, error_response = _top_n_option(request)
+    if error_response is not None:
+        return error_response
+    
+    try:
+        response_data = analyze_batch(uploaded_files, _parse_options(), top_n)
+    except UploadFormatError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except ArchiveLimitError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    except Exception as e:
+        return Response(
+            {'error': f'Error processing files: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def job_detail(request, job_id):
+    """
+    Return the status of a background analysis.
+    
+    While the job runs, rows_processed grows after every parsed chunk.
+    When status is "done", result holds the same data /api/analyze/
+    returns; when it is "failed", error holds the message.
+    """
+    recover_interrupted_jobs()
+    job = get_object_or_404(AnalysisJob, pk=job_id)
+    return Response(AnalysisJobSerializer(job).data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def cache_stats(request):
+    """
+    Return hit/miss counters of the analysis result cache.
+    """
+    result_cache = get_result_cache()
+    if result_cache is None:
+        return Response({'enabled': False}, status=status.HTTP_200_OK)
+    
+    return Response({'enabled': True, **result_cache.stats()}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET', 'POST'])
+def dataset_list(request):
+    """
+    List stored datasets, or upload a CSV to create a new one.
+    
+    POST parses the file once into the columnar store and returns the
+    new dataset ID together with its summary. Follow-up queries use the
+    ID and never read the CSV again.
+    """
+    if request.method == 'GET':
+        serializer = DatasetSerializer(Dataset.objects.all(), many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+    
+    if 'file' not in request.FILES:
+        return Response(
+            {'error': 'No file provided'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    top_n, error_response = _top_n_option(request)
+    if error_response is not None:
+        return error_response
+    
+    try:
+        dataset, summary = ingest_upload(request.FILES['file'], **_parse_options())
+    except (MissingColumnsError, UploadFormatError) as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except RowLimitError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    except Exception as e:
+        return Response(
+            {'error': f'Error processing file: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    response_data = DatasetSerializer(dataset).data
+    response_data['summary'] = summary.to_response(top_n)
+    return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'DELETE'])
+def dataset_detail(request, dataset_id):
+    """
+    Return metadata of a stored dataset, or delete it.
+    """
+    dataset = get_object_or_404(Dataset, pk=dataset_id)
+    
+    if request.method == 'DELETE':
+        delete_dataset_files(dataset.storage_dir)
+        dataset.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    return Response(DatasetSerializer(dataset).data, status=status.HTTP_200_OK)
+
+
+@api_view(['PATCH'])
+def dataset_append(request, dataset_id):
+    """
+    Add rows that were appended to a dataset's source CSV.
+    
+    The "file" field holds only the new bytes of the source file
+    (complete rows, no header). The optional "offset" field is the byte
+    offset of those bytes in the source file; it must equal the dataset's
+    size_bytes, otherwise 409 is returned with the expected offset.
+    
+    Only the new rows are parsed. The response is the updated dataset
+    with the same summary a full re-upload would give.
+    """
+    get_object_or_404(Dataset, pk=dataset_id)
+    
+    if 'file' not in request.FILES:
+        return Response(
+            {'error': 'No file provided'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    top_n, error_response = _top_n_option(request)
+    if error_response is not None:
+        return error_response
+    
+    offset = request.data.get('offset')
+    try:
+        offset = None if offset in (None, '') else int(offset)
+    except ValueError:
+        return Response(
+            {'error': 'Invalid offset'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        dataset, summary = append_upload(
+            dataset_id, request.FILES['file'], offset=offset, **_parse_options()
+        )
+    except OffsetMismatchError as e:
+        return Response(
+            {'error': str(e), 'expected_offset': e.expected_offset},
+            status=status.HTTP_409_CONFLICT
+        )
+    except RowLimitError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    except ValueError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except Exception as e:
+        return Response(
+            {'error': f'Error processing file: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    response_data = DatasetSerializer(dataset).data
+    response_data['summary'] = summary.to_response(top_n)
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+def dataset_rows(request, dataset_id):
+    """
+    Add a batch of rows to a dataset from a stream of readings.
+    
+    The request body is CSV rows in the dataset's column order, without
+    a header line (for example Content-Type: text/csv, sent by a logger
+    every few seconds). Unlike /append/, there is no source file and no
+    offset: size_bytes stays the offset in the source file, so /append/
+    can still continue from it. The response is the updated dataset
+    without its summary: clients follow the statistics at
+    /api/datasets/<id>/stream/.
+    """
+    get_object_or_404(Dataset, pk=dataset_id)
+    
+    rows = request.body
+    if not rows.strip():
+        return Response(
+            {'error': 'No rows provided'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        dataset, _ = append_upload(
+            dataset_id, SimpleUploadedFile('rows.csv', rows), from_source=False, **_parse_options()
+        )
+    except RowLimitError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    except ValueError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except Exception as e:
+        return Response(
+            {'error': f'Error processing rows: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    return Response(DatasetSerializer(dataset).data, status=status.HTTP_200_OK)
+
+
+@require_GET
+def dataset_stream(request, dataset_id):
+    """
+    Push a dataset's statistics as Server-Sent Events while it grows.
+    
+    See analyzer/live.py for the events. ?top_n= works like for
+    /api/analyze/; ?interval= asks for fewer events (seconds between
+    them, never below ANALYZER_STREAM_INTERVAL). A plain Django view,
+    since the output is an endless text/event-stream.
+    """
+    if not Dataset.objects.filter(pk=dataset_id).exists():
+        return JsonResponse({'error': 'Dataset not found'}, status=404)
+    
+    try:
+        top_n = parse_top_n(request.GET.get('top_n'))
+        interval = stream_interval(request.GET.get('interval'))
+    except ValueError as e:
+        return JsonResponse({'error': f'Invalid stream option: {str(e)}'}, status=400)
+    
+    stream = DatasetStream(dataset_id, top_n=top_n, interval=interval)
+    # ASGI servers get an async iterator, so open streams hold no thread
+    events = stream.iter_async() if isinstance(request, ASGIRequest) else stream.iter_sync()
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Do not let a reverse proxy (nginx) buffer the events
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@api_view(['GET'])
+def dataset_summary(request, dataset_id):
+    """
+    Return the /api/analyze/ statistics of a stored dataset.
+    
+    Served from the running summary stored with the dataset, without
+    re-reading the CSV.
+    """
+    dataset = get_object_or_404(Dataset, pk=dataset_id)
+    top_n, error_response = _top_n_option(request)
+    if error_response is not None:
+        return error_response
+    
+    try:
+        summary = dataset_aggregator(dataset)
+    except (OSError, ValueError, KeyError) as e:
+        return _dataset_files_error(e)
+    return Response(summary.to_response(top_n), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def dataset_by_type(request, dataset_id):
+    """
+    Return per-type statistics of a stored dataset.
+    
+    Same layout as /api/analyze/by-type/, computed from the stored columns.
+    """
+    dataset = get_object_or_404(Dataset, pk=dataset_id)
+    
+    try:
+        percentiles = parse_percentiles(request.query_params.get('percentiles'))
+    except ValueError as e:
+        return Response(
+            {'error': f'Invalid percentiles: {str(e)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        store = dataset.open_store()
+        columns = {column: store.column(column) for column in NUMERIC_COLUMNS}
+        codes = store.column('equipment_type')
+    except (OSError, ValueError, KeyError) as e:
+        return _dataset_files_error(e)
+    
+    response_data = group_statistics(codes, columns, store.types, percentiles)
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def dataset_anomalies(request, dataset_id):
+    """
+    Return the rows of a stored dataset that break a rule.
+    
+    Same layout as /api/analyze/anomalies/, evaluated on the stored
+    columns. Rules can be given as a JSON list in ?rules=.
+    """
+    dataset = get_object_or_404(Dataset, pk=dataset_id)
+    
+    try:
+        rules, limit = _rule_options(
+            request.query_params.get('rules'), request.query_params.get('limit')
+        )
+    except ValueError as e:
+        return Response(
+            {'error': f'Invalid rules: {str(e)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        store = dataset.open_store()
+        columns = {column: store.column(column) for column in NUMERIC_COLUMNS}
+        codes = store.column('equipment_type')
+        response_data = evaluate_rules(
+            rules, codes, columns, store.types,
+            lambda rows: store.take('equipment_name', rows), limit
+        )
+    except (OSError, ValueError, KeyError) as e:
+        return _dataset_files_error(e)
+    
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+@require_GET
+def metrics(request):
+    """
+    Request and stage timing metrics in the Prometheus text format.
+    
+    A plain Django view, since the output is not JSON.
+    """
+    if not metrics_enabled():
+        raise Http404('Metrics are disabled')
+    return HttpResponse(METRICS.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
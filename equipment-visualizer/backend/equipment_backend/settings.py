@@ -43,10 +43,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'analyzer.metrics.StageTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'analyzer.uploads.UploadSizeLimitMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -138,3 +140,87 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.JSONParser',
     ],
 }
+
+# Analyzer settings
+# Number of CSV rows parsed at a time by the streaming aggregation engine
+ANALYZER_CHUNK_ROWS = 100000
+
+# CSV parser: 'auto' uses the multithreaded pyarrow reader when pyarrow is
+# installed and falls back to the Pandas C engine; 'pyarrow' or 'c' force one
+ANALYZER_CSV_ENGINE = 'auto'
+
+# dtype of flowrate/pressure/temperature while parsing. 'float32' halves
+# memory for stored datasets, but averages can differ in the last rounded
+# digit from the float64 result
+ANALYZER_FLOAT_DTYPE = 'float64'
+
+# Cache for repeated analyses of the same file (set to None to disable).
+# BACKEND can be analyzer.cache.LocMemResultCache, DjangoResultCache
+# (OPTIONS: alias, timeout) or SQLiteResultCache (OPTIONS: path).
+ANALYZER_RESULT_CACHE = {
+    'BACKEND': 'analyzer.cache.LocMemResultCache',
+    'OPTIONS': {'max_entries': 128},
+}
+
+# Where parsed datasets are stored as columnar NumPy files
+ANALYZER_DATASET_ROOT = BASE_DIR / 'datasets'
+
+# Background analyses (POST /api/analyze/?async=1)
+# Uploads are spooled here until a worker has analyzed them
+ANALYZER_JOB_ROOT = BASE_DIR / 'job_uploads'
+
+# Number of analyses that run at the same time in the local worker pool
+ANALYZER_JOB_WORKERS = 2
+
+# Worker processes for /api/analyze/batch/ (None = one per CPU core)
+ANALYZER_BATCH_WORKERS = None
+
+# Most entries a zip file sent to /api/analyze/batch/ may have (None = no
+# limit). Their total extracted size is limited by ANALYZER_MAX_UPLOAD_SIZE.
+ANALYZER_MAX_ZIP_MEMBERS = 1000
+
+# Anomaly rules for /api/analyze/anomalies/ (see analyzer/rules.py).
+# 'range' flags values outside min/max; 'zscore' flags values more than
+# threshold standard deviations from the rolling mean of the previous
+# window readings of the same equipment type.
+ANALYZER_RULES = [
+    {'name': 'pressure_limit', 'type': 'range', 'column': 'pressure', 'max': 10.0},
+    {'name': 'temperature_spike', 'type': 'zscore', 'column': 'temperature',
+     'window': 100, 'threshold': 3.0},
+]
+
+# Maximum number of flagged rows listed in one anomaly response
+ANALYZER_FLAGGED_LIMIT = 1000
+
+# Per-request stage timing: Server-Timing response headers and
+# Prometheus metrics at /api/metrics/. Set to False to remove the
+# timing middleware entirely.
+ANALYZER_METRICS_ENABLED = True
+
+# Uploads larger than this (bytes) are spooled to a temporary file by
+# Django instead of being kept in memory. The analyzer memory-maps
+# spooled files and parses them in place.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440
+
+# Largest request body accepted by the analyzer API, in bytes (None = no
+# limit). Larger uploads get 413 before the body is read.
+ANALYZER_MAX_UPLOAD_SIZE = 1024 * 1024 * 1024
+
+# Most data rows an uploaded CSV may have (None = no limit). Parsing
+# stops with 413 as soon as a file goes past it.
+ANALYZER_MAX_UPLOAD_ROWS = 20000000
+
+# Worker threads that analyze /api/analyze/ uploads (the view itself is
+# async, so waiting uploads do not hold a thread)
+ANALYZER_ASYNC_WORKERS = 4
+
+# Uploads that may wait for a free worker; more get 503 + Retry-After
+ANALYZER_ASYNC_QUEUE = 16
+
+# Seconds sent in the Retry-After header of a 503 response
+ANALYZER_RETRY_AFTER = 5
+
+# Live dataset streams (GET /api/datasets/<id>/stream/): seconds between
+# events. Appends within one interval are sent as one event; clients can
+# ask for a longer interval with ?interval=, not a shorter one
+ANALYZER_STREAM_INTERVAL = 1.0
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import './App.css';
 import { Bar } from 'react-chartjs-2';
 import {
@@ -21,12 +21,131 @@ ChartJS.register(
   Legend
 );
 
+const API_BASE_URL = 'http://localhost:8000/api';
+
+// How often to ask the backend about a running analysis (milliseconds)
+const JOB_POLL_INTERVAL = 500;
+
+// Failed status requests in a row before giving up on a job, and the
+// longest a job may take (milliseconds)
+const JOB_POLL_RETRIES = 5;
+const JOB_TIMEOUT = 30 * 60 * 1000;
+
+// Error whose message is shown to the user as it is
+class AnalysisError extends Error {}
+
+// Equipment types the backend sends (the rest come summed up in
+// equipment_by_type_other), and the most bars plotted before "Other"
+const TOP_TYPES = 40;
+
+// Least width of one bar in pixels: with many bars the chart grows wider
+// than the page and scrolls sideways
+const BAR_WIDTH = 28;
+
+// Bar colors, repeated when there are more types than colors
+const BAR_COLORS = [
+  '52, 152, 219',
+  '46, 204, 113',
+  '155, 89, 182',
+  '241, 196, 15',
+  '231, 76, 60',
+];
+const OTHER_COLOR = '189, 195, 199';
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Sensor columns with a histogram in results.distributions
+const SENSOR_COLUMNS = {
+  flowrate: 'Flowrate',
+  pressure: 'Pressure',
+  temperature: 'Temperature',
+};
+
+// Merge a live "delta" event into the statistics shown. Object values
+// (equipment_by_type, distributions, ...) are merged one level down, and
+// their null entries removed, like the backend diffs them (live.py)
+const mergeDelta = (summary, delta) => {
+  const merged = { ...summary };
+  Object.entries(delta).forEach(([key, value]) => {
+    const previous = summary[key];
+    if (value && typeof value === 'object' && !Array.isArray(value)
+        && previous && typeof previous === 'object' && !Array.isArray(previous)) {
+      const entries = { ...previous, ...value };
+      Object.keys(value).forEach((name) => {
+        if (value[name] === null) delete entries[name];
+      });
+      merged[key] = entries;
+    } else {
+      merged[key] = value;
+    }
+  });
+  return merged;
+};
+
 function App() {
   // State management
   const [selectedFile, setSelectedFile] = useState(null);
   const [results, setResults] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const [rowsProcessed, setRowsProcessed] = useState(0);
+  const [sensorColumn, setSensorColumn] = useState('flowrate');
+
+  // Live mode: the file is stored as a dataset and its statistics are
+  // pushed by the backend (Server-Sent Events) while rows are added to it
+  const [liveMode, setLiveMode] = useState(false);
+  const [liveDatasetId, setLiveDatasetId] = useState('');
+  const [liveStatus, setLiveStatus] = useState(null);
+  const liveSource = useRef(null);
+
+  // Close the stream when the page goes away
+  useEffect(() => () => liveSource.current && liveSource.current.close(), []);
+
+  const stopWatching = () => {
+    if (liveSource.current) {
+      liveSource.current.close();
+      liveSource.current = null;
+    }
+    setLiveStatus(null);
+  };
+
+  // Subscribe to a dataset's statistics. The first event has the full
+  // summary, later ones only the changed entries (at most about one per
+  // second, however fast rows arrive)
+  const watchDataset = (datasetId) => {
+    stopWatching();
+    setError(null);
+    setLiveDatasetId(datasetId);
+    setLiveStatus('connecting');
+
+    const source = new EventSource(
+      `${API_BASE_URL}/datasets/${datasetId}/stream/?top_n=${TOP_TYPES}`
+    );
+    source.addEventListener('summary', (event) => {
+      setResults(JSON.parse(event.data));
+      setLiveStatus('live');
+    });
+    source.addEventListener('delta', (event) => {
+      const delta = JSON.parse(event.data);
+      setResults((previous) => mergeDelta(previous, delta));
+    });
+    source.addEventListener('deleted', () => {
+      stopWatching();
+      setError('The live dataset was deleted');
+    });
+    // EventSource reconnects by itself after a lost connection (the
+    // backend then sends the full summary again), but not after an error
+    // response such as an unknown dataset
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        stopWatching();
+        setError(`Cannot watch dataset ${datasetId}`);
+      } else {
+        setLiveStatus('reconnecting');
+      }
+    };
+    liveSource.current = source;
+  };
 
   // Handle file selection
   const handleFileChange = (event) => {
@@ -43,6 +162,7 @@ function App() {
     }
 
     // Clear previous results and errors
+    stopWatching();
     setResults(null);
     setError(null);
     setLoading(true);
@@ -51,36 +171,110 @@ function App() {
     const formData = new FormData();
     formData.append('file', selectedFile);
 
+    if (liveMode) {
+      // Store the file as a dataset and follow it; new rows are sent to
+      // /api/datasets/<id>/append/ or /rows/ by whoever writes the file
+      try {
+        const response = await fetch(`${API_BASE_URL}/datasets/`, {
+          method: 'POST',
+          body: formData,
+        });
+        const dataset = await response.json();
+        if (!response.ok) {
+          setError(dataset.error || 'An error occurred while processing the file');
+          return;
+        }
+        watchDataset(dataset.id);
+      } catch (err) {
+        setError('Failed to connect to the server. Make sure the backend is running.');
+      } finally {
+        setLoading(false);
+      }
+      return;
+    }
+
     try {
-      // Send POST request to Django backend
-      const response = await fetch('http://localhost:8000/api/analyze/', {
+      // Start a background analysis; the backend answers with a job right away
+      const response = await fetch(`${API_BASE_URL}/analyze/?async=1&top_n=${TOP_TYPES}`, {
         method: 'POST',
         body: formData,
       });
 
-      const data = await response.json();
+      let job = await response.json();
+
+      if (!response.ok) {
+        // Backend returned an error
+        setError(job.error || 'An error occurred while processing the file');
+        return;
+      }
+
+      // Poll the job until it is finished, showing rows processed so far
+      const deadline = Date.now() + JOB_TIMEOUT;
+      let failedPolls = 0;
+      while (job.status !== 'done' && job.status !== 'failed') {
+        setRowsProcessed(job.rows_processed);
+        if (Date.now() > deadline) {
+          throw new AnalysisError('The analysis is taking too long; try again later.');
+        }
+        await sleep(JOB_POLL_INTERVAL);
+
+        let jobResponse;
+        try {
+          jobResponse = await fetch(`${API_BASE_URL}/jobs/${job.id}/`);
+        } catch (err) {
+          // Network hiccup: ask again, up to JOB_POLL_RETRIES times in a row
+          failedPolls += 1;
+          if (failedPolls >= JOB_POLL_RETRIES) throw err;
+          continue;
+        }
+        failedPolls = 0;
 
-      if (response.ok) {
+        const data = await jobResponse.json().catch(() => ({}));
+        if (!jobResponse.ok) {
+          throw new AnalysisError(data.error || 'Lost track of the analysis; upload the file again.');
+        }
+        job = data;
+      }
+
+      if (job.status === 'done') {
         // Success: Store results
-        setResults(data);
+        setResults(job.result);
       } else {
-        // Backend returned an error
-        setError(data.error || 'An error occurred while processing the file');
+        setError(job.error || 'An error occurred while processing the file');
       }
     } catch (err) {
       // Network or other error
-      setError('Failed to connect to the server. Make sure the backend is running.');
+      setError(err instanceof AnalysisError
+        ? err.message
+        : 'Failed to connect to the server. Make sure the backend is running.');
     } finally {
       setLoading(false);
+      setRowsProcessed(0);
     }
   };
 
-  // Prepare chart data
+  // Prepare chart data: types sorted by count, at most TOP_TYPES bars,
+  // and one "Other" bar for the rest
   const getChartData = () => {
     if (!results || !results.equipment_by_type) return null;
 
-    const types = Object.keys(results.equipment_by_type);
-    const counts = Object.values(results.equipment_by_type);
+    const sorted = Object.entries(results.equipment_by_type).sort((a, b) => b[1] - a[1]);
+    const shown = sorted.slice(0, TOP_TYPES);
+    const types = shown.map(([type]) => type);
+    const counts = shown.map(([, count]) => count);
+
+    // Types left out here, plus those the backend left out
+    const other = results.equipment_by_type_other || { types: 0, count: 0 };
+    const otherTypes = other.types + sorted.length - shown.length;
+    const otherCount = other.count + sorted.slice(TOP_TYPES).reduce((sum, [, count]) => sum + count, 0);
+    if (otherTypes > 0) {
+      types.push(`Other (${otherTypes} ${otherTypes === 1 ? 'type' : 'types'})`);
+      counts.push(otherCount);
+    }
+
+    const colors = types.map((_, i) =>
+      otherTypes > 0 && i === types.length - 1 ? OTHER_COLOR : BAR_COLORS[i % BAR_COLORS.length]
+    );
 
     return {
       labels: types,
@@ -88,28 +282,64 @@ function App() {
         {
           label: 'Number of Equipment',
           data: counts,
-          backgroundColor: [
-            'rgba(52, 152, 219, 0.8)',
-            'rgba(46, 204, 113, 0.8)',
-            'rgba(155, 89, 182, 0.8)',
-            'rgba(241, 196, 15, 0.8)',
-            'rgba(231, 76, 60, 0.8)',
-          ],
-          borderColor: [
-            'rgba(52, 152, 219, 1)',
-            'rgba(46, 204, 113, 1)',
-            'rgba(155, 89, 182, 1)',
-            'rgba(241, 196, 15, 1)',
-            'rgba(231, 76, 60, 1)',
-          ],
+          backgroundColor: colors.map((color) => `rgba(${color}, 0.8)`),
+          borderColor: colors.map((color) => `rgba(${color}, 1)`),
           borderWidth: 2,
         },
       ],
     };
   };
 
+  // Histogram of one sensor column (binned by the backend, no raw rows)
+  const getDistributionData = () => {
+    if (!results || !results.distributions) return null;
+
+    const distribution = results.distributions[sensorColumn];
+    if (!distribution || !distribution.histogram.counts.length) return null;
+
+    const { edges, counts } = distribution.histogram;
+
+    return {
+      labels: counts.map((_, i) => `${edges[i]} – ${edges[i + 1]}`),
+      datasets: [
+        {
+          label: 'Rows',
+          data: counts,
+          backgroundColor: 'rgba(52, 152, 219, 0.8)',
+          borderColor: 'rgba(52, 152, 219, 1)',
+          borderWidth: 1,
+          barPercentage: 1.0,
+          categoryPercentage: 1.0,
+        },
+      ],
+    };
+  };
+
+  const distributionOptions = {
+    responsive: true,
+    plugins: {
+      legend: {
+        display: false,
+      },
+      title: {
+        display: true,
+        text: `${SENSOR_COLUMNS[sensorColumn]} Distribution`,
+        font: {
+          size: 16,
+        },
+      },
+    },
+    scales: {
+      y: {
+        beginAtZero: true,
+      },
+    },
+  };
+
   const chartOptions = {
     responsive: true,
+    // The chart fills its scroll container (see the Chart Section below)
+    maintainAspectRatio: false,
     plugins: {
       legend: {
         display: false,
@@ -126,12 +356,15 @@ function App() {
       y: {
         beginAtZero: true,
         ticks: {
-          stepSize: 1,
+          // Integer ticks, without one tick per count for large files
+          precision: 0,
         },
       },
     },
   };
 
+  const chartData = getChartData();
+
   return (
     <div className="App">
       {/* Header */}
@@ -146,7 +379,7 @@ function App() {
         <div className="file-input-container">
           <input
             type="file"
-            accept=".csv"
+            accept=".csv,.gz,.zst,.zip,.parquet,.arrow,.feather"
             onChange={handleFileChange}
             className="file-input"
           />
@@ -158,11 +391,50 @@ function App() {
             {loading ? 'Processing...' : 'Analyze Data'}
           </button>
         </div>
+        <label className="live-option">
+          <input
+            type="checkbox"
+            checked={liveMode}
+            onChange={(event) => setLiveMode(event.target.checked)}
+          />
+          Live: keep updating as rows are added to the dataset
+        </label>
         {selectedFile && (
           <p style={{ marginTop: '10px', color: '#27ae60' }}>
             Selected: {selectedFile.name}
           </p>
         )}
+
+        {/* Follow a dataset that is already growing (for example one the
+            desktop app or a logger is feeding) */}
+        <div className="live-watch">
+          <input
+            type="text"
+            placeholder="Dataset ID"
+            value={liveDatasetId}
+            onChange={(event) => setLiveDatasetId(event.target.value.trim())}
+            className="dataset-input"
+          />
+          {liveStatus ? (
+            <button onClick={stopWatching} className="upload-button">
+              Stop Watching
+            </button>
+          ) : (
+            <button
+              onClick={() => watchDataset(liveDatasetId)}
+              disabled={!liveDatasetId}
+              className="upload-button"
+            >
+              Watch Live
+            </button>
+          )}
+        </div>
+        {liveStatus && (
+          <p className="live-status">
+            ● {liveStatus === 'live' ? 'Live' : liveStatus === 'connecting' ? 'Connecting...' : 'Reconnecting...'}
+            {' '}(dataset {liveDatasetId})
+          </p>
+        )}
       </div>
 
       {/* Error Message */}
@@ -176,6 +448,9 @@ function App() {
       {loading && (
         <div className="loading">
           <p>Processing your CSV file...</p>
+          {rowsProcessed > 0 && (
+            <p>{rowsProcessed.toLocaleString()} rows processed</p>
+          )}
         </div>
       )}
 
@@ -207,10 +482,46 @@ function App() {
           {/* Chart Section */}
           <div className="chart-section">
             <h3>Equipment Distribution</h3>
-            {getChartData() && (
-              <Bar data={getChartData()} options={chartOptions} />
+            {chartData && (
+              <div className="chart-scroll">
+                <div
+                  className="chart-canvas"
+                  style={{ minWidth: `${chartData.labels.length * BAR_WIDTH}px` }}
+                >
+                  <Bar data={chartData} options={chartOptions} />
+                </div>
+              </div>
             )}
           </div>
+
+          {/* Sensor Distribution Section */}
+          {results.distributions && (
+            <div className="chart-section">
+              <h3>Sensor Distributions</h3>
+              <div className="column-tabs">
+                {Object.entries(SENSOR_COLUMNS).map(([column, label]) => (
+                  <button
+                    key={column}
+                    onClick={() => setSensorColumn(column)}
+                    className={column === sensorColumn ? 'column-tab active' : 'column-tab'}
+                  >
+                    {label}
+                  </button>
+                ))}
+              </div>
+              <div className="percentiles">
+                {['p50', 'p95', 'p99'].map((key) => (
+                  <span key={key}>
+                    <strong>{key}:</strong>{' '}
+                    {results.distributions[sensorColumn][key] ?? '—'}
+                  </span>
+                ))}
+              </div>
+              {getDistributionData() && (
+                <Bar data={getDistributionData()} options={distributionOptions} />
+              )}
+            </div>
+          )}
         </div>
       )}
     </div>